@@ -11,6 +11,7 @@ from __future__ import absolute_import, division, print_function
 __all__ = [
     '__version__',
     'MissingOrInvalidPrefitError',
+    'LLHBudgetExhaustedError',
     'NUMBA_AVAIL',
     'numba_jit',
     'RETRO_DIR',
@@ -74,6 +75,12 @@ class MissingOrInvalidPrefitError(ValueError):
     pass
 
 
+class LLHBudgetExhaustedError(RuntimeError):
+    """Time or number of LLH evaluations allotted to a reconstruction method
+    used up"""
+    pass
+
+
 NUMBA_AVAIL = False
 def _dummy_func(x):
     """Decorate to to see if Numba actually works"""
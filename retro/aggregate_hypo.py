@@ -30,7 +30,6 @@ from inspect import cleandoc
 from os.path import abspath, dirname
 import sys
 
-import numba
 import numpy as np
 from six import string_types
 
@@ -42,9 +41,14 @@ from retro import numba_jit
 from retro.const import (
     EMPTY_SOURCES, SPEED_OF_LIGHT_M_PER_NS, SrcHandling, dummy_pegleg_gens
 )
-from retro.hypo import Hypo
+from retro.hypo_future import Hypo
 from retro.utils.misc import make_valid_python_name
 
+try:
+    from numba.core.registry import CPUDispatcher
+except ImportError:
+    from numba.targets.registry import CPUDispatcher
+
 
 class AggregateHypo(Hypo):
     """
@@ -146,19 +150,7 @@ class AggregateHypo(Hypo):
 
         """
         self.num_calls += 1
-
-        for external_param_name in self.external_param_names:
-            try:
-                self.external_params[external_param_name] = kwargs[external_param_name]
-            except KeyError:
-                print(
-                    'Missing param "{}" in passed kwargs {}'
-                    .format(external_param_name, kwargs)
-                )
-                raise
-
-        # Map external param names/values onto internal param names/values
-        self.internal_params = self.param_mapping(**self.external_params)
+        self.set_params(**kwargs)
 
         # -- Create generator to call `pegleg_generators` from each hypo -- #
 
@@ -207,9 +199,11 @@ class AggregateHypo(Hypo):
         else:
             # Ensure all generators are jit-compiled
             for gens_num, gens in enumerate(pegleg_generators):
-                if not isinstance(gens, numba.targets.registry.CPUDispatcher):
+                if not isinstance(gens, CPUDispatcher):
                     try:
-                        gens = numba.njit(cache=True, fastmath=False, nogil=True)(gens)
+                        gens = numba_jit(
+                            nopython=True, cache=True, fastmath=False, nogil=True
+                        )(gens)
                     except:
                         print("failed to numba-jit-compile generator {}".format(gens))
                         raise
@@ -219,7 +213,7 @@ class AggregateHypo(Hypo):
             #    ("dirty hack" since Numba can't be passed a list of functions)
 
             conditional_lines = []
-            lcls = locals()
+            namespace = {}
 
             gens_idx = 0
             start_gen_idx = 0
@@ -231,7 +225,7 @@ class AggregateHypo(Hypo):
 
                 # Define a variable (gens0, gens1, etc.) in local scope that is the callee
                 gens_name = "gens{:d}".format(gens_idx)
-                lcls[gens_name] = this_pl_gens
+                namespace[gens_name] = this_pl_gens
 
                 # Define the conditional
                 conditional = "if" if len(conditional_lines) == 0 else "elif"
@@ -254,8 +248,8 @@ class AggregateHypo(Hypo):
                 start_gen_idx = stop_gen_idx
                 gens_idx += 1
 
-            lcls["EMPTY_SOURCES"] = EMPTY_SOURCES
-            lcls["SrcHandling"] = SrcHandling
+            namespace["EMPTY_SOURCES"] = EMPTY_SOURCES
+            namespace["SrcHandling"] = SrcHandling
             default_yield = "yield (EMPTY_SOURCES,), (SrcHandling.none,)"
             if len(conditional_lines) == 0:
                 final_condit = "    {}".format(default_yield)
@@ -278,13 +272,13 @@ class AggregateHypo(Hypo):
             )
 
             try:
-                exec py_pegleg_generators_str in locals() # pylint: disable=exec-used
+                exec(py_pegleg_generators_str, namespace) # pylint: disable=exec-used
             except:
                 print(py_pegleg_generators_str)
                 raise
 
             pegleg_generators = numba_jit(fastmath=False, nogil=True, nopython=True)(
-                py_pegleg_generators # pylint: disable=undefined-variable
+                namespace["py_pegleg_generators"]
             )
 
         # -- Store aggregated values & new "super" pegleg generator as attrs -- #
@@ -303,6 +297,49 @@ class AggregateHypo(Hypo):
             self.pegleg_generators
         )
 
+    def get_discrete_sources(self, **kwargs):
+        """Call hypotheses' `get_discrete_sources` methods individually and
+        aggregate the results.
+
+        Overrides `Hypo.get_discrete_sources` method.
+
+        Parameters
+        ----------
+        **kwargs
+            Passed to each `hypo.get_discrete_sources` method
+
+        Returns
+        -------
+        generic_sources, pegleg_sources, scaling_sources : ndarrays of dtype SRC_T
+
+        """
+        self.num_calls += 1
+        self.set_params(**kwargs)
+
+        generic_sources = []
+        pegleg_sources = EMPTY_SOURCES
+        scaling_sources = EMPTY_SOURCES
+        for hypo in self.hypos:
+            generic, pegleg, scaling = hypo.get_discrete_sources(**kwargs)
+            if len(generic) > 0:
+                generic_sources.append(generic)
+            if len(pegleg) > 0:
+                if len(pegleg_sources) > 0:
+                    raise ValueError("At most one hypo can produce pegleg sources")
+                pegleg_sources = pegleg
+            if len(scaling) > 0:
+                if len(scaling_sources) > 0:
+                    raise ValueError("At most one hypo can produce scaling sources")
+                scaling_sources = scaling
+
+        if len(generic_sources) == 0:
+            generic_sources = EMPTY_SOURCES
+        else:
+            generic_sources = np.concatenate(generic_sources)
+            generic_sources.sort(order="time")
+
+        return generic_sources, pegleg_sources, scaling_sources
+
     def get_energy(self, pegleg_indices=None, scalefactors=None):
         """Get energy from each hypothesis, returning the total and storing each
         individual hypothesis's energy to `self.energy_per_hypo`.
@@ -329,6 +366,7 @@ class AggregateHypo(Hypo):
             if n_pl > 0:
                 pl_stop_idx = pl_start_idx + n_pl
                 hypo_pegleg_indices = pegleg_indices[pl_start_idx:pl_stop_idx]
+                pl_start_idx = pl_stop_idx
             else:
                 hypo_pegleg_indices = None
 
@@ -344,8 +382,6 @@ class AggregateHypo(Hypo):
                 )
             )
 
-            pl_start_idx = pl_stop_idx
-
         self.energy_per_hypo = tuple(energy_per_hypo)
 
         return np.sum(energy_per_hypo)
@@ -379,6 +415,7 @@ class AggregateHypo(Hypo):
                 assert pegleg_indices is not None
                 pl_stop_idx = pl_start_idx + n_pl
                 hypo_pegleg_indices = pegleg_indices[pl_start_idx:pl_stop_idx]
+                pl_start_idx = pl_stop_idx
             else:
                 hypo_pegleg_indices = None
 
@@ -395,16 +432,14 @@ class AggregateHypo(Hypo):
             for key, val in this_derived_params.items():
                 derived_params[name + "_" + key] = val
 
-            pl_start_idx = pl_stop_idx
-
         return derived_params
 
 
 def test_AggregateHypo():
     """Unit tests for :class:`AggregateHypo`"""
     # Import here to avoid unnecessary imports under non-testing conditions
-    from cascade_hypo import CascadeHypo
-    from muon_hypo import MuonHypo
+    from retro.cascade_hypo import CascadeHypo
+    from retro.muon_hypo import MuonHypo
 
     pl_track_lengths = [1000, 100]
 
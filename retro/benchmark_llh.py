@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=wrong-import-position
+
+"""
+Benchmark likelihood evaluation speed and accuracy of approximate expectation
+computations against the exact computation on actual events.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__all__ = [
+    "BENCHMARKS",
+    "benchmark_src_agg",
+    "benchmark_hypo_backends",
+    "benchmark_llh_kernels",
+    "main",
+]
+
+__author__ = "J.L. Lanfranchi, P. Eller"
+__license__ = """Copyright 2017-2018 Justin L. Lanfranchi and Philipp Eller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License."""
+
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from os.path import abspath, dirname
+import re
+import sys
+import time
+
+import numpy as np
+
+if __name__ == "__main__" and __package__ is None:
+    RETRO_DIR = dirname(dirname(abspath(__file__)))
+    if RETRO_DIR not in sys.path:
+        sys.path.append(RETRO_DIR)
+from retro import DFLT_NUMBA_JIT_KWARGS, init_obj, numba_jit
+from retro.reco import Reco, StandaloneEvents
+from retro.retro_types import EventHits
+from retro.tables.pexp_5d import (
+    generate_pexp_and_llh_functions,
+    get_optimal_scalefactor,
+    simple_llh,
+)
+
+
+def _time_loglike(reco, cubes):
+    """Evaluate `reco.loglike` for each of `cubes` (hypotheses already mapped to
+    physical parameter values), excluding one warm-up call from the timing.
+
+    Returns
+    -------
+    llhs : shape (len(cubes),) array
+    elapsed : float
+        Seconds
+
+    """
+    reco.generate_loglike_method()
+    # Ensure numba compilation is not included in the timing
+    reco.loglike(cubes[0].copy())
+
+    llhs = np.empty(len(cubes))
+    t0 = time.time()
+    for hypo_num, cube in enumerate(cubes):
+        llhs[hypo_num] = reco.loglike(cube.copy())
+    return llhs, time.time() - t0
+
+
+def benchmark_src_agg(
+    reco, events, hypo_kw, opening_angles=(0.05, 0.1, 0.2, 0.4), num_hypos=200, seed=0
+):
+    """Compare LLH values and evaluation speed obtained with hierarchical
+    source aggregation for each of `opening_angles` against those from the
+    exact (non-aggregated) computation.
+
+    Hypotheses are drawn from the default priors of the hypothesis defined by
+    `hypo_kw`, so the same hypotheses are evaluated for each opening angle.
+
+    Parameters
+    ----------
+    reco : retro.reco.Reco
+    events : iterable of event dicts
+    hypo_kw : mapping
+        Passed to `Reco.setup_hypo`
+    opening_angles : sequence of floats
+    num_hypos : int
+        Number of hypotheses to evaluate per event
+    seed : int
+
+    Returns
+    -------
+    results : OrderedDict
+        Keys are opening angles (None for exact computation), values are
+        OrderedDicts containing "time_per_llh", "speedup", "mean_abs_dllh",
+        and "max_abs_dllh" aggregated over all events
+
+    """
+    rand = np.random.RandomState(seed)
+    opening_angles = [None] + [float(a) for a in opening_angles]
+    times = OrderedDict([(a, 0.) for a in opening_angles])
+    dllhs = OrderedDict([(a, []) for a in opening_angles])
+    get_llh_funcs = OrderedDict()
+    for opening_angle in opening_angles:
+        get_llh_funcs[opening_angle] = generate_pexp_and_llh_functions(
+            dom_tables=reco.dom_tables,
+            tdi_tables=reco.tdi_tables,
+            tdi_metas=reco.tdi_metas,
+            src_agg_opening_angle=opening_angle,
+        )[1]
+
+    total_num_hypos = 0
+    for event in events:
+        reco.event = event
+        reco.setup_hypo(**hypo_kw)
+        reco.generate_prior_method()
+        cubes = rand.rand(num_hypos, reco.n_opt_params)
+        for cube in cubes:
+            reco.prior(cube)
+
+        ref_llhs = None
+        for opening_angle, get_llh in get_llh_funcs.items():
+            reco.get_llh = get_llh
+            llhs, elapsed = _time_loglike(reco, cubes)
+            times[opening_angle] += elapsed
+
+            if ref_llhs is None:
+                ref_llhs = llhs
+            dllhs[opening_angle].append(llhs - ref_llhs)
+
+        total_num_hypos += num_hypos
+
+    ref_time = times[None]
+    results = OrderedDict()
+    print("")
+    print(
+        "{:>14s} {:>14s} {:>10s} {:>14s} {:>14s}".format(
+            "opening angle", "ms per LLH", "speedup", "mean |dLLH|", "max |dLLH|"
+        )
+    )
+    for opening_angle in opening_angles:
+        abs_dllh = np.abs(np.concatenate(dllhs[opening_angle]))
+        result = OrderedDict(
+            [
+                ("time_per_llh", times[opening_angle] / total_num_hypos),
+                ("speedup", ref_time / times[opening_angle]),
+                ("mean_abs_dllh", np.mean(abs_dllh)),
+                ("max_abs_dllh", np.max(abs_dllh)),
+            ]
+        )
+        results[opening_angle] = result
+        print(
+            "{:>14s} {:14.3f} {:10.2f} {:14.4f} {:14.4f}".format(
+                "exact" if opening_angle is None else "{:.3f}".format(opening_angle),
+                result["time_per_llh"] * 1e3,
+                result["speedup"],
+                result["mean_abs_dllh"],
+                result["max_abs_dllh"],
+            )
+        )
+
+    return results
+
+
+def benchmark_hypo_backends(reco, events, hypo_kw, num_hypos=200, seed=0):
+    """Compare LLH evaluation rates obtained with each hypothesis backend (see
+    `retro.init_obj.HYPO_BACKENDS`) for the same recipe and hypotheses.
+
+    Parameters
+    ----------
+    reco : retro.reco.Reco
+    events : iterable of event dicts
+    hypo_kw : mapping
+        Passed to `Reco.setup_hypo` (excluding `backend`)
+    num_hypos : int
+        Number of hypotheses to evaluate per event
+    seed : int
+
+    Returns
+    -------
+    results : OrderedDict
+        Keys are backend names, values are OrderedDicts containing
+        "llh_per_sec" and "max_abs_dllh" (w.r.t. the first backend)
+
+    """
+    rand = np.random.RandomState(seed)
+    backends = init_obj.HYPO_BACKENDS
+    times = OrderedDict([(b, 0.) for b in backends])
+    max_abs_dllh = OrderedDict([(b, 0.) for b in backends])
+
+    total_num_hypos = 0
+    for event in events:
+        reco.event = event
+        ref_llhs = None
+        cubes = None
+        for backend in backends:
+            reco.setup_hypo(backend=backend, **hypo_kw)
+            if cubes is None:
+                reco.generate_prior_method()
+                cubes = rand.rand(num_hypos, reco.n_opt_params)
+                for cube in cubes:
+                    reco.prior(cube)
+            llhs, elapsed = _time_loglike(reco, cubes)
+            times[backend] += elapsed
+            if ref_llhs is None:
+                ref_llhs = llhs
+            max_abs_dllh[backend] = max(
+                max_abs_dllh[backend], np.max(np.abs(llhs - ref_llhs))
+            )
+        total_num_hypos += num_hypos
+
+    results = OrderedDict()
+    print("")
+    print("{:>10s} {:>12s} {:>14s}".format("backend", "LLH / s", "max |dLLH|"))
+    for backend in backends:
+        result = OrderedDict(
+            [
+                ("llh_per_sec", total_num_hypos / times[backend]),
+                ("max_abs_dllh", max_abs_dllh[backend]),
+            ]
+        )
+        results[backend] = result
+        print(
+            "{:>10s} {:12.1f} {:14.4g}".format(
+                backend, result["llh_per_sec"], result["max_abs_dllh"]
+            )
+        )
+
+    return results
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def _time_simple_llh(event_hits, hit_exps, t_indep_exps, active_hits):
+    """Call `simple_llh` once per row of `hit_exps` from within Numba, so
+    Python dispatch overhead does not enter the timing"""
+    total = 0.
+    for hypo_idx in range(hit_exps.shape[0]):
+        total += simple_llh(
+            event_hits, hit_exps[hypo_idx], t_indep_exps[hypo_idx], active_hits
+        )
+    return total
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def _time_get_optimal_scalefactor(
+    event_hits,
+    hit_exps,
+    t_indep_exps,
+    scaling_hit_exps,
+    scaling_t_indep_exps,
+    active_hits,
+):
+    """Call `get_optimal_scalefactor` once per row of `hit_exps` from within
+    Numba, so Python dispatch overhead does not enter the timing"""
+    total = 0.
+    for hypo_idx in range(hit_exps.shape[0]):
+        total += get_optimal_scalefactor(
+            event_hits,
+            hit_exps[hypo_idx],
+            t_indep_exps[hypo_idx],
+            scaling_hit_exps[hypo_idx],
+            scaling_t_indep_exps[hypo_idx],
+            1.,
+            active_hits,
+        )[1]
+    return total
+
+
+def _count_packed_fp_ops(dispatcher):
+    """Count packed double-precision arithmetic instructions (e.g. `vdivpd`,
+    `mulpd`) in the machine code Numba generated for `dispatcher`; nonzero
+    counts indicate the hit loops were vectorized"""
+    return sum(
+        len(re.findall(r"\bv?(?:add|sub|mul|div|fmadd\w*)pd\b", asm))
+        for asm in dispatcher.inspect_asm().values()
+    )
+
+
+def benchmark_llh_kernels(
+    num_hits=(100, 300, 1000), num_hypos=2000, active_fraction=1., seed=0
+):
+    """Time the per-hit LLH loops (`simple_llh` and `get_optimal_scalefactor`)
+    on random structure-of-arrays hits and expectations, and report whether
+    Numba vectorized them.
+
+    Parameters
+    ----------
+    num_hits : sequence of ints
+        Event sizes (number of hits) to time
+    num_hypos : int
+        Number of sets of expectations to evaluate per event size
+    active_fraction : float in (0, 1]
+        Fraction of hits given nonzero expectation; timings are still
+        reported per hit in the event
+    seed : int
+
+    Returns
+    -------
+    results : OrderedDict
+        Keys are `num_hits`, values are OrderedDicts containing
+        "simple_llh_ns_per_hit" and "scalefactor_ns_per_hit"
+
+    """
+    rand = np.random.RandomState(seed)
+    results = OrderedDict()
+    for n in num_hits:
+        n = int(n)
+        f32 = lambda a: a.astype(np.float32)  # pylint: disable=cell-var-from-loop
+        hit_charge = f32(rand.exponential(1, n))
+        hit_noise = f32(rand.uniform(1e-7, 1e-6, n))
+        event_hits = EventHits(
+            hit_time=f32(rand.uniform(0, 2000, n)),
+            hit_charge=hit_charge,
+            hit_noise=hit_noise,
+            hit_dom_x=f32(rand.uniform(-500, 500, n)),
+            hit_dom_y=f32(rand.uniform(-500, 500, n)),
+            hit_dom_z=f32(rand.uniform(-500, 500, n)),
+            hit_qe=np.ones(n, dtype=np.float32),
+            hit_table_idx=np.zeros(n, dtype=np.uint32),
+            hit_log_noise=np.log(hit_noise.astype(np.float64)),
+            noise_llh=float(np.sum(hit_charge * np.log(hit_noise.astype(np.float64)))),
+        )
+        active_hits = np.sort(
+            rand.choice(n, max(1, int(round(active_fraction * n))), replace=False)
+        ).astype(np.int64)
+        inactive = np.ones(n, dtype=bool)
+        inactive[active_hits] = False
+        hit_exps = rand.uniform(0, 1e-3, (num_hypos, n))
+        hit_exps[:, inactive] = 0
+        t_indep_exps = rand.uniform(1, 100, num_hypos)
+        scaling_hit_exps = rand.uniform(0, 1e-3, (num_hypos, n))
+        scaling_hit_exps[:, inactive] = 0
+        scaling_t_indep_exps = rand.uniform(1, 100, num_hypos)
+
+        # Ensure numba compilation is not included in the timing
+        _time_simple_llh(event_hits, hit_exps[:1], t_indep_exps[:1], active_hits)
+        t0 = time.time()
+        _time_simple_llh(event_hits, hit_exps, t_indep_exps, active_hits)
+        llh_time = time.time() - t0
+
+        _time_get_optimal_scalefactor(
+            event_hits,
+            hit_exps[:1],
+            t_indep_exps[:1],
+            scaling_hit_exps[:1],
+            scaling_t_indep_exps[:1],
+            active_hits,
+        )
+        t0 = time.time()
+        _time_get_optimal_scalefactor(
+            event_hits,
+            hit_exps,
+            t_indep_exps,
+            scaling_hit_exps,
+            scaling_t_indep_exps,
+            active_hits,
+        )
+        sf_time = time.time() - t0
+
+        results[n] = OrderedDict(
+            [
+                ("simple_llh_ns_per_hit", llh_time / num_hypos / n * 1e9),
+                ("scalefactor_ns_per_hit", sf_time / num_hypos / n * 1e9),
+            ]
+        )
+
+    print("")
+    print(
+        "packed FP instructions: simple_llh {}, get_optimal_scalefactor {}".format(
+            _count_packed_fp_ops(simple_llh),
+            _count_packed_fp_ops(get_optimal_scalefactor),
+        )
+    )
+    print("{:>10s} {:>18s} {:>22s}".format("hits", "simple_llh ns/hit", "scalefactor ns/hit"))
+    for n, result in results.items():
+        print(
+            "{:>10d} {:18.3f} {:22.3f}".format(
+                n, result["simple_llh_ns_per_hit"], result["scalefactor_ns_per_hit"]
+            )
+        )
+
+    return results
+
+
+BENCHMARKS = OrderedDict(
+    [
+        ("src_agg", benchmark_src_agg),
+        ("hypo_backends", benchmark_hypo_backends),
+        ("llh_kernels", benchmark_llh_kernels),
+    ]
+)
+
+
+def main(description=__doc__):
+    """Script interface to the `benchmark_*` functions"""
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "--benchmark",
+        choices=list(BENCHMARKS.keys()),
+        required=True,
+    )
+    parser.add_argument(
+        "--opening-angles",
+        type=float,
+        nargs="+",
+        default=[0.05, 0.1, 0.2, 0.4],
+        help="""Source-aggregation opening angles (radians) to compare against
+        the exact computation (src_agg benchmark only)""",
+    )
+    parser.add_argument(
+        "--num-hypos",
+        type=int,
+        default=200,
+        help="Number of hypotheses to evaluate per event",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    split_kwargs = init_obj.parse_args(
+        dom_tables=True, tdi_tables=True, hypo=True, events=True, parser=parser
+    )
+    other_kw = split_kwargs.pop("other_kw")
+    events_kw = split_kwargs.pop("events_kw")
+    hypo_kw = split_kwargs.pop("hypo_kw")
+
+    benchmark = other_kw.pop("benchmark")
+    opening_angles = other_kw.pop("opening_angles")
+    if benchmark == "src_agg":
+        other_kw["opening_angles"] = opening_angles
+    elif benchmark == "llh_kernels":
+        # Synthetic hits; no tables or events needed
+        BENCHMARKS[benchmark](**other_kw)
+        return
+
+    reco = Reco(**split_kwargs)
+    BENCHMARKS[benchmark](
+        reco=reco,
+        events=StandaloneEvents(events_kw).events,
+        hypo_kw=hypo_kw,
+        **other_kw
+    )
+
+
+if __name__ == "__main__":
+    main()
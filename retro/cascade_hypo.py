@@ -24,7 +24,11 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License."""
 
-from collections import Iterable, OrderedDict
+from collections import OrderedDict
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
 import math
 from numbers import Number
 from os.path import abspath, dirname
@@ -32,16 +36,21 @@ import sys
 
 import enum
 import numpy as np
-from scipy.stats import gamma, pareto
 
 if __name__ == "__main__" and __package__ is None:
     RETRO_DIR = dirname(dirname(abspath(__file__)))
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
 from retro.const import (
-    EMPTY_SOURCES, SPEED_OF_LIGHT_M_PER_NS, SRC_OMNI, SRC_CKV_BETA1, SrcHandling,
+    EMPTY_SOURCES, SRC_OMNI, SRC_CKV_BETA1, SrcHandling,
     dummy_pegleg_gens
 )
+from retro.hypo.discrete_cascade_kernels import (
+    MAX_NUM_SAMPLES,
+    MIN_CASCADE_ENERGY,
+    get_one_dim_cascade_template,
+    transform_cascade_template,
+)
 from retro.hypo_future import Hypo
 from retro.retro_types import SRC_T
 from retro.utils.misc import check_kwarg_keys, validate_and_convert_enum
@@ -210,12 +219,13 @@ class CascadeHypo(Hypo):
         self._create_get_sources_func()
 
     def _create_get_sources_func(self):
-        """Create the function that generates photon sources for a hypothesis.
+        """Create the functions that generate photon sources for a hypothesis.
 
-        The created function is attached to this class as the private attribute
-        `self._get_sources` and is intended to be called externally from
-        `self.get_sources` (which does the appropriate translations from
-        external names/values to internal names/values as used by _get_sources).
+        The created functions are attached to this class as the private
+        attributes `self._get_sources` and `self._get_discrete_sources` and are
+        intended to be called externally from `self.get_sources` and
+        `self.get_discrete_sources`, respectively (which do the appropriate
+        translations from external names/values to internal names/values).
 
         """
         is_scaling = self.is_scaling
@@ -228,7 +238,7 @@ class CascadeHypo(Hypo):
 
         if self.model == CascadeModel.spherical:
 
-            def __get_sources(time, x, y, z, energy):
+            def make_sources(time, x, y, z, energy):
                 """Point-like spherically-radiating cascade.
 
                 Parameters
@@ -237,15 +247,9 @@ class CascadeHypo(Hypo):
 
                 Returns
                 -------
-                sources
-                sources_handling
-                num_pegleg_generators
-                pegleg_generators
+                sources : shape (1,) ndarray of dtype SRC_T
 
                 """
-                if energy == 0:
-                    return (EMPTY_SOURCES,), (SrcHandling.none,), 0, dummy_pegleg_gens
-
                 sources = np.empty(shape=(1,), dtype=SRC_T)
                 sources[0]["kind"] = SRC_OMNI
                 sources[0]["time"] = time
@@ -253,63 +257,13 @@ class CascadeHypo(Hypo):
                 sources[0]["y"] = y
                 sources[0]["z"] = z
                 sources[0]["photons"] = EM_CASCADE_PHOTONS_PER_GEV * energy
-
-                return (sources,), (SrcHandling.none,), 0, dummy_pegleg_gens
-
-            if is_scaling:
-                def ___get_sources(time, x, y, z): # pylint: disable=missing-docstring
-                    return __get_sources(
-                        time=time,
-                        x=x,
-                        y=y,
-                        z=z,
-                        energy=scaling_proto_energy,
-                    )
-                ___get_sources.__doc__ = (
-                    __get_sources.__doc__.replace(", energy", "")
-                )
-                _get_sources = ___get_sources
-            else:
-                _get_sources = __get_sources
+                return sources
 
         elif self.model == CascadeModel.one_dim_v1:
-            # TODO: use quasi-random (low discrepancy) numbers instead of pseudo-random
-            #       (e.g., Sobol sequence)
-
-            # Create samples from angular zenith distribution.
-            max_num_sources = int(1e5)
-            if self.num_sources > max_num_sources:
+            if self.num_sources > MAX_NUM_SAMPLES:
                 raise ValueError(
-                    "Can only produce up to {} sources".format(max_num_sources)
-                )
-
-            # Parameterizations from arXiv:1210.5140v2
-            zen_dist = pareto(b=1.91833423, loc=-22.82924369, scale=22.82924369)
-            random_state = np.random.RandomState(0)
-            precomputed_zen_samples = np.deg2rad(
-                np.clip(
-                    zen_dist.rvs(size=max_num_sources, random_state=random_state),
-                    a_min=0,
-                    a_max=180,
+                    "Can only produce up to {} sources".format(MAX_NUM_SAMPLES)
                 )
-            )
-
-            # Create samples from angular azimuth distribution
-            random_state = np.random.RandomState(2)
-            precomputed_az_samples = random_state.uniform(
-                low=0,
-                high=2*np.pi,
-                size=max_num_sources,
-            )
-
-            param_alpha = 2.01849
-            param_beta = 1.45469
-
-            min_cascade_energy = np.ceil(10**(-param_alpha / param_beta) * 100) / 100
-
-            rad_len = 0.3975
-            param_b = 0.63207
-            rad_len_over_b = rad_len / param_b
 
             # numba closure doesn't have access to attributes of `self`, so extract
             # attributes we need as "regular" variables
@@ -334,10 +288,10 @@ class CascadeHypo(Hypo):
 
                 """
                 if num_sources < 0:
-                    # Note that num_sources must be 1 for energy <= min_cascade_energy
+                    # Note that num_sources must be 1 for energy <= MIN_CASCADE_ENERGY
                     # (param_a goes <= 0 at this value and below, causing an exception from
                     # gamma distribution)
-                    if energy <= min_cascade_energy:
+                    if energy <= MIN_CASCADE_ENERGY:
                         actual_num_sources = 1
                     else:
                         # See `retro/notebooks/energy_dependent_cascade_num_samples.ipynb`
@@ -352,60 +306,25 @@ class CascadeHypo(Hypo):
                     actual_num_sources = num_sources
                 return actual_num_sources
 
-            def compute_longitudinal_samples(num_sources, energy):
-                """Create longitudinal distribution of cascade's light sources.
-
-                See arXiv:1210.5140v2
-
-                Parameters
-                ----------
-                num_sources : int
-                energy : scalar > 0
-
-                Returns
-                -------
-                longitudinal_samples : length-`n_samples` ndarray of dtype float64
-
-                """
-                param_a = (
-                    param_alpha
-                    + (
-                        param_beta
-                        * math.log10(max(min_cascade_energy, energy))
-                    )
-                )
-                # ~70% of exec time:
-                longitudinal_dist = gamma(param_a, scale=rad_len_over_b)
-                # ~10% of execution time:
-                longitudinal_samples = longitudinal_dist.rvs(size=num_sources, random_state=1)
-                return longitudinal_samples
-
             if is_scaling:
                 actual_num_sources = compute_actual_num_sources(
                     num_sources=num_sources,
                     energy=scaling_proto_energy,
                 )
-                precomputed_long_samples = compute_longitudinal_samples(
-                    num_sources=actual_num_sources,
-                    energy=scaling_proto_energy,
-                )
-            else:
-                # Define things just so they exist, even though we won't use them
-                # (needed for Numba-compiled closures)
-                actual_num_sources = num_sources
-                precomputed_long_samples = np.empty(0)
-
-            # TODO: speed up (~800 µs to generate sources at 10 GeV)...
-            # * 70% of the time is spent instantiating the gamma dist
-            # * 10% of the time is executing the `rvs` method of the gamma dist
-            def __get_sources(time, x, y, z, energy, azimuth, zenith):
+                if actual_num_sources > 1:
+                    scaling_template = get_one_dim_cascade_template(
+                        cascade_energy=scaling_proto_energy,
+                        num_samples=actual_num_sources,
+                    )
+
+            def make_sources(time, x, y, z, energy, azimuth, zenith):
                 """Cascade with both longitudinal and angular distributions (but no
                 distribution off-axis). All emitters are located on the shower axis.
 
-                Use as a hypo_kernel with the DiscreteHypo class.
-
-                Note that the number of samples is proportional to the energy of the
-                cascade.
+                Sources are produced by rotating and translating a canonical
+                template (see
+                :func:`retro.hypo.discrete_cascade_kernels.get_one_dim_cascade_template`)
+                which, for a scaling cascade, is computed only once.
 
                 Parameters
                 ----------
@@ -413,15 +332,9 @@ class CascadeHypo(Hypo):
 
                 Returns
                 -------
-                sources
-                source_handling
-                num_pegleg_generators
-                pegleg_generators
+                sources : ndarray of dtype SRC_T
 
                 """
-                if energy == 0:
-                    return (EMPTY_SOURCES,), (SrcHandling.none,), 0, dummy_pegleg_gens
-
                 if is_scaling:
                     n_sources = actual_num_sources
                 else:
@@ -437,9 +350,6 @@ class CascadeHypo(Hypo):
                 cos_zen = math.cos(opposite_zenith)
                 sin_az = math.sin(opposite_azimuth)
                 cos_az = math.cos(opposite_azimuth)
-                dir_x = sin_zen * cos_az
-                dir_y = sin_zen * sin_az
-                dir_z = cos_zen
 
                 if n_sources == 1:
                     sources = np.empty(shape=(1,), dtype=SRC_T)
@@ -457,96 +367,78 @@ class CascadeHypo(Hypo):
                     sources[0]["dir_cosphi"] = cos_az
                     sources[0]["dir_sinphi"] = sin_az
 
-                    return (sources,), (src_handling,), 0, dummy_pegleg_gens
-
-                # Create rotation matrix
-                rot_mat = np.array(
-                    [[cos_az * cos_zen, -sin_az, cos_az * sin_zen],
-                     [sin_az * cos_zen, cos_zen, sin_az * sin_zen],
-                     [-sin_zen, 0, cos_zen]]
-                )
+                    return sources
 
                 if is_scaling:
-                    longitudinal_samples = precomputed_long_samples
+                    template = scaling_template
                 else:
-                    longitudinal_samples = compute_longitudinal_samples(
-                        num_sources=n_sources,
-                        energy=energy,
+                    template = get_one_dim_cascade_template(
+                        cascade_energy=energy,
+                        num_samples=n_sources,
                     )
 
-                # Grab precomputed samples from angular zenith distribution
-                zen_samples = precomputed_zen_samples[:n_sources]
-
-                # Grab precomputed samples from angular azimuth distribution
-                az_samples = precomputed_az_samples[:n_sources]
-
-                # Create angular vectors distribution
-                sin_zen = np.sin(zen_samples)
-                x_ang_dist = sin_zen * np.cos(az_samples)
-                y_ang_dist = sin_zen * np.sin(az_samples)
-                z_ang_dist = np.cos(zen_samples)
-                ang_dist = np.concatenate(
-                    (
-                        x_ang_dist[np.newaxis, :],
-                        y_ang_dist[np.newaxis, :],
-                        z_ang_dist[np.newaxis, :]
-                    ),
-                    axis=0,
+                return transform_cascade_template(
+                    template=template,
+                    time=time,
+                    x=x,
+                    y=y,
+                    z=z,
+                    photons_per_sample=EM_CASCADE_PHOTONS_PER_GEV * energy / n_sources,
+                    sin_zen=sin_zen,
+                    cos_zen=cos_zen,
+                    sin_azi=sin_az,
+                    cos_azi=cos_az,
                 )
 
-                final_ang_dist = np.dot(rot_mat, ang_dist)
-                final_phi_dist = np.arctan2(final_ang_dist[1], final_ang_dist[0])
-                final_theta_dist = np.arccos(final_ang_dist[2])
-
-                # Define photons per sample
-                photons_per_sample = EM_CASCADE_PHOTONS_PER_GEV * energy / n_sources
+        else:
+            raise NotImplementedError(
+                "{} cascade model is not implemented".format(self.model.name) # pylint: disable=no-member
+            )
 
-                # Create photon array
-                sources = np.empty(shape=n_sources, dtype=SRC_T)
+        def __get_sources(**kwargs):
+            """Get sources along with their handling and (no) pegleg generators.
 
-                sources["kind"] = SRC_CKV_BETA1
+            Returns
+            -------
+            sources
+            sources_handling
+            num_pegleg_generators
+            pegleg_generators
 
-                sources["time"] = time + longitudinal_samples / SPEED_OF_LIGHT_M_PER_NS
-                sources["x"] = x + longitudinal_samples * dir_x
-                sources["y"] = y + longitudinal_samples * dir_y
-                sources["z"] = z + longitudinal_samples * dir_z
+            """
+            if kwargs["energy"] == 0:
+                return (EMPTY_SOURCES,), (SrcHandling.none,), 0, dummy_pegleg_gens
+            return (make_sources(**kwargs),), (src_handling,), 0, dummy_pegleg_gens
 
-                sources["photons"] = photons_per_sample
+        def __get_discrete_sources(**kwargs):
+            """Get sources as (generic_sources, pegleg_sources, scaling_sources).
 
-                sources["dir_costheta"] = final_ang_dist[2]
-                sources["dir_sintheta"] = np.sin(final_theta_dist)
+            Returns
+            -------
+            generic_sources, pegleg_sources, scaling_sources
 
-                sources["dir_phi"] = final_phi_dist
-                sources["dir_cosphi"] = np.cos(final_phi_dist)
-                sources["dir_sinphi"] = np.sin(final_phi_dist)
+            """
+            if kwargs["energy"] == 0:
+                return EMPTY_SOURCES, EMPTY_SOURCES, EMPTY_SOURCES
+            if is_scaling:
+                return EMPTY_SOURCES, EMPTY_SOURCES, make_sources(**kwargs)
+            return make_sources(**kwargs), EMPTY_SOURCES, EMPTY_SOURCES
 
-                return (sources,), (src_handling,), 0, dummy_pegleg_gens
+        if is_scaling:
+            def _get_sources(**kwargs): # pylint: disable=missing-docstring
+                return __get_sources(energy=scaling_proto_energy, **kwargs)
 
-            if is_scaling:
-                def ___get_sources(time, x, y, z, azimuth, zenith): # pylint: disable=missing-docstring
-                    return __get_sources(
-                        time=time,
-                        x=x,
-                        y=y,
-                        z=z,
-                        energy=scaling_proto_energy,
-                        azimuth=azimuth,
-                        zenith=zenith,
-                    )
-                ___get_sources.__doc__ = (
-                    __get_sources.__doc__.replace(", energy", "")
-                )
-                _get_sources = ___get_sources
-            else:
-                _get_sources = __get_sources
+            def _get_discrete_sources(**kwargs): # pylint: disable=missing-docstring
+                return __get_discrete_sources(energy=scaling_proto_energy, **kwargs)
 
+            _get_sources.__doc__ = __get_sources.__doc__
+            _get_discrete_sources.__doc__ = __get_discrete_sources.__doc__
         else:
-            raise NotImplementedError(
-                "{} cascade model is not implemented".format(self.model.name) # pylint: disable=no-member
-
-            )
+            _get_sources = __get_sources
+            _get_discrete_sources = __get_discrete_sources
 
         self._get_sources = _get_sources
+        self._get_discrete_sources = _get_discrete_sources
 
     def get_energy(self, pegleg_indices=None, scalefactors=None):
         """Get cascade energy.
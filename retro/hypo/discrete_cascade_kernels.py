@@ -25,6 +25,10 @@ __all__ = [
     'scaling_one_dim_cascade',
     'one_dim_delta_cascade',
     'scaling_one_dim_delta_cascade',
+    'CASCADE_TEMPLATE_BINS_PER_DECADE',
+    'get_one_dim_cascade_template',
+    'transform_cascade_template',
+    'test_one_dim_cascade_template',
 ]
 
 __author__ = 'P. Eller, J.L. Lanfranchi'
@@ -196,6 +200,152 @@ RAD_LEN = 0.3975
 PARAM_B = 0.63207
 RAD_LEN_OVER_B = RAD_LEN / PARAM_B
 
+CASCADE_TEMPLATE_BINS_PER_DECADE = 100
+"""Number of log10(energy) bins per decade used for caching one-dim cascade
+templates; the longitudinal profile of a template is computed at its bin's
+central energy"""
+
+_CASCADE_TEMPLATES = {}
+
+
+def get_one_dim_cascade_template(cascade_energy, num_samples):
+    """Retrieve the canonical one-dim cascade template for `num_samples` and
+    the energy bin `cascade_energy` falls into, creating and caching it if it
+    does not exist yet.
+
+    Templates describe a cascade at the origin with its axis along +z; see
+    `transform_cascade_template` for placing one in the detector.
+
+    Parameters
+    ----------
+    cascade_energy : float > 0
+    num_samples : int > 1
+
+    Returns
+    -------
+    template : shape (4, num_samples) array of float64
+        Rows are distance along the axis (m) and the x, y, and z components
+        of each sample's (unit) direction
+
+    """
+    energy_bin = int(
+        round(math.log10(cascade_energy) * CASCADE_TEMPLATE_BINS_PER_DECADE)
+    )
+    key = (num_samples, energy_bin)
+    template = _CASCADE_TEMPLATES.get(key, None)
+    if template is not None:
+        return template
+
+    bin_energy = 10**(energy_bin / CASCADE_TEMPLATE_BINS_PER_DECADE)
+
+    # Create longitudinal distribution (from arXiv:1210.5140v2)
+    param_a = (
+        PARAM_ALPHA
+        + PARAM_BETA * math.log10(max(MIN_CASCADE_ENERGY, bin_energy))
+    )
+    long_dist = gamma(param_a, scale=RAD_LEN_OVER_B)
+
+    # Grab samples from angular zenith & azimuth distributions
+    zen_samples = ZEN_SAMPLES[:num_samples]
+    azi_samples = AZI_SAMPLES[:num_samples]
+
+    template = np.empty(shape=(4, num_samples), dtype=np.float64)
+    template[0] = long_dist.rvs(size=num_samples, random_state=1)
+    sin_zen = np.sin(zen_samples)
+    template[1] = sin_zen * np.cos(azi_samples)
+    template[2] = sin_zen * np.sin(azi_samples)
+    template[3] = np.cos(zen_samples)
+
+    _CASCADE_TEMPLATES[key] = template
+
+    return template
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def transform_cascade_template(
+    template,
+    time,
+    x,
+    y,
+    z,
+    photons_per_sample,
+    sin_zen,
+    cos_zen,
+    sin_azi,
+    cos_azi,
+):
+    """Produce sources by rotating a canonical cascade template onto the axis
+    given by (`sin_zen`, `cos_zen`, `sin_azi`, `cos_azi`) and translating it
+    to (`time`, `x`, `y`, `z`).
+
+    Source directions are computed directly in cosine / sine form from the
+    rotated direction vectors, so the only transcendental function evaluated
+    per source is the arctangent needed to fill the `dir_phi` field.
+
+    Parameters
+    ----------
+    template : shape (4, n) array
+        As returned by `get_one_dim_cascade_template`
+    time, x, y, z : float
+    photons_per_sample : float
+    sin_zen, cos_zen, sin_azi, cos_azi : float
+        Sine and cosine of the zenith and azimuth of the cascade axis
+
+    Returns
+    -------
+    sources : shape (n,) array of dtype SRC_T
+
+    """
+    num_samples = template.shape[1]
+
+    dir_x = sin_zen * cos_azi
+    dir_y = sin_zen * sin_azi
+    dir_z = cos_zen
+
+    # Rotation matrix elements (same convention as original kernels)
+    r00 = cos_azi * cos_zen
+    r01 = -sin_azi
+    r02 = cos_azi * sin_zen
+    r10 = sin_azi * cos_zen
+    r11 = cos_zen
+    r12 = sin_azi * sin_zen
+    r20 = -sin_zen
+    r22 = cos_zen
+
+    sources = np.empty(shape=num_samples, dtype=SRC_T)
+    for i in range(num_samples):
+        long_sample = template[0, i]
+        ang_x = template[1, i]
+        ang_y = template[2, i]
+        ang_z = template[3, i]
+
+        final_x = r00 * ang_x + r01 * ang_y + r02 * ang_z
+        final_y = r10 * ang_x + r11 * ang_y + r12 * ang_z
+        final_z = r20 * ang_x + r22 * ang_z
+
+        src = sources[i]
+        src['kind'] = SRC_CKV_BETA1
+        src['time'] = time + long_sample / SPEED_OF_LIGHT_M_PER_NS
+        src['x'] = x + long_sample * dir_x
+        src['y'] = y + long_sample * dir_y
+        src['z'] = z + long_sample * dir_z
+        src['photons'] = photons_per_sample
+
+        src['dir_costheta'] = final_z
+        src['dir_sintheta'] = math.sqrt(max(0., 1. - final_z*final_z))
+
+        rho = math.sqrt(final_x*final_x + final_y*final_y)
+        src['dir_phi'] = math.atan2(final_y, final_x)
+        if rho > 0:
+            src['dir_cosphi'] = final_x / rho
+            src['dir_sinphi'] = final_y / rho
+        else:
+            src['dir_cosphi'] = 1.
+            src['dir_sinphi'] = 0.
+
+    return sources
+
+
 def one_dim_cascade(
     time,
     x,
@@ -256,79 +406,26 @@ def one_dim_cascade(
             cascade_zenith=cascade_zenith,
         )
 
-    zenith = PI - cascade_zenith
-    azimuth = PI + cascade_azimuth
-
-    sin_zen = math.sin(zenith)
-    cos_zen = math.cos(zenith)
-    sin_azi = math.sin(azimuth)
-    cos_azi = math.cos(azimuth)
-    dir_x = sin_zen * cos_azi
-    dir_y = sin_zen * sin_azi
-    dir_z = cos_zen
-
-    # Create rotation matrix
-    rot_mat = np.array(
-        [[cos_azi * cos_zen, -sin_azi, cos_azi * sin_zen],
-         [sin_azi * cos_zen, cos_zen, sin_azi * sin_zen],
-         [-sin_zen, 0, cos_zen]]
-    )
-
-    # Create longitudinal distribution (from arXiv:1210.5140v2)
-    param_a = (
-        PARAM_ALPHA
-        + PARAM_BETA * math.log10(max(MIN_CASCADE_ENERGY, cascade_energy))
+    template = get_one_dim_cascade_template(
+        cascade_energy=cascade_energy, num_samples=num_samples
     )
 
-    long_dist = gamma(param_a, scale=RAD_LEN_OVER_B)
-    long_samples = long_dist.rvs(size=num_samples, random_state=1)
-
-    # Grab samples from angular zenith distribution
-    zen_samples = ZEN_SAMPLES[:num_samples]
-
-    # Grab samples from angular azimuth distribution
-    azi_samples = AZI_SAMPLES[:num_samples]
+    zenith = PI - cascade_zenith
+    azimuth = PI + cascade_azimuth
 
-    # Create angular vectors distribution
-    sin_zen = np.sin(zen_samples)
-    x_ang_dist = sin_zen * np.cos(azi_samples)
-    y_ang_dist = sin_zen * np.sin(azi_samples)
-    z_ang_dist = np.cos(zen_samples)
-    ang_dist = np.concatenate(
-        (x_ang_dist[np.newaxis, :],
-         y_ang_dist[np.newaxis, :],
-         z_ang_dist[np.newaxis, :]),
-        axis=0
+    return transform_cascade_template(
+        template=template,
+        time=time,
+        x=x,
+        y=y,
+        z=z,
+        photons_per_sample=EM_CASCADE_PHOTONS_PER_GEV * cascade_energy / num_samples,
+        sin_zen=math.sin(zenith),
+        cos_zen=math.cos(zenith),
+        sin_azi=math.sin(azimuth),
+        cos_azi=math.cos(azimuth),
     )
 
-    final_ang_dist = np.dot(rot_mat, ang_dist)
-    final_phi_dist = np.arctan2(final_ang_dist[1], final_ang_dist[0])
-    final_theta_dist = np.arccos(final_ang_dist[2])
-
-    # Define photons per sample
-    photons_per_sample = EM_CASCADE_PHOTONS_PER_GEV * cascade_energy / num_samples
-
-    # Create photon array
-    sources = np.empty(shape=num_samples, dtype=SRC_T)
-
-    sources['kind'] = SRC_CKV_BETA1
-
-    sources['time'] = time + long_samples / SPEED_OF_LIGHT_M_PER_NS
-    sources['x'] = x + long_samples * dir_x
-    sources['y'] = y + long_samples * dir_y
-    sources['z'] = z + long_samples * dir_z
-
-    sources['photons'] = photons_per_sample
-
-    sources['dir_costheta'] = final_ang_dist[2]
-    sources['dir_sintheta'] = np.sin(final_theta_dist)
-
-    sources['dir_phi'] = final_phi_dist
-    sources['dir_cosphi'] = np.cos(final_phi_dist)
-    sources['dir_sinphi'] = np.sin(final_phi_dist)
-
-    return sources
-
 def aligned_one_dim_cascade(
     time,
     x,
@@ -441,3 +538,67 @@ def scaling_one_dim_delta_cascade(
         num_samples=100,
         **kwargs
     )
+
+
+def test_one_dim_cascade_template():
+    """Unit tests for template-based `one_dim_cascade`"""
+    kw = dict(time=10., x=1., y=-2., z=-300.)
+    num_samples = 100
+    rand = np.random.RandomState(0)
+    for _ in range(100):
+        cascade_azimuth = rand.uniform(0, 2*np.pi)
+        cascade_zenith = np.arccos(rand.uniform(-1, 1))
+        cascade_energy = rand.choice([SCALING_CASCADE_ENERGY, 10**rand.uniform(0, 2)])
+        sources = one_dim_cascade(
+            cascade_energy=cascade_energy,
+            cascade_azimuth=cascade_azimuth,
+            cascade_zenith=cascade_zenith,
+            num_samples=num_samples,
+            **kw
+        )
+        assert len(sources) == num_samples
+
+        # Reference computed the direct way, from the template's samples
+        template = get_one_dim_cascade_template(cascade_energy, num_samples)
+        zenith = PI - cascade_zenith
+        azimuth = PI + cascade_azimuth
+        sin_zen, cos_zen = np.sin(zenith), np.cos(zenith)
+        sin_azi, cos_azi = np.sin(azimuth), np.cos(azimuth)
+        rot_mat = np.array(
+            [[cos_azi * cos_zen, -sin_azi, cos_azi * sin_zen],
+             [sin_azi * cos_zen, cos_zen, sin_azi * sin_zen],
+             [-sin_zen, 0, cos_zen]]
+        )
+        final_ang_dist = np.dot(rot_mat, template[1:])
+        final_phi_dist = np.arctan2(final_ang_dist[1], final_ang_dist[0])
+        final_theta_dist = np.arccos(np.clip(final_ang_dist[2], -1, 1))
+        long_samples = template[0]
+
+        rtol = 1e-5
+        assert np.allclose(sources['x'], kw['x'] + long_samples * sin_zen * cos_azi, rtol=rtol)
+        assert np.allclose(sources['z'], kw['z'] + long_samples * cos_zen, rtol=rtol)
+        assert np.allclose(
+            sources['time'], kw['time'] + long_samples / SPEED_OF_LIGHT_M_PER_NS, rtol=rtol
+        )
+        assert np.allclose(
+            np.sum(sources['photons']),
+            EM_CASCADE_PHOTONS_PER_GEV * cascade_energy,
+            rtol=rtol,
+        )
+        assert np.allclose(sources['dir_costheta'], final_ang_dist[2], atol=1e-6)
+        assert np.allclose(sources['dir_sintheta'], np.sin(final_theta_dist), atol=1e-6)
+        assert np.allclose(sources['dir_phi'], final_phi_dist, atol=1e-6)
+        assert np.allclose(sources['dir_cosphi'], np.cos(final_phi_dist), atol=1e-6)
+        assert np.allclose(sources['dir_sinphi'], np.sin(final_phi_dist), atol=1e-6)
+
+    # Templates are shared between hypotheses in the same energy bin
+    assert (
+        get_one_dim_cascade_template(SCALING_CASCADE_ENERGY, num_samples)
+        is get_one_dim_cascade_template(SCALING_CASCADE_ENERGY * 1.001, num_samples)
+    )
+
+    print('<< PASS : test_one_dim_cascade_template >>')
+
+
+if __name__ == '__main__':
+    test_one_dim_cascade_template()
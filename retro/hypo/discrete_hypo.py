@@ -30,12 +30,10 @@ try:
 except Exception:
     from collections import Mapping
 from copy import deepcopy
-import inspect
 from os.path import abspath, dirname
 import sys
 
 import numpy as np
-import numba
 
 if __name__ == '__main__' and __package__ is None:
     RETRO_DIR = dirname(dirname(abspath(__file__)))
@@ -44,6 +42,7 @@ if __name__ == '__main__' and __package__ is None:
 from retro.const import (
     EMPTY_SOURCES, PARAM_NAMES, PEGLEG_PARAM_NAMES, SCALING_PARAM_NAMES
 )
+from retro.utils.get_arg_names import get_arg_names
 
 
 def get_hypo_param_names(kernel):
@@ -59,13 +58,8 @@ def get_hypo_param_names(kernel):
     hypo_param_names : tuple
 
     """
-    if isinstance(kernel, numba.targets.registry.CPUDispatcher):
-        py_func = kernel.py_func
-    else:
-        py_func = kernel
-
     # Get all the function's argument names
-    kernel_argnames = inspect.getargspec(py_func)[0]
+    kernel_argnames = get_arg_names(kernel)
 
     # Select out the argument names that are "officially recognized" hypo
     # params; this is effectively an "intersection" operation, but where we
@@ -218,6 +212,25 @@ class DiscreteHypo(object):
         """int: Number of hypothesis parameters to be handled by a generic optimizer"""
         return len(self.opt_param_names)
 
+    def get_sources(self, hypo):
+        """Evaluate all kernels of the discrete hypothesis given particular
+        parameters.
+
+        Parameters
+        ----------
+        hypo : dict
+
+        Returns
+        -------
+        generic_sources, pegleg_sources, scaling_sources : ndarrays of dtype SRC_T
+
+        """
+        return (
+            self.get_generic_sources(hypo),
+            self.get_pegleg_sources(hypo),
+            self.get_scaling_sources(hypo),
+        )
+
     def get_generic_sources(self, hypo):
         """Evaluate the discrete hypothesis (all hypo kernels) given particular
         parameters and return the sources produced by the hypothesis.
@@ -15,6 +15,8 @@ from __future__ import absolute_import, division, print_function
 __all__ = [
     'MUON_KINDS',
     'ALL_REALS',
+    'ADAPTIVE_STEP_REF_DIST',
+    'PEGLEG_NUM_SEGMENTS',
     'MULEN_INTERP',
     'TABLE_LOWER_BOUND',
     'TABLE_UPPER_BOUND',
@@ -24,6 +26,9 @@ __all__ = [
     'table_energy_loss_secondary_light_muon',
     'stopping_table_energy_loss_muon',
     'pegleg_eval',
+    'get_track_segments',
+    'adaptive_track_segments',
+    'benchmark_adaptive_track_segments',
 ]
 
 __author__ = 'P. Eller, J.L. Lanfranchi, K. Crust'
@@ -53,6 +58,7 @@ RETRO_DIR = dirname(dirname(dirname(abspath(__file__))))
 if __name__ == '__main__' and __package__ is None:
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
+from retro import DFLT_NUMBA_JIT_KWARGS, numba_jit
 from retro.const import (
     SPEED_OF_LIGHT_M_PER_NS, TRACK_M_PER_GEV, TRACK_PHOTONS_PER_M,
     SRC_CKV_BETA1, EMPTY_SOURCES
@@ -65,8 +71,147 @@ MUON_KINDS = sorted([k[:-len('_muon')] for k in __all__ if k.endswith('_muon')])
 ALL_REALS = (-np.inf, np.inf)
 SECONDARIES = MuonSecondariesLightOutput()
 
+ADAPTIVE_STEP_REF_DIST = 20.
+"""Distance (m) from a track segment to the nearest hit DOM beyond which
+adaptive sampling grows the time step proportionally to that distance"""
 
-def pegleg_muon(time, x, y, z, track_azimuth, track_zenith, dt, n_segments=10000):
+PEGLEG_NUM_SEGMENTS = 10000
+"""Default number of time steps making up the longest pegleg track"""
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def adaptive_track_segments(
+    x,
+    y,
+    z,
+    dir_x,
+    dir_y,
+    dir_z,
+    total_dt,
+    dt,
+    max_dt,
+    step_ref_dist,
+    hit_dom_coords,
+):
+    """Sample a track with time steps that grow with the distance to the
+    nearest hit DOM.
+
+    The step taken at each segment is ``dt * d / step_ref_dist``, clipped to
+    the range [`dt`, `max_dt`], where `d` is the distance from the start of
+    the segment to the nearest DOM in `hit_dom_coords`. Since the step length
+    is a small fraction of `d` (for `step_ref_dist` much larger than the
+    nominal segment length), a segment can never step over a DOM.
+
+    Parameters
+    ----------
+    x, y, z : float
+        Track start position, in meters
+    dir_x, dir_y, dir_z : float
+        Unit vector in the direction of motion of the track
+    total_dt : float
+        Time in ns it takes the track to traverse its full length
+    dt : float
+        Smallest (nominal) time step, in ns
+    max_dt : float
+        Largest time step, in ns
+    step_ref_dist : float
+        Distance in meters at which the time step starts to exceed `dt`
+    hit_dom_coords : shape (n_hit_doms, 3) array
+        Coordinates of the DOMs that recorded hits
+
+    Returns
+    -------
+    sampled_dt : shape (n_segments,) array
+        Time at the center of each segment relative to the track start
+    segment_dt : shape (n_segments,) array
+        Time step (duration) of each segment; segment durations sum to
+        `total_dt`
+
+    """
+    num_hit_doms = hit_dom_coords.shape[0]
+    max_num_segments = int(math.ceil(total_dt / dt)) + 1
+    sampled_dt = np.empty(shape=max_num_segments, dtype=np.float64)
+    segment_dt = np.empty(shape=max_num_segments, dtype=np.float64)
+
+    num_segments = 0
+    t = 0.
+    while t < total_dt:
+        seg_x = x + t * dir_x * SPEED_OF_LIGHT_M_PER_NS
+        seg_y = y + t * dir_y * SPEED_OF_LIGHT_M_PER_NS
+        seg_z = z + t * dir_z * SPEED_OF_LIGHT_M_PER_NS
+
+        min_dist_sq = np.inf
+        for dom_idx in range(num_hit_doms):
+            dx = hit_dom_coords[dom_idx, 0] - seg_x
+            dy = hit_dom_coords[dom_idx, 1] - seg_y
+            dz = hit_dom_coords[dom_idx, 2] - seg_z
+            dist_sq = dx*dx + dy*dy + dz*dz
+            if dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
+
+        step = dt * math.sqrt(min_dist_sq) / step_ref_dist
+        step = min(max(step, dt), max_dt, total_dt - t)
+
+        sampled_dt[num_segments] = t + 0.5*step
+        segment_dt[num_segments] = step
+        num_segments += 1
+        t += step
+
+    return sampled_dt[:num_segments], segment_dt[:num_segments]
+
+
+def get_track_segments(
+    x,
+    y,
+    z,
+    dir_x,
+    dir_y,
+    dir_z,
+    length,
+    dt,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
+):
+    """Get the times at which to place sources along a track of `length`
+    meters and the time step each source represents.
+
+    Fixed time steps `dt` are used unless both `max_dt` and `hit_dom_coords`
+    are specified, in which case :func:`adaptive_track_segments` is used.
+
+    Returns
+    -------
+    sampled_dt : shape (n_segments,) array
+    segment_dt : float or shape (n_segments,) array
+
+    """
+    total_dt = length / SPEED_OF_LIGHT_M_PER_NS
+    if max_dt is None or hit_dom_coords is None:
+        sampled_dt = np.arange(dt*0.5, total_dt, dt)
+        # At least one segment
+        if len(sampled_dt) == 0:
+            sampled_dt = np.array([total_dt/2.])
+        return sampled_dt, dt
+
+    return adaptive_track_segments(
+        x, y, z, dir_x, dir_y, dir_z, total_dt, dt, max_dt, step_ref_dist,
+        hit_dom_coords,
+    )
+
+
+def pegleg_muon(
+    time,
+    x,
+    y,
+    z,
+    track_azimuth,
+    track_zenith,
+    dt,
+    n_segments=PEGLEG_NUM_SEGMENTS,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
+):
     """Simple discrete-time track hypothesis.
 
     Use as a hypo_kernel with the DiscreteHypo class.
@@ -86,18 +231,26 @@ def pegleg_muon(time, x, y, z, track_azimuth, track_zenith, dt, n_segments=10000
         Time step in nanoseconds
 
     n_segments : int
-        Number of segments to supply for pegleg
+        Number of segments to supply for pegleg; if sampling adaptively, the
+        track has the same length as `n_segments` fixed steps of `dt` but is
+        represented by fewer segments
+
+    max_dt : float or None
+        Largest time step in nanoseconds when sampling adaptively; adaptive
+        sampling is used only if both `max_dt` and `hit_dom_coords` are not
+        None (see :func:`adaptive_track_segments`)
+
+    step_ref_dist : float
+        Distance to nearest hit DOM (m) beyond which the adaptive time step
+        grows
+
+    hit_dom_coords : shape (n_hit_doms, 3) array or None
 
     Returns
     -------
     sources : shape (n_segments,) numpy.ndarray, dtype SRC_T
 
     """
-    sampled_dt = np.arange(dt*0.5, (n_segments + 0.5)*dt, dt)
-
-    segment_length = dt * SPEED_OF_LIGHT_M_PER_NS
-    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
-
     # NOTE: add pi to make dir vector go in "math-standard" vector notation
     # (vector components point in direction of motion), as opposed to "IceCube"
     # vector notation (vector components point opposite to direction of
@@ -115,6 +268,18 @@ def pegleg_muon(time, x, y, z, track_azimuth, track_zenith, dt, n_segments=10000
     dir_y = dir_sintheta * dir_sinphi
     dir_z = dir_costheta
 
+    if max_dt is None or hit_dom_coords is None:
+        sampled_dt = np.arange(dt*0.5, (n_segments + 0.5)*dt, dt)
+        segment_dt = dt
+    else:
+        sampled_dt, segment_dt = adaptive_track_segments(
+            x, y, z, dir_x, dir_y, dir_z, n_segments*dt, dt, max_dt,
+            step_ref_dist, hit_dom_coords,
+        )
+
+    segment_length = segment_dt * SPEED_OF_LIGHT_M_PER_NS
+    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
+
     sources = np.empty(shape=sampled_dt.shape, dtype=SRC_T)
 
     sources['kind'] = SRC_CKV_BETA1
@@ -143,6 +308,9 @@ def const_energy_loss_muon(
     track_azimuth,
     track_zenith,
     dt,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
 ):
     """Simple discrete-time track hypothesis.
 
@@ -162,6 +330,17 @@ def const_energy_loss_muon(
     dt : float
         Time step in nanoseconds
 
+    max_dt : float or None
+        Largest time step in nanoseconds when sampling adaptively; adaptive
+        sampling is used only if both `max_dt` and `hit_dom_coords` are not
+        None (see :func:`adaptive_track_segments`)
+
+    step_ref_dist : float
+        Distance to nearest hit DOM (m) beyond which the adaptive time step
+        grows
+
+    hit_dom_coords : shape (n_hit_doms, 3) array or None
+
     Returns
     -------
     sources : shape (n_sources,) numpy.ndarray, dtype SRC_T
@@ -172,14 +351,6 @@ def const_energy_loss_muon(
 
     length = track_energy * TRACK_M_PER_GEV
 
-    sampled_dt = np.arange(dt*0.5, length/SPEED_OF_LIGHT_M_PER_NS, dt)
-    # At least one segment
-    if len(sampled_dt) == 0:
-        sampled_dt = np.array([length/2./SPEED_OF_LIGHT_M_PER_NS])
-
-    segment_length = dt * SPEED_OF_LIGHT_M_PER_NS
-    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
-
     # NOTE: add pi to make dir vector go in "math-standard" vector notation
     # (vector components point in direction of motion), as opposed to "IceCube"
     # vector notation (vector components point opposite to direction of
@@ -197,6 +368,14 @@ def const_energy_loss_muon(
     dir_y = dir_sintheta * dir_sinphi
     dir_z = dir_costheta
 
+    sampled_dt, segment_dt = get_track_segments(
+        x, y, z, dir_x, dir_y, dir_z, length, dt, max_dt, step_ref_dist,
+        hit_dom_coords,
+    )
+
+    segment_length = segment_dt * SPEED_OF_LIGHT_M_PER_NS
+    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
+
     sources = np.empty(shape=sampled_dt.shape, dtype=SRC_T)
 
     sources['kind'] = SRC_CKV_BETA1
@@ -253,6 +432,9 @@ def table_energy_loss_muon(
     track_azimuth,
     track_zenith,
     dt,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
 ):
     """Discrete-time track hypothesis that calculates dE/dx as the muon travels
     using splined tabulated data.
@@ -273,6 +455,17 @@ def table_energy_loss_muon(
     dt : float
         Time step in nanoseconds
 
+    max_dt : float or None
+        Largest time step in nanoseconds when sampling adaptively; adaptive
+        sampling is used only if both `max_dt` and `hit_dom_coords` are not
+        None (see :func:`adaptive_track_segments`)
+
+    step_ref_dist : float
+        Distance to nearest hit DOM (m) beyond which the adaptive time step
+        grows
+
+    hit_dom_coords : shape (n_hit_doms, 3) array or None
+
     Returns
     -------
     sources : shape (n_sources,) numpy.ndarray, dtype SRC_T
@@ -294,14 +487,6 @@ def table_energy_loss_muon(
     if length <= 0:
         return EMPTY_SOURCES
 
-    sampled_dt = np.arange(dt*0.5, length/SPEED_OF_LIGHT_M_PER_NS, dt)
-    # At least one segment
-    if len(sampled_dt) == 0:
-        sampled_dt = np.array([length/2./SPEED_OF_LIGHT_M_PER_NS])
-
-    segment_length = dt * SPEED_OF_LIGHT_M_PER_NS
-    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
-
     # Assign dir_x, dir_y, dir_z for the track
     opposite_zenith = np.pi - track_zenith
     opposite_azimuth = np.pi + track_azimuth
@@ -316,6 +501,14 @@ def table_energy_loss_muon(
     dir_y = dir_sintheta * dir_sinphi
     dir_z = dir_costheta
 
+    sampled_dt, segment_dt = get_track_segments(
+        x, y, z, dir_x, dir_y, dir_z, length, dt, max_dt, step_ref_dist,
+        hit_dom_coords,
+    )
+
+    segment_length = segment_dt * SPEED_OF_LIGHT_M_PER_NS
+    photons_per_segment = segment_length * TRACK_PHOTONS_PER_M
+
     sources = np.empty(shape=sampled_dt.shape, dtype=SRC_T)
 
     sources['kind'] = SRC_CKV_BETA1
@@ -344,6 +537,9 @@ def table_energy_loss_secondary_light_muon(
     track_azimuth,
     track_zenith,
     dt,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
 ):
     """Discrete-time track hypothesis that calculates dE/dx as the muon travels
     using splined tabulated data.
@@ -364,6 +560,17 @@ def table_energy_loss_secondary_light_muon(
     dt : float
         Time step in nanoseconds
 
+    max_dt : float or None
+        Largest time step in nanoseconds when sampling adaptively; adaptive
+        sampling is used only if both `max_dt` and `hit_dom_coords` are not
+        None (see :func:`adaptive_track_segments`)
+
+    step_ref_dist : float
+        Distance to nearest hit DOM (m) beyond which the adaptive time step
+        grows
+
+    hit_dom_coords : shape (n_hit_doms, 3) array or None
+
     Returns
     -------
     sources : shape (n_sources,) numpy.ndarray, dtype SRC_T
@@ -378,23 +585,41 @@ def table_energy_loss_secondary_light_muon(
         track_azimuth,
         track_zenith,
         dt,
+        max_dt,
+        step_ref_dist,
+        hit_dom_coords,
     )
     # TODO: Some stuff duplicated here from `table_energy_loss_muon` function,
     # can we find a way to not duplicate?
-    segment_length = dt * SPEED_OF_LIGHT_M_PER_NS
     length = MULEN_INTERP(track_energy)
 
-    sampled_dt = np.arange(dt*0.5, length/SPEED_OF_LIGHT_M_PER_NS, dt)
-    # At least one segment
-    if len(sampled_dt) == 0:
-        sampled_dt = np.array([length/2./SPEED_OF_LIGHT_M_PER_NS])
+    opposite_zenith = np.pi - track_zenith
+    opposite_azimuth = np.pi + track_azimuth
+    dir_sintheta = math.sin(opposite_zenith)
+
+    sampled_dt, segment_dt = get_track_segments(
+        x,
+        y,
+        z,
+        dir_sintheta * np.cos(opposite_azimuth),
+        dir_sintheta * np.sin(opposite_azimuth),
+        math.cos(opposite_zenith),
+        length,
+        dt,
+        max_dt,
+        step_ref_dist,
+        hit_dom_coords,
+    )
     segment_offsets = sampled_dt * SPEED_OF_LIGHT_M_PER_NS
+    segment_lengths = np.broadcast_to(
+        segment_dt * SPEED_OF_LIGHT_M_PER_NS, segment_offsets.shape
+    )
 
     sources['photons'] += SECONDARIES.get_light_output(
         muon_starting_energy=track_energy,
         total_track_length=length,
         segment_positions=segment_offsets,
-        segment_lengths=np.full_like(segment_offsets, fill_value=segment_length),
+        segment_lengths=segment_lengths,
     )
 
     return sources
@@ -408,6 +633,9 @@ def stopping_table_energy_loss_muon(
     track_azimuth,
     track_zenith,
     dt,
+    max_dt=None,
+    step_ref_dist=ADAPTIVE_STEP_REF_DIST,
+    hit_dom_coords=None,
 ):
     muon_max_length = 2.0e3  # meters
 
@@ -443,12 +671,15 @@ def stopping_table_energy_loss_muon(
         track_azimuth=track_azimuth,
         track_zenith=track_zenith,
         dt=dt,
+        max_dt=max_dt,
+        step_ref_dist=step_ref_dist,
+        hit_dom_coords=hit_dom_coords,
     )
 
     return sources
 
 
-def pegleg_eval(pegleg_idx, dt, const_e_loss, mmc=False):
+def pegleg_eval(pegleg_idx, dt, const_e_loss, mmc=False, pegleg_sources=None):
     """Convert a pegleg index into track energy in GeV.
 
     Parameters
@@ -458,13 +689,23 @@ def pegleg_eval(pegleg_idx, dt, const_e_loss, mmc=False):
     const_e_loss : bool
     mmc : bool
         do calculation accordint to MMC paper
+    pegleg_sources : array of dtype SRC_T, optional
+        If provided, the track length is taken from the light output of
+        ``pegleg_sources[:pegleg_idx]`` rather than assuming fixed time steps
+        `dt` (required for adaptively-sampled pegleg tracks)
 
     Returns
     -------
     muon_energy : float
 
     """
-    length = pegleg_idx * dt * SPEED_OF_LIGHT_M_PER_NS
+    if pegleg_sources is None:
+        length = pegleg_idx * dt * SPEED_OF_LIGHT_M_PER_NS
+    else:
+        length = (
+            np.sum(pegleg_sources['photons'][:pegleg_idx], dtype=np.float64)
+            / TRACK_PHOTONS_PER_M
+        )
     if const_e_loss:
         return length / TRACK_M_PER_GEV
     elif mmc:
@@ -473,3 +714,109 @@ def pegleg_eval(pegleg_idx, dt, const_e_loss, mmc=False):
         b = 0.00047
         return (np.exp(length*b) - 1)*a/b
     return MUEN_INTERP(length)
+
+
+def benchmark_adaptive_track_segments(
+    dt=1., max_dt=20., step_ref_dist=ADAPTIVE_STEP_REF_DIST, num_trials=100
+):
+    """Compare adaptive vs. fixed-step sampling of long, horizontal
+    `const_energy_loss_muon` tracks passing by a cluster of hit DeepCore DOMs.
+
+    Light conservation is checked exactly, while a distance-weighted light
+    proxy (exponential attenuation over an inverse-square falloff, summed over
+    sources) at each hit DOM stands in for the per-DOM expectation.
+    """
+    import time as time_module
+    from retro import DETECTOR_GEOM_FILE
+
+    geom = np.load(DETECTOR_GEOM_FILE)
+    rand = np.random.RandomState(0)
+
+    # Hit DOMs: those within 50 m of a point in DeepCore
+    all_doms = geom.reshape(-1, 3)
+    center = geom[35, 40]
+    hit_dom_coords = all_doms[
+        np.sqrt(np.sum((all_doms - center)**2, axis=1)) < 50
+    ].astype(np.float64)
+
+    def light_proxy(sources):
+        dist = np.sqrt(
+            (hit_dom_coords[:, 0:1] - sources['x'][np.newaxis, :])**2
+            + (hit_dom_coords[:, 1:2] - sources['y'][np.newaxis, :])**2
+            + (hit_dom_coords[:, 2:3] - sources['z'][np.newaxis, :])**2
+        )
+        return np.sum(
+            sources['photons'][np.newaxis, :] * np.exp(-dist/30.) / (dist**2 + 1),
+            axis=1,
+        )
+
+    # Trigger compilation before timing anything
+    adaptive_track_segments(0., 0., 0., 1., 0., 0., 10., dt, max_dt,
+                            step_ref_dist, hit_dom_coords)
+
+    energy = 800 / TRACK_M_PER_GEV
+    num_fixed = 0
+    num_adaptive = 0
+    max_rel_err = 0.
+    t_fixed = 0.
+    t_adaptive = 0.
+    for _ in range(num_trials):
+        azimuth = rand.uniform(0, 2*np.pi)
+        zenith = np.pi/2 + rand.uniform(-0.1, 0.1)
+        # Start 400 m "upstream" of the hit DOMs so track passes through them
+        dir_x = -np.sin(zenith) * np.cos(azimuth)
+        dir_y = -np.sin(zenith) * np.sin(azimuth)
+        dir_z = -np.cos(zenith)
+        offset = rand.uniform(-20, 20, size=3)
+        kw = dict(
+            time=0.,
+            x=center[0] - 400*dir_x + offset[0],
+            y=center[1] - 400*dir_y + offset[1],
+            z=center[2] - 400*dir_z + offset[2],
+            track_energy=energy,
+            track_azimuth=azimuth,
+            track_zenith=zenith,
+            dt=dt,
+        )
+        t0 = time_module.time()
+        fixed = const_energy_loss_muon(**kw)
+        t1 = time_module.time()
+        adaptive = const_energy_loss_muon(
+            max_dt=max_dt,
+            step_ref_dist=step_ref_dist,
+            hit_dom_coords=hit_dom_coords,
+            **kw
+        )
+        t2 = time_module.time()
+        t_fixed += t1 - t0
+        t_adaptive += t2 - t1
+
+        num_fixed += len(fixed)
+        num_adaptive += len(adaptive)
+
+        # Fixed steps drop a final partial segment, adaptive steps do not
+        total_fixed = np.sum(fixed['photons'], dtype=np.float64)
+        total_adaptive = np.sum(adaptive['photons'], dtype=np.float64)
+        assert abs(total_adaptive - total_fixed) <= dt * SPEED_OF_LIGHT_M_PER_NS * TRACK_PHOTONS_PER_M
+
+        proxy_fixed = light_proxy(fixed)
+        proxy_adaptive = light_proxy(adaptive)
+        max_rel_err = max(
+            max_rel_err,
+            np.max(np.abs(proxy_adaptive - proxy_fixed) / proxy_fixed),
+        )
+
+    print('hit DOMs: {}, track length: {:.0f} m'.format(
+        len(hit_dom_coords), energy*TRACK_M_PER_GEV))
+    print('mean num sources, fixed dt={} ns: {:.1f}'.format(dt, num_fixed/num_trials))
+    print('mean num sources, adaptive dt={}-{} ns: {:.1f}'.format(
+        dt, max_dt, num_adaptive/num_trials))
+    print('source reduction factor: {:.2f}'.format(num_fixed / num_adaptive))
+    print('max relative error of per-DOM light proxy: {:.2e}'.format(max_rel_err))
+    print('time per kernel call: fixed {:.3f} ms, adaptive {:.3f} ms'.format(
+        t_fixed/num_trials*1e3, t_adaptive/num_trials*1e3))
+    return num_fixed / num_adaptive, max_rel_err
+
+
+if __name__ == '__main__':
+    benchmark_adaptive_track_segments()
@@ -7,7 +7,7 @@ Base class for hypotheses and associated helper functions
 
 from __future__ import absolute_import, division, print_function
 
-__all__ = ["Hypo"]
+__all__ = ["Hypo", "DiscreteHypoAdapter"]
 
 __author__ = 'P. Eller, J.L. Lanfranchi'
 __license__ = '''Copyright 2017-2018 Philipp Eller and Justin L. Lanfranchi
@@ -24,7 +24,11 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.'''
 
-from collections import Mapping, OrderedDict
+from collections import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 from os.path import abspath, dirname
 import sys
 
@@ -39,6 +43,7 @@ if __name__ == '__main__' and __package__ is None:
     RETRO_DIR = dirname(dirname(abspath(__file__)))
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
+from retro.const import PARAM_NAMES, PEGLEG_PARAM_NAMES, SCALING_PARAM_NAMES
 from retro.utils.misc import check_kwarg_keys, deduce_sph_pairs
 from retro.utils.get_arg_names import get_arg_names
 
@@ -240,6 +245,10 @@ class Hypo(object):
             """Must be replaced with your own callable"""
             raise NotImplementedError()
 
+        def _get_discrete_sources(**kwargs): # pylint: disable=unused-argument
+            """Must be replaced with your own callable"""
+            raise NotImplementedError()
+
         # -- Define class attributes to store the above values -- #
 
         self.param_mapping = param_mapping
@@ -313,6 +322,35 @@ class Hypo(object):
         self._get_sources = _get_sources
         """callable : inheriting classes must replace"""
 
+        self._get_discrete_sources = _get_discrete_sources
+        """callable : inheriting classes must replace; takes the same arguments as
+        `_get_sources` but returns (generic_sources, pegleg_sources,
+        scaling_sources), each an ndarray of dtype SRC_T"""
+
+    def set_params(self, **kwargs):
+        """Record external param values and map these onto internal param names
+        and values.
+
+        Parameters
+        ----------
+        **kwargs
+            Keyword arguments keyed by (at least) external param names; extra kwargs are
+            ignored
+
+        """
+        for external_param_name in self.external_param_names:
+            try:
+                self.external_params[external_param_name] = kwargs[external_param_name]
+            except KeyError:
+                print(
+                    'Missing param "{}" in passed kwargs {}'
+                    .format(external_param_name, kwargs)
+                )
+                raise
+
+        # Map external param names/values onto internal param names/values
+        self.internal_params = self.param_mapping(**self.external_params)
+
     def get_sources(self, **kwargs):
         """Get sources corresponding to hypothesis parameters when called via::
 
@@ -336,18 +374,7 @@ class Hypo(object):
 
         """
         self.num_calls += 1
-        for external_param_name in self.external_param_names:
-            try:
-                self.external_params[external_param_name] = kwargs[external_param_name]
-            except KeyError:
-                print(
-                    'Missing param "{}" in passed kwargs {}'
-                    .format(external_param_name, kwargs)
-                )
-                raise
-
-        # Map external param names/values onto internal param names/values
-        self.internal_params = self.param_mapping(**self.external_params)
+        self.set_params(**kwargs)
 
         # Call internal function
         try:
@@ -373,6 +400,27 @@ class Hypo(object):
             self.pegleg_generators
         )
 
+    def get_discrete_sources(self, **kwargs):
+        """Get sources corresponding to hypothesis parameters, collated into the
+        three arrays taken by the likelihood function generated by
+        :func:`retro.tables.pexp_5d.generate_pexp_and_llh_functions`.
+
+        Parameters
+        ----------
+        **kwargs
+            Keyword arguments keyed by (at least) external param names; extra kwargs are
+            ignored (and not passed through to the internal `_get_discrete_sources`
+            function).
+
+        Returns
+        -------
+        generic_sources, pegleg_sources, scaling_sources : ndarrays of dtype SRC_T
+
+        """
+        self.num_calls += 1
+        self.set_params(**kwargs)
+        return self._get_discrete_sources(**self.internal_params)
+
     def get_energy(self, pegleg_indices=None, scalefactors=None):
         """Get energy (in units of GeV) from current parameter values. Must
         implement/override in subclasses."""
@@ -392,3 +440,138 @@ class Hypo(object):
 
         """
         raise NotImplementedError()
+
+
+class DiscreteHypoAdapter(object):
+    """
+    Present a :class:`Hypo` (including :class:`retro.aggregate_hypo.AggregateHypo`)
+    via the same interface as :class:`retro.hypo.discrete_hypo.DiscreteHypo`, such
+    that it can be used as the hypothesis handler of :class:`retro.reco.Reco`.
+
+    At most one component hypothesis may be pegleg (i.e., a muon with fixed track
+    length) and at most one may be scaling (with a single scalefactor), as these are
+    the forms the likelihood function handles.
+
+    Parameters
+    ----------
+    hypo : Hypo
+        External param names must all be in `retro.const.PARAM_NAMES`
+
+    """
+    def __init__(self, hypo):
+        hypos = getattr(hypo, "hypos", (hypo,))
+
+        pegleg_hypos = [h for h in hypos if getattr(h, "fixed_track_length", 0) > 0]
+        scaling_hypos = [h for h in hypos if h.max_num_scalefactors]
+        if len(pegleg_hypos) > 1:
+            raise ValueError("At most one pegleg hypothesis is supported")
+        if len(scaling_hypos) > 1 or any(
+            h.max_num_scalefactors > 1 for h in scaling_hypos
+        ):
+            raise ValueError("At most one scalefactor is supported")
+
+        unknown = set(hypo.external_param_names).difference(PARAM_NAMES)
+        if unknown:
+            raise ValueError(
+                "External params {} not in PARAM_NAMES".format(sorted(unknown))
+            )
+
+        self.hypo = hypo
+
+        # Attributes that mimic `DiscreteHypo` where they are used by `Reco`
+        self.pegleg_kernel = pegleg_hypos[0] if pegleg_hypos else None
+        self.scaling_kernel = scaling_hypos[0] if scaling_hypos else None
+        self.generic_kernels_kwargs = []
+        self.pegleg_kernel_kwargs = {}
+        if self.pegleg_kernel is not None:
+            self.pegleg_kernel_kwargs["dt"] = (
+                self.pegleg_kernel.continuous_loss_model_kwargs["time_step"]
+            )
+        self.scaling_kernel_kwargs = {}
+
+        # Order param names as `DiscreteHypo` does: by component hypo (generic
+        # ones first, then pegleg, then scaling) and by `PARAM_NAMES` within each
+        ordered_hypos = (
+            [h for h in hypos if h not in pegleg_hypos + scaling_hypos]
+            + pegleg_hypos
+            + scaling_hypos
+        )
+        opt_param_names = []
+        for component_hypo in ordered_hypos:
+            for param_name in PARAM_NAMES:
+                if (
+                    param_name in component_hypo.external_param_names
+                    and param_name not in opt_param_names
+                ):
+                    opt_param_names.append(param_name)
+        self._opt_param_names = tuple(opt_param_names)
+        self.fixed_params = OrderedDict()
+
+    @property
+    def opt_param_names(self):
+        """tuple of strings : Hypothesis parameter names to be handled by a
+        generic optimizer, i.e., non-fixed and not including pegleg and
+        scaling parameters"""
+        return tuple(n for n in self._opt_param_names if n not in self.fixed_params)
+
+    @property
+    def hypo_param_names(self):
+        """tuple of strings : Fixed and free hypothesis parameter names"""
+        return self._opt_param_names
+
+    @property
+    def all_param_names(self):
+        """list of strings : All parameter names: fixed, free, pegleg, and
+        scaling parameters"""
+        all_param_names = list(self._opt_param_names)
+        if self.pegleg_kernel is not None:
+            for param_name in PEGLEG_PARAM_NAMES:
+                if param_name not in all_param_names:
+                    all_param_names.append(param_name)
+        if self.scaling_kernel is not None:
+            for param_name in SCALING_PARAM_NAMES:
+                if param_name not in all_param_names:
+                    all_param_names.append(param_name)
+        return all_param_names
+
+    @property
+    def n_params(self):
+        """int : Number of parameters (including all parameters kinds)"""
+        return len(self.all_param_names)
+
+    @property
+    def n_hypo_params(self):
+        """int : Number of hypothesis parameters"""
+        return len(self.hypo_param_names)
+
+    @property
+    def n_opt_params(self):
+        """int: Number of hypothesis parameters to be handled by a generic optimizer"""
+        return len(self.opt_param_names)
+
+    def get_sources(self, hypo):
+        """Evaluate the hypothesis given particular parameters.
+
+        Parameters
+        ----------
+        hypo : dict
+
+        Returns
+        -------
+        generic_sources, pegleg_sources, scaling_sources : ndarrays of dtype SRC_T
+
+        """
+        hypo.update(self.fixed_params)
+        return self.hypo.get_discrete_sources(**hypo)
+
+    def get_generic_sources(self, hypo):
+        """Get only the generic sources; see `get_sources`"""
+        return self.get_sources(hypo)[0]
+
+    def get_pegleg_sources(self, hypo):
+        """Get only the pegleg sources; see `get_sources`"""
+        return self.get_sources(hypo)[1]
+
+    def get_scaling_sources(self, hypo):
+        """Get only the scaling sources; see `get_sources`"""
+        return self.get_sources(hypo)[2]
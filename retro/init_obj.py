@@ -11,7 +11,10 @@ from __future__ import absolute_import, division, print_function
 
 __all__ = [
     'setup_dom_tables',
+    'HYPO_BACKENDS',
     'setup_discrete_hypo',
+    'setup_future_hypo',
+    'setup_hypo',
     'get_hits',
     'parse_args',
 ]
@@ -53,11 +56,15 @@ if __name__ == '__main__' and __package__ is None:
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
 from retro import const, load_pickle
+from retro.aggregate_hypo import AggregateHypo
+from retro.cascade_hypo import CascadeHypo, CascadeModel
 from retro.hypo.discrete_hypo import DiscreteHypo
 from retro.hypo import discrete_cascade_kernels as dck
 from retro.hypo import discrete_muon_kernels as dmk
 from retro.i3info.angsens_model import load_angsens_model
+from retro.hypo_future import DiscreteHypoAdapter
 from retro.i3info.extract_gcd import extract_gcd
+from retro.muon_hypo import ContinuousLossModel, MuonHypo
 from retro.retro_types import (
     HIT_T, SD_INDEXER_T, HITS_SUMMARY_T, TriggerConfigID, TriggerTypeID, TriggerSourceID
 )
@@ -69,6 +76,11 @@ from retro.utils.misc import expand, nsort_key_func, quantize
 
 QUANTIZE_VEC = numba.vectorize(cache=True, target="cpu")(quantize)
 
+HYPO_BACKENDS = ('discrete', 'future')
+"""Implementations of hypotheses: "discrete" uses
+`retro.hypo.discrete_hypo.DiscreteHypo` with the kernels in `retro.hypo`, while
+"future" uses the `retro.hypo_future.Hypo` classes (see `setup_future_hypo`)"""
+
 
 def setup_dom_tables(
     dom_tables_kind,
@@ -281,7 +293,13 @@ def setup_tdi_tables(tdi=None, mmap=False):
     return tuple(tdi_tables), tuple(tdi_metas)
 
 
-def setup_discrete_hypo(cascade_kernel=None, track_kernel=None, track_time_step=None):
+def setup_discrete_hypo(
+    cascade_kernel=None,
+    track_kernel=None,
+    track_time_step=None,
+    track_max_time_step=None,
+    track_step_ref_dist=None,
+):
     """Convenience function for instantiating a discrete hypothesis with
     specified kernel(s).
 
@@ -291,6 +309,14 @@ def setup_discrete_hypo(cascade_kernel=None, track_kernel=None, track_time_step=
         One of {"point", "point_ckv", or "one_dim"}
     track_kernel : string or None
     track_time_step : float or None
+    track_max_time_step : float or None
+        If not None, sample the track adaptively with time steps between
+        `track_time_step` and `track_max_time_step`, growing with distance to
+        the nearest hit DOM. Coordinates of hit DOMs must be set per event in
+        the "hit_dom_coords" item of the track kernel's kwargs.
+    track_step_ref_dist : float or None
+        Distance (m) beyond which adaptive time steps grow; if None, defaults
+        to `retro.hypo.discrete_muon_kernels.ADAPTIVE_STEP_REF_DIST`
 
     Returns
     -------
@@ -324,6 +350,14 @@ def setup_discrete_hypo(cascade_kernel=None, track_kernel=None, track_time_step=
         print('track_kernel:', track_kernel)
         track_kernel_func = getattr(dmk, track_kernel + '_muon')
         track_kernel_kwargs = dict(dt=track_time_step)
+        if track_max_time_step is not None:
+            if track_step_ref_dist is None:
+                track_step_ref_dist = dmk.ADAPTIVE_STEP_REF_DIST
+            track_kernel_kwargs.update(
+                max_dt=track_max_time_step,
+                step_ref_dist=track_step_ref_dist,
+                hit_dom_coords=None,
+            )
         if track_kernel.startswith('pegleg'):
             if pegleg_kernel is not None:
                 raise ValueError('can only have one pegleg kernel')
@@ -331,7 +365,7 @@ def setup_discrete_hypo(cascade_kernel=None, track_kernel=None, track_time_step=
             pegleg_kernel_kwargs = track_kernel_kwargs
         else:
             generic_kernels.append(track_kernel_func)
-            generic_kernels_kwargs.append(dict(dt=track_time_step))
+            generic_kernels_kwargs.append(track_kernel_kwargs)
 
     hypo_handler = DiscreteHypo(
         generic_kernels=generic_kernels,
@@ -345,6 +379,170 @@ def setup_discrete_hypo(cascade_kernel=None, track_kernel=None, track_time_step=
     return hypo_handler
 
 
+def setup_future_hypo(
+    cascade_kernel=None,
+    track_kernel=None,
+    track_time_step=None,
+    track_max_time_step=None,
+    track_step_ref_dist=None,
+):
+    """Instantiate the `retro.hypo_future.Hypo`-based equivalent of the
+    discrete hypothesis that `setup_discrete_hypo` produces for the same
+    arguments, wrapped to present the same interface.
+
+    Parameters
+    ----------
+    cascade_kernel : string or None
+        Any of `retro.hypo.discrete_cascade_kernels.CASCADE_KINDS` except the
+        "*one_dim_delta" kernels
+    track_kernel : string or None
+        One of "pegleg" or "const_energy_loss"
+    track_time_step : float or None
+    track_max_time_step : None
+        Adaptive track sampling is not implemented for this backend
+    track_step_ref_dist : None
+
+    Returns
+    -------
+    hypo_handler : retro.hypo_future.DiscreteHypoAdapter
+
+    """
+    if track_max_time_step is not None or track_step_ref_dist is not None:
+        raise NotImplementedError(
+            'Adaptive track sampling is not implemented for the "future" hypo'
+            ' backend'
+        )
+
+    hypos = []
+    hypo_names = []
+
+    if cascade_kernel is not None:
+        assert cascade_kernel in dck.CASCADE_KINDS, str(cascade_kernel)
+        kind = cascade_kernel
+        is_scaling = kind.startswith('scaling_')
+        if is_scaling:
+            kind = kind[len('scaling_'):]
+        is_aligned = kind.startswith('aligned_')
+        if is_aligned:
+            kind = kind[len('aligned_'):]
+
+        param_mapping = dict(x='x', y='y', z='z', time='time')
+        if not is_scaling:
+            param_mapping['cascade_energy'] = 'energy'
+
+        if kind == 'point':
+            model = CascadeModel.spherical
+            num_sources = 1
+        elif kind in ('point_ckv', 'one_dim'):
+            model = CascadeModel.one_dim_v1
+            if kind == 'point_ckv':
+                num_sources = 1
+            elif is_scaling:
+                num_sources = 100
+            else:
+                num_sources = -1
+            if is_aligned:
+                param_mapping['track_azimuth'] = 'azimuth'
+                param_mapping['track_zenith'] = 'zenith'
+            else:
+                param_mapping['cascade_azimuth'] = 'azimuth'
+                param_mapping['cascade_zenith'] = 'zenith'
+        else:
+            raise NotImplementedError(
+                'cascade kernel "{}" not implemented for the "future" hypo backend'
+                .format(cascade_kernel)
+            )
+
+        hypos.append(
+            CascadeHypo(
+                model=model,
+                param_mapping=param_mapping,
+                num_sources=num_sources,
+                scaling_proto_energy=dck.SCALING_CASCADE_ENERGY if is_scaling else None,
+            )
+        )
+        hypo_names.append('cascade')
+
+    if track_kernel is not None:
+        assert track_kernel in dmk.MUON_KINDS, str(track_kernel)
+        if track_kernel == 'pegleg':
+            hypos.append(
+                MuonHypo(
+                    continuous_loss_model=ContinuousLossModel.all_avg_const,
+                    stochastic_loss_model=None,
+                    param_mapping=dict(
+                        x='x',
+                        y='y',
+                        z='z',
+                        time='time',
+                        track_azimuth='azimuth',
+                        track_zenith='zenith',
+                    ),
+                    fixed_track_length=(
+                        dmk.PEGLEG_NUM_SEGMENTS * track_time_step
+                        * const.SPEED_OF_LIGHT_M_PER_NS
+                    ),
+                    pegleg_step_size=1,
+                    continuous_loss_model_kwargs=dict(time_step=track_time_step),
+                )
+            )
+        elif track_kernel == 'const_energy_loss':
+            def track_param_mapping(
+                x, y, z, time, track_azimuth, track_zenith, track_energy
+            ):
+                """Map energy onto length via constant energy loss"""
+                return dict(
+                    x=x,
+                    y=y,
+                    z=z,
+                    time=time,
+                    azimuth=track_azimuth,
+                    zenith=track_zenith,
+                    track_length=track_energy * const.TRACK_M_PER_GEV,
+                )
+
+            hypos.append(
+                MuonHypo(
+                    continuous_loss_model=ContinuousLossModel.all_avg_const,
+                    stochastic_loss_model=None,
+                    param_mapping=track_param_mapping,
+                    continuous_loss_model_kwargs=dict(time_step=track_time_step),
+                )
+            )
+        else:
+            raise NotImplementedError(
+                'track kernel "{}" not implemented for the "future" hypo backend'
+                .format(track_kernel)
+            )
+        hypo_names.append('track')
+
+    return DiscreteHypoAdapter(AggregateHypo(hypos=hypos, hypo_names=hypo_names))
+
+
+def setup_hypo(backend='discrete', **kwargs):
+    """Instantiate a hypothesis handler using the specified `backend`.
+
+    Parameters
+    ----------
+    backend : str
+        One of `HYPO_BACKENDS`
+    **kwargs
+        Passed to `setup_discrete_hypo` or `setup_future_hypo`
+
+    Returns
+    -------
+    hypo_handler
+
+    """
+    if backend == 'discrete':
+        return setup_discrete_hypo(**kwargs)
+    if backend == 'future':
+        return setup_future_hypo(**kwargs)
+    raise ValueError(
+        'Invalid hypo backend "{}"; must be one of {}'.format(backend, HYPO_BACKENDS)
+    )
+
+
 def get_events(
     events_root,
     gcd_dir,
@@ -40,7 +40,11 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.'''
 
-from collections import Iterable, OrderedDict
+from collections import OrderedDict
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
 from enum import IntEnum
 from math import cos, sin
 from os.path import abspath, dirname, join
@@ -731,6 +735,7 @@ class MuonHypo(Hypo):
         if fixed_track_length <= 0:
             fixed_track_length = 0
 
+        @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
         def get_continuous_sources(x, y, z, time, azimuth, zenith, track_length):
             """
 
@@ -747,9 +752,9 @@ class MuonHypo(Hypo):
                 return EMPTY_SOURCES
 
             sampled_dt = np.arange(
-                start=time_step*0.5,
-                stop=track_length / SPEED_OF_LIGHT_M_PER_NS,
-                step=time_step,
+                time_step*0.5,
+                track_length / SPEED_OF_LIGHT_M_PER_NS,
+                time_step,
             )
 
             # At least one segment
@@ -774,20 +779,21 @@ class MuonHypo(Hypo):
             dir_z = dir_costheta
 
             sources = np.empty(shape=sampled_dt.shape, dtype=SRC_T)
-
-            sources['kind'] = SRC_CKV_BETA1
-            sources['time'] = time + sampled_dt
-            sources['x'] = x + sampled_dt * (dir_x * SPEED_OF_LIGHT_M_PER_NS)
-            sources['y'] = y + sampled_dt * (dir_y * SPEED_OF_LIGHT_M_PER_NS)
-            sources['z'] = z + sampled_dt * (dir_z * SPEED_OF_LIGHT_M_PER_NS)
-            sources['photons'] = photons_per_segment
-
-            sources['dir_costheta'] = dir_costheta
-            sources['dir_sintheta'] = dir_sintheta
-
-            sources['dir_phi'] = opposite_azimuth
-            sources['dir_cosphi'] = dir_cosphi
-            sources['dir_sinphi'] = dir_sinphi
+            for i, dt in enumerate(sampled_dt):
+                src = sources[i]
+                src['kind'] = SRC_CKV_BETA1
+                src['time'] = time + dt
+                src['x'] = x + dt * (dir_x * SPEED_OF_LIGHT_M_PER_NS)
+                src['y'] = y + dt * (dir_y * SPEED_OF_LIGHT_M_PER_NS)
+                src['z'] = z + dt * (dir_z * SPEED_OF_LIGHT_M_PER_NS)
+                src['photons'] = photons_per_segment
+
+                src['dir_costheta'] = dir_costheta
+                src['dir_sintheta'] = dir_sintheta
+
+                src['dir_phi'] = opposite_azimuth
+                src['dir_cosphi'] = dir_cosphi
+                src['dir_sinphi'] = dir_sinphi
 
             return sources
 
@@ -832,6 +838,31 @@ class MuonHypo(Hypo):
 
                 return (EMPTY_SOURCES,), (SrcHandling.none,), 1, pegleg_generators
 
+            def _get_discrete_sources(x, y, z, time, azimuth, zenith):
+                """
+                Parameters
+                ----------
+                x, y, z, time, azimuth, zenith : scalars
+
+                Returns
+                -------
+                generic_sources : EMPTY_SOURCES
+                pegleg_sources : ndarray of dtype SRC_T
+                    All sources to be iterated through for pegleg process
+                scaling_sources : EMPTY_SOURCES
+
+                """
+                pegleg_sources = get_continuous_sources(
+                    x=x,
+                    y=y,
+                    z=z,
+                    time=time,
+                    azimuth=azimuth,
+                    zenith=zenith,
+                    track_length=fixed_track_length,
+                )
+                return EMPTY_SOURCES, pegleg_sources, EMPTY_SOURCES
+
         else:
 
             def _get_sources(x, y, z, time, azimuth, zenith, track_length):
@@ -864,7 +895,32 @@ class MuonHypo(Hypo):
                     dummy_pegleg_gens
                 )
 
+            def _get_discrete_sources(x, y, z, time, azimuth, zenith, track_length):
+                """
+                Parameters
+                ----------
+                x, y, z, time, azimuth, zenith, track_length : scalars
+
+                Returns
+                -------
+                generic_sources : ndarray of dtype SRC_T
+                pegleg_sources : EMPTY_SOURCES
+                scaling_sources : EMPTY_SOURCES
+
+                """
+                generic_sources = get_continuous_sources(
+                    x=x,
+                    y=y,
+                    z=z,
+                    time=time,
+                    azimuth=azimuth,
+                    zenith=zenith,
+                    track_length=track_length,
+                )
+                return generic_sources, EMPTY_SOURCES, EMPTY_SOURCES
+
         self._get_sources = _get_sources
+        self._get_discrete_sources = _get_discrete_sources
 
     def get_energy(self, pegleg_indices=None, scalefactors=None): # pylint: disable=unused-argument
         """Retrieve the estimated energy of the last-produced muon.
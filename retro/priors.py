@@ -25,6 +25,9 @@ __all__ = [
     "get_point_estimate",
     "define_prior_from_prefit",
     "define_generic_prior",
+    "get_interp_prior_tables",
+    "get_interp_prior_pdf",
+    "prior_depends_on_event",
     "get_prior_func",
 ]
 
@@ -168,6 +171,12 @@ for _dim in ("time", "x", "y", "z", "azimuth", "zenith", "coszen"):
             )
         )
 
+_INTERP_PRIOR_TABLES = {}
+"""Cache for `get_interp_prior_tables`"""
+
+_INTERP_PRIOR_PDFS = {}
+"""Cache for `get_interp_prior_pdf`"""
+
 
 def get_point_estimate(val, estimator, expect_scalar=True):
     """Retrieve a scalar for a reconstructed value.
@@ -327,6 +336,7 @@ def define_prior_from_prefit(
     misc["prior_file_sha256"] = prior_sha256[:10]
     misc["reco_val"] = reco_val
     misc["split_val"] = split_val
+    misc["split_bin"] = edges if split_by_reco_param is not None else None
 
     return prior_def, misc
 
@@ -369,6 +379,114 @@ def define_generic_prior(kind, extents, kwargs):
     return prior_def
 
 
+def get_interp_prior_tables(kind, x, pdf, key=None):
+    """Get the cumulative distribution function (cdf) of an interpolated prior
+    and a spline interpolator for its inverse.
+
+    Tables are cached by `key` (if not None) so that priors for different
+    events that shift the same distribution (e.g., a pre-fit's error
+    distribution) are only computed once.
+
+    Parameters
+    ----------
+    kind : str
+        `PRI_INTERP` or `PRI_AZ_INTERP`; for the latter, `x` is stretched to
+        cover exactly 2pi
+    x, pdf : arrays
+        Sample points and values of the (not necessarily normalized) pdf
+    key : hashable, optional
+
+    Returns
+    -------
+    x : array
+    cdf : array
+        Normalized to go from 0 to 1
+    isf_interp : scipy.interpolate.UnivariateSpline
+        Maps values in [0, 1] to `x`
+
+    """
+    if key is not None and key in _INTERP_PRIOR_TABLES:
+        return _INTERP_PRIOR_TABLES[key]
+
+    if kind == PRI_AZ_INTERP:
+        # Ensure x covers exactly the same distance as [0, 2pi)
+        x = x.min() + (x - x.min()) * 2 * np.pi / (x.max() - x.min())
+
+    # Compute cdf via (cumulative) trapezoidal-rule integration; ensure first
+    # value is exactly 0 and last value is exactly 1
+    cdf = np.concatenate([[0.], np.cumsum(0.5 * (pdf[1:] + pdf[:-1]) * np.diff(x))])
+    cdf /= cdf[-1]
+
+    # Create smooth spline interpolator for isf (inverse of cdf)
+    isf_interp = interpolate.UnivariateSpline(x=cdf, y=x, ext="raise", s=0)
+
+    tables = (x, cdf, isf_interp)
+    if key is not None:
+        _INTERP_PRIOR_TABLES[key] = tables
+    return tables
+
+
+def get_interp_prior_pdf(prior_def):
+    """Get a function evaluating the pdf of an interpolated prior.
+
+    The spline interpolating the pdf is fit to the distribution before it is
+    shifted by the reco value and is cached, so priors for different events
+    that shift the same distribution share a single spline.
+
+    Parameters
+    ----------
+    prior_def : tuple
+        `(kind, prior_args)` as returned by `define_prior_from_prefit`, with
+        `kind` one of `PRI_INTERP` or `PRI_AZ_INTERP`
+
+    Returns
+    -------
+    pdf_func : callable
+        Maps parameter values to (not necessarily normalized) pdf values;
+        raises a ValueError for values outside the range of the prior's `x`
+
+    """
+    kind, prior_args = prior_def
+    reco_val, prior_sha256 = prior_args[1:3]
+    x, pdf = prior_args[-4:-2]
+
+    key = (kind, prior_sha256, pdf.tobytes())
+    pdf_interp = _INTERP_PRIOR_PDFS.get(key, None)
+    if pdf_interp is None:
+        pdf_interp = interpolate.UnivariateSpline(
+            x=x - reco_val, y=pdf, ext="raise", s=0
+        )
+        _INTERP_PRIOR_PDFS[key] = pdf_interp
+
+    def pdf_func(vals):
+        return pdf_interp(vals - reco_val)
+
+    return pdf_func
+
+
+def prior_depends_on_event(dim_name, kind=None, extents=None, **kwargs):  # pylint: disable=unused-argument
+    """Whether the prior function returned by `get_prior_func` for a given
+    prior specification depends on the event (e.g. on its time range or on
+    pre-fits), i.e. whether it must be regenerated for each event.
+
+    Parameters
+    ----------
+    dim_name : str
+    kind, extents, kwargs
+        As passed to `get_prior_func`
+
+    Returns
+    -------
+    depends_on_event : bool
+
+    """
+    if kind in (PRI_OSCNEXT_L5_V1_PREFIT, PRI_OSCNEXT_L5_V1_CRS):
+        return True
+    if dim_name == "time":
+        return kind in (None, PRI_TIME_RANGE) or extents is None
+    return False
+
+
 def get_prior_func(dim_num, dim_name, event, kind=None, extents=None, **kwargs):
     """Generate prior function given a prior definition and the actual event
 
@@ -385,6 +503,10 @@ def get_prior_func(dim_num, dim_name, event, kind=None, extents=None, **kwargs):
     Returns
     -------
     prior_func : callable
+        `prior_func(cube)` maps `cube[dim_num]` from [0, 1] onto the prior's
+        range in place. All transforms are vectorized, so `cube[dim_num]` can
+        also be an array of values for many points (e.g., pass the transpose
+        of a shape-(n_points, n_dims) array to transform all points at once)
     prior_def : tuple
     misc : OrderedDict
 
@@ -469,7 +591,7 @@ def get_prior_func(dim_num, dim_name, event, kind=None, extents=None, **kwargs):
 
     misc = OrderedDict()
 
-    if kind in (PRI_UNIFORM, PRI_COSINE):
+    if kind in (PRI_UNIFORM, PRI_LOG_UNIFORM, PRI_COSINE):
         (low, low_absrel), (high, high_absrel) = extents
         if not low_absrel == high_absrel == Bound.ABS:
             raise ValueError(
@@ -543,6 +665,7 @@ def get_prior_func(dim_num, dim_name, event, kind=None, extents=None, **kwargs):
             cube[n] = norm * np.exp(-((cube[n] - mean) / stddev) ** 2)
 
     elif kind in (PRI_INTERP, PRI_AZ_INTERP):
+        reco_val = prior_args[1]
         x, pdf, low, high = prior_args[-4:]
 
         if (
@@ -562,66 +685,50 @@ def get_prior_func(dim_num, dim_name, event, kind=None, extents=None, **kwargs):
             if not (np.isclose(low, 0) and np.isclose(high, 2 * np.pi)):
                 raise ValueError("az range [low, high) must be [0, 2pi)")
 
-            # Ensure x covers exactly the same distance as (low, high) defines
-            highlow_range = high - low
-            x = x.min() + (x - x.min()) * highlow_range / (x.max() - x.min())
-
-            # Compute cumulative distribution function (cdf) via trapezoidal-rule
-            # integration
-            cdf = np.array([np.trapz(x=x[:n], y=pdf[:n]) for n in range(1, len(x) + 1)])
-            # Ensure first value in cdf is exactly 0
-            cdf -= cdf[0]
-            # Ensure last value in cdf is exactly 1
-            cdf /= cdf[-1]
+        # Tables for the error distribution (i.e., before shifting by the reco
+        # value) are the same for all events using it
+        x0, cdf0, isf_interp = get_interp_prior_tables(
+            kind=kind,
+            x=x - reco_val,
+            pdf=pdf,
+            key=(kind, prior_args[2], misc.get("split_bin")),
+        )
 
-            # Create smooth spline interpolator for isf (inverse of cdf)
-            isf_interp = interpolate.UnivariateSpline(x=cdf, y=x, ext="raise", s=0)
+        if kind == PRI_AZ_INTERP:
 
-            def prior_func(cube, n=dim_num, isf_interp=isf_interp):
-                cube[n] = isf_interp(cube[n]) % (2 * np.pi)
+            def prior_func(cube, n=dim_num, isf_interp=isf_interp, reco_val=reco_val):
+                cube[n] = (isf_interp(cube[n]) + reco_val) % (2 * np.pi)
 
         else:
-            # If x covers _more_ than the allowed [low, high] range, resample the
-            # pdf in the allowed range (expected to occur for binned zenith and
-            # coszen error distributions)
-            if x.min() < low or x.max() > high:
-                x_orig = x
-                pdf_orig = pdf
-                x = np.linspace(
-                    start=max(low, x_orig.min()),
-                    stop=min(high, x_orig.max()),
-                    num=len(x_orig),
-                ).squeeze()
-                pdf = np.interp(x=x, xp=x_orig, fp=pdf_orig)
-                integral = np.trapz(x=x, y=pdf)
-                try:
-                    pdf /= integral
-                except:
-                    print("low, high:", low, high)
-                    print("x_orig.min, x_orig.max:", x_orig.min(), x_orig.max())
-                    print("len(x):", len(x))
-                    print("x.shape:", x.shape)
-                    print("x:", x)
-                    print("x_orig.shape:", x_orig.shape)
-                    print("x_orig:", x_orig)
-                    print("pdf_orig.shape:", pdf_orig.shape)
-                    print("pdf.shape:", pdf.shape)
-                    print("integral.shape:", integral.shape)
-                    raise
-
-            # Compute cumulative distribution function (cdf) via trapezoidal-rule
-            # integration
-            cdf = np.array([np.trapz(x=x[:n], y=pdf[:n]) for n in range(1, len(x) + 1)])
-            # Ensure first value in cdf is exactly 0
-            cdf -= cdf[0]
-            # Ensure last value in cdf is exactly 1
-            cdf /= cdf[-1]
-
-            # Create smooth spline interpolator for isf (inverse of cdf)
-            isf_interp = interpolate.UnivariateSpline(x=cdf, y=x, ext="raise", s=0)
-
-            def prior_func(cube, n=dim_num, isf_interp=isf_interp):
-                cube[n] = isf_interp(cube[n])
+            # If x covers _more_ than the allowed [low, high] range, sample
+            # only the part of the cdf that maps into the allowed range
+            # (expected to occur for binned zenith and coszen error
+            # distributions)
+            low0 = max(low - reco_val, x0[0])
+            high0 = min(high - reco_val, x0[-1])
+            cdf_low, cdf_high = np.interp([low0, high0], x0, cdf0)
+            cdf_width = cdf_high - cdf_low
+            if not cdf_width > 0:
+                raise ValueError(
+                    'Dim "{}", prior kind "{}" has no probability in [low, high]'
+                    " range = [{}, {}]".format(dim_name, kind, low, high)
+                )
+
+            def prior_func(
+                cube,
+                n=dim_num,
+                isf_interp=isf_interp,
+                cdf_low=cdf_low,
+                cdf_width=cdf_width,
+                low=low0 + reco_val,
+                high=high0 + reco_val,
+                reco_val=reco_val,
+            ):
+                cube[n] = np.clip(
+                    isf_interp(cdf_low + cube[n] * cdf_width) + reco_val,
+                    a_min=low,
+                    a_max=high,
+                )
 
     elif hasattr(stats.distributions, kind):
         dist_args = prior_args[:-2]
@@ -13,7 +13,17 @@ __all__ = [
     "CRS_STOP_FLAGS",
     "REPORT_AFTER",
     "CART_DIMS",
+    "GRAD_STEP_SIZES",
+    "LLH_CACHE_RESOLUTION",
+    "WARM_START_MAX_POINTS",
+    "LLHRecorder",
+    "test_llh_recorder",
+    "CHECKPOINT_FNAME",
+    "DFLT_ROUTES",
+    "get_event_features",
     "Reco",
+    "test_llh_cache",
+    "test_checkpoint_resume",
     "get_multinest_meta",
     "main",
 ]
@@ -35,22 +45,37 @@ limitations under the License."""
 
 
 from argparse import ArgumentParser
-from collections import OrderedDict
+from collections import OrderedDict, deque
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+import hashlib
+import heapq
+from multiprocessing.pool import ThreadPool
+import os
 from os.path import abspath, dirname, isdir, isfile, join
 from shutil import rmtree
 import sys
 from tempfile import mkdtemp
+import threading
 import time
 import traceback
 
 import numpy as np
 from six import string_types
+from six.moves import cPickle as pickle
 
 if __name__ == "__main__" and __package__ is None:
     RETRO_DIR = dirname(dirname(abspath(__file__)))
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
-from retro import __version__, MissingOrInvalidPrefitError, init_obj
+from retro import (
+    __version__,
+    LLHBudgetExhaustedError,
+    MissingOrInvalidPrefitError,
+    init_obj,
+)
 from retro.hypo.discrete_cascade_kernels import SCALING_CASCADE_ENERGY
 from retro.hypo.discrete_muon_kernels import pegleg_eval
 from retro.priors import (
@@ -63,9 +88,21 @@ from retro.priors import (
     PRISPEC_OSCNEXT_CRS_MN,
     Bound,
     get_prior_func,
+    prior_depends_on_event,
 )
 from retro.retro_types import EVT_DOM_INFO_T, EVT_HIT_INFO_T, FitStatus
-from retro.tables.pexp_5d import generate_pexp_and_llh_functions
+from retro.tables.downsample_tables import (
+    DOM_TABLE_DIMS,
+    TDI_TABLE_DIMS,
+    downsample_tdi_table,
+    get_factors,
+)
+from retro.tables.pexp_5d import (
+    generate_pexp_and_llh_functions,
+    get_event_hits,
+    get_llh_batch,
+    get_llh_workspace,
+)
 from retro.utils.geom import (
     rotate_points,
     add_vectors,
@@ -110,6 +147,42 @@ REPORT_AFTER = 100
 
 CART_DIMS = ("x", "y", "z", "time")
 
+GRAD_STEP_SIZES = OrderedDict(
+    [
+        ("x", 1.0),
+        ("y", 1.0),
+        ("z", 1.0),
+        ("time", 3.0),
+        ("azimuth", 0.02),
+        ("zenith", 0.02),
+        ("energy", 0.5),
+        ("length", 1.0),
+    ]
+)
+"""Central finite-difference step sizes used by `Reco.get_llh_and_grad` for
+parameters whose name contains each key (units: m, ns, rad, GeV). These are
+comparable to the table binning, below which the LLH is not smooth."""
+
+LLH_CACHE_RESOLUTION = OrderedDict(
+    [
+        ("x", 0.01),
+        ("y", 0.01),
+        ("z", 0.01),
+        ("time", 0.03),
+        ("azimuth", 0.001),
+        ("zenith", 0.001),
+        ("energy", 0.01),
+        ("length", 0.01),
+    ]
+)
+"""Default resolutions to which parameters whose name contains each key are
+quantized to form the keys of the LLH cache (see `llh_cache_size` in `Reco`;
+units: m, ns, rad, GeV). Parameters matching no key are not quantized."""
+
+WARM_START_MAX_POINTS = 1000
+"""Number of best points of each method kept (per event) for warm-starting
+later methods; see `warm_start` in `Reco.run_crs`"""
+
 EMILY_CRS_SETTINGS = dict(
     n_live=250,
     max_iter=100000,
@@ -121,6 +194,278 @@ EMILY_CRS_SETTINGS = dict(
 )
 
 
+CHECKPOINT_FNAME = "checkpoint.pkl"
+"""Name of the checkpoint file written to `checkpoint_dir` (see `Reco`)"""
+
+
+DFLT_ROUTES = OrderedDict(
+    [
+        (
+            "poor_prefit",
+            OrderedDict(
+                [
+                    ("conditions", dict(prefit_fit_status=(FitStatus.OK + 1, None))),
+                    ("settings", dict(mn8d=dict(n_live=400))),
+                ]
+            ),
+        ),
+        (
+            "bright",
+            OrderedDict(
+                [
+                    ("conditions", dict(total_charge=(250., None))),
+                    (
+                        "settings",
+                        dict(
+                            crs_prefit=dict(n_live=100),
+                            mn8d=dict(
+                                cascade_kernel="scaling_aligned_point_ckv",
+                                track_time_step=3.0,
+                                n_live=160,
+                            ),
+                        ),
+                    ),
+                ]
+            ),
+        ),
+        ("default", OrderedDict([("conditions", dict()), ("settings", dict())])),
+    ]
+)
+"""Rule table for routing events to reco settings by difficulty (see
+`routes` in `Reco`). The first route whose conditions are all met is taken.
+Conditions map a feature (see `get_event_features`) to `(low, high)`
+bounds, `low <= value < high` with None for no bound; a condition on a
+feature that is not available for the event is not met. Settings map a
+method to the keyword arguments it takes from the route: any of the
+`setup_hypo` arguments (e.g. `cascade_kernel` and `track_time_step`) and of
+the optimizer's (e.g. `n_live` and `max_iter`) that the recipe passes."""
+
+
+def get_event_features(event):
+    """Cheap features of an event for routing it to reco settings; see
+    `DFLT_ROUTES`.
+
+    Parameters
+    ----------
+    event : mapping
+        Must contain "hits_summary"; if it has a "retro_crs_prefit" reco
+        under "recos", that reco's fit status and max LLH per hit are
+        included
+
+    Returns
+    -------
+    features : OrderedDict
+
+    """
+    features = OrderedDict()
+    hits_summary = event["hits_summary"]
+    if len(hits_summary) == 0:
+        features["total_charge"] = 0.
+        features["num_hits"] = 0
+        features["num_doms_hit"] = 0
+        return features
+
+    hits_summary = hits_summary[0]
+    features["total_charge"] = float(hits_summary["total_charge"])
+    features["num_hits"] = int(hits_summary["num_hits"])
+    features["num_doms_hit"] = int(hits_summary["num_doms_hit"])
+    features["time_spread"] = float(
+        hits_summary["latest_hit_time"] - hits_summary["earliest_hit_time"]
+    )
+
+    prefit = event.get("recos", {}).get("retro_crs_prefit", None)
+    if prefit is not None and features["num_hits"] > 0:
+        features["prefit_fit_status"] = int(prefit["fit_status"])
+        features["prefit_llh_per_hit"] = float(
+            (prefit["max_llh"] - LLH_FUDGE_SUMMAND) / features["num_hits"]
+        )
+
+    return features
+
+
+def _get_nbytes(obj):
+    """Approximate memory used by `obj`, including the items of (nested)
+    tuples"""
+    nbytes = sys.getsizeof(obj)
+    if isinstance(obj, tuple):
+        nbytes += sum(_get_nbytes(item) for item in obj)
+    return nbytes
+
+
+class LLHRecorder(object):
+    """
+    Record of the LLHs (and the parameter and aux values they were computed
+    at) found during a reco, kept in preallocated arrays that grow by
+    doubling.
+
+    Parameters
+    ----------
+    param_names : sequence of str
+        Names of the parameters recorded for each point (e.g. the hypothesis
+        handler's `all_param_names`)
+    n_aux : int
+        Number of aux values recorded for each point
+    initial_size : int
+        Number of points space is allocated for at the outset
+
+    """
+    def __init__(self, param_names, n_aux=3, initial_size=1024):
+        self.param_names = tuple(param_names)
+        self.t_start = None
+        """Time the first LLH was requested"""
+        self.best_idx = -1
+        """Index of the point with the highest LLH (-1 if none recorded)"""
+        self._best_llh = -np.inf
+        self._size = 0
+        self._llhs = np.empty(shape=initial_size, dtype=np.float64)
+        self._params = np.empty(
+            shape=(initial_size, len(self.param_names)), dtype=np.float64
+        )
+        self._aux = np.empty(shape=(initial_size, n_aux), dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, llh, params, aux):
+        """Record a point.
+
+        Parameters
+        ----------
+        llh : float
+        params : sequence of `len(param_names)` floats
+        aux : sequence of `n_aux` floats
+
+        Returns
+        -------
+        idx : int
+            Index of the point
+
+        """
+        idx = self._size
+        if idx == len(self._llhs):
+            self._grow()
+        self._llhs[idx] = llh
+        self._params[idx] = params
+        self._aux[idx] = aux
+        if llh > self._best_llh:
+            self._best_llh = llh
+            self.best_idx = idx
+        self._size = idx + 1
+        return idx
+
+    def extend(self, llhs, params, aux):
+        """Record several points at once.
+
+        Parameters
+        ----------
+        llhs : shape-(n,) array
+        params : shape-(n, len(param_names)) array
+        aux : shape-(n, n_aux) array
+
+        """
+        start = self._size
+        stop = start + len(llhs)
+        while stop > len(self._llhs):
+            self._grow()
+        self._llhs[start:stop] = llhs
+        self._params[start:stop] = params
+        self._aux[start:stop] = aux
+        if stop > start:
+            idx = start + int(np.argmax(self._llhs[start:stop]))
+            if self._llhs[idx] > self._best_llh:
+                self._best_llh = self._llhs[idx]
+                self.best_idx = idx
+        self._size = stop
+
+    def _grow(self):
+        new_size = 2 * len(self._llhs)
+        for attr in ("_llhs", "_params", "_aux"):
+            old = getattr(self, attr)
+            new = np.empty(shape=(new_size,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, attr, new)
+
+    @property
+    def log_likelihoods(self):
+        """shape-(n,) array : LLHs of the recorded points (a view, which is
+        no longer updated once the arrays grow)"""
+        return self._llhs[: self._size]
+
+    @property
+    def param_values(self):
+        """shape-(n, n_params) array : Parameter values of the recorded
+        points (a view)"""
+        return self._params[: self._size]
+
+    @property
+    def aux_values(self):
+        """shape-(n, n_aux) array : Aux values of the recorded points (a
+        view)"""
+        return self._aux[: self._size]
+
+    @property
+    def best_llh(self):
+        """float : Highest LLH recorded (NaN if no point with an LLH above
+        -inf has been recorded)"""
+        if self.best_idx < 0:
+            return np.nan
+        return self._llhs[self.best_idx]
+
+    @property
+    def best_param_values(self):
+        """shape-(n_params,) array : Parameter values of the point with the
+        highest LLH (all NaN if no point with an LLH above -inf has been
+        recorded)"""
+        if self.best_idx < 0:
+            return np.full(shape=len(self.param_names), fill_value=np.nan)
+        return self._params[self.best_idx]
+
+
+def test_llh_recorder():
+    """Unit test for `LLHRecorder`."""
+    rand = np.random.RandomState(0)
+    param_names = ("x", "y", "z")
+    recorder = LLHRecorder(param_names=param_names, initial_size=4)
+    assert len(recorder) == 0 and recorder.best_idx == -1
+    assert np.isnan(recorder.best_llh)
+    assert np.all(np.isnan(recorder.best_param_values))
+
+    # Points with LLH -inf are recorded but never the best
+    recorder.append(-np.inf, (0., 0., 0.), (0., 0., 0.))
+    assert len(recorder) == 1 and recorder.best_idx == -1
+    assert np.isnan(recorder.best_llh)
+
+    # Grow past the initial size, both point by point and in bulk
+    llhs = rand.normal(size=50)
+    params = rand.normal(size=(50, 3))
+    aux = rand.normal(size=(50, 3))
+    for idx in range(20):
+        assert recorder.append(llhs[idx], params[idx], aux[idx]) == idx + 1
+    recorder.extend(llhs=llhs[20:], params=params[20:], aux=aux[20:])
+    recorder.extend(llhs=llhs[:0], params=params[:0], aux=aux[:0])
+    assert len(recorder) == 51
+
+    ref_llhs = np.concatenate([[-np.inf], llhs])
+    assert np.array_equal(recorder.log_likelihoods, ref_llhs)
+    assert np.array_equal(recorder.param_values[1:], params)
+    assert np.array_equal(recorder.aux_values[1:], aux)
+    best_idx = int(np.argmax(ref_llhs))
+    assert recorder.best_idx == best_idx
+    assert recorder.best_llh == ref_llhs[best_idx]
+    assert np.array_equal(recorder.best_param_values, params[best_idx - 1])
+
+    # A better point (appended or extended) becomes the best
+    recorder.append(10., (1., 2., 3.), (0., 0., 0.))
+    assert recorder.best_idx == 51 and recorder.best_llh == 10.
+    recorder.extend(
+        llhs=np.array([5., 11., 7.]), params=np.ones((3, 3)), aux=np.zeros((3, 3))
+    )
+    assert recorder.best_idx == 53 and recorder.best_llh == 11.
+    assert len(recorder) == 55
+
+    print("<< PASS : test_llh_recorder >>")
+
+
 class StandaloneEvents(object):
     """
     Standalone events class to iteratively run recos, as opposed to I3tray Module
@@ -187,10 +532,92 @@ class Reco(object):
     Note that "recipes" for different reconstructions are defined in the
     `Reco.run` method.
 
+    Event-independent objects (hypothesis handlers, prior functions not
+    depending on the event, and the per-DOM info for operational DOMs) are
+    cached on the object and reused across events; only event-dependent parts
+    are regenerated for each event. The time spent in this per-event setup is
+    accumulated in `setup_time` and stored with each estimate.
+
     Parameters
     ----------
     dom_tables_kw, tdi_tables_kw : mappings
         As returned by `retro.init_obj.parse_args`
+    track_max_time_step : float or None
+        If not None, track kernels sample adaptively with time steps growing
+        from the recipe's track time step up to `track_max_time_step` (ns)
+        with distance from the nearest hit DOM
+    src_agg_opening_angle : float or None
+        If not None, aggregate distant sources into hierarchical clusters when
+        computing expectations; see
+        `retro.tables.pexp_5d.generate_pexp_and_llh_functions`
+    hypo_backend : str
+        Default hypothesis implementation used by recipes that do not specify
+        one; one of `retro.init_obj.HYPO_BACKENDS`
+    coarse_table_factors : mapping or None
+        If not None, also build coarse versions of the DOM tables by merging
+        this many consecutive bins in each dimension (keys are
+        `retro.tables.downsample_tables.DOM_TABLE_DIMS`; unspecified dimensions
+        are not rebinned). Recipes that support it run their first iterations
+        with LLHs from the coarse tables; see `Reco.run_crs`
+    coarse_tdi_factors : mapping or None
+        Same as `coarse_table_factors` but for the TDI tables (keys are
+        `retro.tables.downsample_tables.TDI_TABLE_DIMS`)
+    llh_cache_size : int
+        If > 0, keep up to this many full LLH evaluations for the current
+        event in a least-recently-used cache shared by all stages of a
+        reconstruction; points whose parameters agree to within the cache
+        resolution reuse the stored LLH, pegleg index and scale factor. Hits,
+        misses and memory use are accumulated in `llh_cache_stats` and stored
+        with each estimate.
+    llh_cache_resolution : mapping or None
+        Resolutions for forming cache keys, with the same meaning as (and
+        defaulting to) `LLH_CACHE_RESOLUTION`
+    n_llh_threads : int
+        Number of threads on which `loglike_batch` evaluates LLHs (the
+        compiled LLH releases the GIL); optimizers that propose several points
+        at once (see `batch_size` in `Reco.run_crs`) then use all of them, and
+        dynesty is given these threads as its `pool` with a `queue_size` of
+        `n_llh_threads`
+    llh_time_budget : float, mapping, or None
+        Wall-clock seconds each method may take to evaluate LLHs for an event
+        (counted from `generate_loglike_method`); either one value for all
+        methods or a mapping from method name to value (methods not in it are
+        unlimited). Once used up, `loglike` raises `LLHBudgetExhaustedError`,
+        the optimizer stops, and the estimate is made from the points
+        evaluated so far with fit status `FitStatus.BudgetExhausted`. Budget
+        hits are counted per method in `llh_budget_hits` and stored with each
+        estimate. Budgets are not enforced while MultiNest runs (its sampling
+        loop cannot be stopped from the LLH callback).
+    llh_calls_budget : int, mapping, or None
+        Same as `llh_time_budget` but for the number of LLHs computed (with
+        the full or coarse tables); LLHs reused from an earlier method,
+        replayed from a checkpoint, or found in the LLH cache are not counted
+    routes : mapping or None
+        If not None, rule table (formatted as `DFLT_ROUTES`) by which each
+        event is routed to reco settings according to its features (see
+        `get_event_features`). The route is chosen anew for each method so
+        that later methods can use the results of earlier ones. Expected
+        (mean of earlier events on the route) and actual times are printed
+        and accumulated per route and method in `route_stats`. Settings for
+        unknown methods or arguments raise a ValueError; a warning is printed
+        for settings the recipe of the method does not pass.
+    checkpoint_dir : str or None
+        If not None, every `checkpoint_interval` seconds the LLHs evaluated
+        so far by the method running on the current event are written to the
+        file CHECKPOINT_FNAME in this directory, along with the events all
+        methods have finished on. MultiNest keeps its output (including its
+        own resume files) in a subdirectory per event of the "multinest"
+        subdirectory; while it runs, checkpoints are instead written whenever
+        MultiNest updates its resume files, so the two stay in step.
+    checkpoint_interval : float
+        Seconds between checkpoints
+    resume : bool
+        Continue from the checkpoint in `checkpoint_dir` (if there is one):
+        events in it that are finished are skipped, and the method that was
+        running is resumed. MultiNest resumes from its own files; other
+        optimizers are rerun from the start with the checkpointed LLHs
+        replayed instead of recomputed, which (given a fixed seed) brings
+        them back to the state they were in when the checkpoint was written.
     debug : bool
 
     """
@@ -198,9 +625,32 @@ class Reco(object):
         self,
         dom_tables_kw,
         tdi_tables_kw,
+        track_max_time_step=None,
+        src_agg_opening_angle=None,
+        hypo_backend="discrete",
+        coarse_table_factors=None,
+        coarse_tdi_factors=None,
+        llh_cache_size=0,
+        llh_cache_resolution=None,
+        n_llh_threads=1,
+        llh_time_budget=None,
+        llh_calls_budget=None,
+        routes=None,
+        checkpoint_dir=None,
+        checkpoint_interval=60.,
+        resume=False,
         debug=False,
     ):
+        if hypo_backend not in init_obj.HYPO_BACKENDS:
+            raise ValueError(
+                "`hypo_backend` must be one of {}; got {}".format(
+                    init_obj.HYPO_BACKENDS, hypo_backend
+                )
+            )
         self.debug = bool(debug)
+        self.track_max_time_step = track_max_time_step
+        self.src_agg_opening_angle = src_agg_opening_angle
+        self.hypo_backend = hypo_backend
 
         self.dom_tables_kw = sort_dict(dom_tables_kw)
         self.tdi_tables_kw = sort_dict(tdi_tables_kw)
@@ -216,14 +666,193 @@ class Reco(object):
             dom_tables=self.dom_tables,
             tdi_tables=self.tdi_tables,
             tdi_metas=self.tdi_metas,
+            src_agg_opening_angle=self.src_agg_opening_angle,
         )
+
+        # Coarse tables share DOM info and table indexing with the full tables
+        self.coarse_table_factors = coarse_table_factors
+        self.coarse_tdi_factors = coarse_tdi_factors
+        self.coarse_dom_tables = None
+        self.coarse_tdi_tables = None
+        self.coarse_get_llh = None
+        if coarse_table_factors is not None or coarse_tdi_factors is not None:
+            # Tables that are not rebinned are shared rather than copied
+            dom_factors = get_factors(coarse_table_factors, DOM_TABLE_DIMS)
+            if all(factor == 1 for factor in dom_factors):
+                self.coarse_dom_tables = self.dom_tables
+            else:
+                self.coarse_dom_tables = self.dom_tables.downsample(*dom_factors)
+            tdi_factors = get_factors(coarse_tdi_factors, TDI_TABLE_DIMS)
+            if all(factor == 1 for factor in tdi_factors):
+                self.coarse_tdi_tables = self.tdi_tables
+                coarse_tdi_metas = self.tdi_metas
+            else:
+                coarse_tdi_tables = []
+                coarse_tdi_metas = []
+                for tdi_table, tdi_meta in zip(self.tdi_tables, self.tdi_metas):
+                    tdi_table, tdi_meta = downsample_tdi_table(
+                        tdi_table=tdi_table,
+                        tdi_meta=tdi_meta,
+                        factors=coarse_tdi_factors,
+                    )
+                    coarse_tdi_tables.append(tdi_table)
+                    coarse_tdi_metas.append(tdi_meta)
+                self.coarse_tdi_tables = tuple(coarse_tdi_tables)
+            _, self.coarse_get_llh, _ = generate_pexp_and_llh_functions(
+                dom_tables=self.coarse_dom_tables,
+                tdi_tables=self.coarse_tdi_tables,
+                tdi_metas=tuple(coarse_tdi_metas),
+                src_agg_opening_angle=self.src_agg_opening_angle,
+            )
+
         self.event = None
         self.hypo_handler = None
         self.prior = None
+        self.prior_batch = None
         self.priors_used = None
         self.loglike = None
+        self.loglike_batch = None
+        self.llh_early_termination = None
+        self.llh_recorder = None
         self.n_params = None
         self.n_opt_params = None
+        self.setup_time = 0.
+
+        self.llh_cache_size = int(llh_cache_size)
+        if llh_cache_resolution is None:
+            llh_cache_resolution = LLH_CACHE_RESOLUTION
+        self.llh_cache_resolution = OrderedDict(llh_cache_resolution)
+        self.llh_cache_stats = None
+        self._llh_cache = OrderedDict()
+        self._llh_cache_event_id = None
+        self._reset_llh_cache(event_id=None)
+
+        self.n_llh_threads = int(n_llh_threads)
+        if self.n_llh_threads < 1:
+            raise ValueError(
+                "`n_llh_threads` must be >= 1; got {}".format(n_llh_threads)
+            )
+        self._llh_pool = None
+        if self.n_llh_threads > 1:
+            self._llh_pool = ThreadPool(self.n_llh_threads)
+
+        self.llh_time_budget = llh_time_budget
+        self.llh_calls_budget = llh_calls_budget
+        self.llh_budget = None
+        self.llh_budget_hits = OrderedDict()
+        self._method = None
+
+        if routes is not None:
+            self._validate_routes(routes)
+        self.routes = routes
+        self.route_name = None
+        self.route_stats = OrderedDict()
+        self._route_settings = {}
+        self._route_keys_used = set()
+        self._route_t0 = None
+
+        self._hypo_handlers = OrderedDict()
+        self._hypo_key = None
+        self._populations = OrderedDict()
+        self._populations_event_id = None
+        self._prior_funcs = OrderedDict()
+        self._setup_event_dom_info()
+
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_info = None
+        self._completed_events = set()
+        self._resume_state = None
+        self._resumed = False
+        if checkpoint_dir is not None:
+            if not isdir(checkpoint_dir):
+                os.makedirs(checkpoint_dir)
+            checkpoint_fpath = join(checkpoint_dir, CHECKPOINT_FNAME)
+            if resume and isfile(checkpoint_fpath):
+                with open(checkpoint_fpath, "rb") as infile:
+                    checkpoint = pickle.load(infile)
+                self._completed_events = set(checkpoint["completed_events"])
+                self._resume_state = checkpoint["in_progress"]
+                self._populations_event_id = checkpoint["populations_event_id"]
+                self._populations.update(checkpoint["populations"])
+                print(
+                    "Resuming from checkpoint {}: {} finished event(s){}".format(
+                        checkpoint_fpath,
+                        len(self._completed_events),
+                        ""
+                        if self._resume_state is None
+                        else ', method "{}" in progress'.format(
+                            self._resume_state["method"]
+                        ),
+                    )
+                )
+
+    def _setup_event_dom_info(self):
+        """Populate the event-independent fields of the `event_dom_info` array
+        (operational DOMs only) and a lookup from `sd_idx` to index into that
+        array, both of which are copied / used for each event by
+        `generate_loglike_method`.
+        """
+        dom_info = self.dom_tables.dom_info
+        sd_idx_table_indexer = self.dom_tables.sd_idx_table_indexer
+        operational_dom_info = dom_info[dom_info["operational"]]
+
+        # Array containing only DOMs operational during the event & info
+        # relevant to the hits these DOMs got (if any)
+        event_dom_info = np.zeros(
+            shape=len(operational_dom_info), dtype=EVT_DOM_INFO_T
+        )
+
+        # Must be a list, not tuple:
+        copy_fields = [
+            "sd_idx",
+            "x",
+            "y",
+            "z",
+            "quantum_efficiency",
+            "noise_rate_per_ns",
+        ]
+        event_dom_info[copy_fields] = operational_dom_info[copy_fields]
+        event_dom_info["table_idx"] = sd_idx_table_indexer[
+            operational_dom_info["sd_idx"]
+        ]
+
+        print("all noise rate %.5f" % np.nansum(dom_info["noise_rate_per_ns"]))
+        print(
+            "DOMs with zero or NaN noise %i"
+            % np.count_nonzero(
+                np.isnan(dom_info["noise_rate_per_ns"])
+                | (dom_info["noise_rate_per_ns"] == 0)
+            )
+        )
+        print("operational DOMs noise rate %.5f" % np.sum(event_dom_info["noise_rate_per_ns"]))
+        print(
+            "operational DOMs with zero noise: %i"
+            % np.sum(event_dom_info["noise_rate_per_ns"] == 0)
+        )
+        # settings those to minimum noise
+        noise = event_dom_info["noise_rate_per_ns"]
+        mask = noise < 1e-7
+        noise[mask] = 1e-7
+        print("operational DOMs noise rate %.5f" % np.sum(event_dom_info["noise_rate_per_ns"]))
+        print(
+            "operational DOMs with zero noise: %i"
+            % np.sum(event_dom_info["noise_rate_per_ns"] == 0)
+        )
+        print("min noise: ", np.min(noise))
+        print("mean noise: ", np.mean(noise))
+
+        assert np.sum(event_dom_info["quantum_efficiency"] <= 0) == 0, "negative QE"
+
+        sd_idx_to_event_dom_idx = np.full(
+            shape=len(dom_info), fill_value=-1, dtype=np.int64
+        )
+        sd_idx_to_event_dom_idx[event_dom_info["sd_idx"]] = np.arange(
+            len(event_dom_info)
+        )
+
+        self._event_dom_info = event_dom_info
+        self._sd_idx_to_event_dom_idx = sd_idx_to_event_dom_idx
 
     def __call__(
         self,
@@ -420,19 +1049,152 @@ class Reco(object):
             for key, val in all_reco_info.items():
                 setitem_pframe(frame, key, val, overwrite=True)
 
-    def setup_hypo(self, **kwargs):
+    def setup_hypo(self, backend=None, **kwargs):
         """Setup hypothesis and record `n_params` and `n_opt_params`
         corresponding to the hypothesis.
 
+        Hypothesis handlers are cached by `backend` and `kwargs`, so calling
+        this again with the same recipe reuses the existing handler.
+
         Parameters
         ----------
+        backend : str, optional
+            One of `retro.init_obj.HYPO_BACKENDS`; defaults to
+            `self.hypo_backend`
         **kwargs
-            Passed to `retro.init_obj.setup_discrete_hypo`
+            Passed to `retro.init_obj.setup_hypo`
 
         """
-        self.hypo_handler = init_obj.setup_discrete_hypo(**kwargs)
+        if backend is None:
+            backend = self.hypo_backend
+        if (
+            self.track_max_time_step is not None
+            and kwargs.get("track_kernel") is not None
+        ):
+            kwargs.setdefault("track_max_time_step", self.track_max_time_step)
+
+        t0 = time.time()
+        key = (backend,) + tuple(sorted(kwargs.items()))
+        hypo_handler = self._hypo_handlers.get(key, None)
+        if hypo_handler is None:
+            hypo_handler = init_obj.setup_hypo(backend=backend, **kwargs)
+            self._hypo_handlers[key] = hypo_handler
+        self.hypo_handler = hypo_handler
+        self._hypo_key = key
         self.n_params = self.hypo_handler.n_params
         self.n_opt_params = self.hypo_handler.n_opt_params
+        self.setup_time += time.time() - t0
+
+    @staticmethod
+    def _get_event_id(event):
+        """Identifier for `event` that is unique within a run: its file path and
+        index for standalone events, otherwise its I3EventHeader IDs"""
+        if event.meta.get("event_idx", None) is not None:
+            return (event.meta["events_root"], event.meta["event_idx"])
+        header = event["header"]
+        return tuple(
+            header[f] for f in ("run_id", "sub_run_id", "event_id", "sub_event_id")
+        )
+
+    def _reset_llh_cache(self, event_id):
+        """Empty the LLH cache and its statistics and assign it to `event_id`"""
+        self._llh_cache.clear()
+        self._llh_cache_event_id = event_id
+        self.llh_cache_stats = OrderedDict(
+            [("hits", 0), ("misses", 0), ("entries", 0), ("bytes", 0)]
+        )
+
+    def _get_llh_cache_resolution(self):
+        """Cache-key resolution for each of the optimized parameters, taken
+        from `llh_cache_resolution` (0 for names matching no key, meaning that
+        parameter is not quantized)"""
+        resolutions = []
+        for pname in self.hypo_handler.opt_param_names:
+            resolution = 0.
+            for key, val in self.llh_cache_resolution.items():
+                if key in pname:
+                    resolution = float(val)
+                    break
+            resolutions.append(resolution)
+        return tuple(resolutions)
+
+    def _get_llh_budget(self, budget):
+        """Value of `budget` (`llh_time_budget` or `llh_calls_budget`) for the
+        method being run; None if unlimited"""
+        if isinstance(budget, Mapping):
+            return budget.get(self._method, None)
+        return budget
+
+    def _validate_routes(self, routes):
+        """Raise ValueError if a route in `routes` has settings for a method
+        not in `METHODS` or for an argument that neither hypothesis setup nor
+        any optimizer takes"""
+        known_args = set(get_arg_names(init_obj.setup_discrete_hypo))
+        for run_method in (
+            self.run_crs,
+            self.run_multinest,
+            self.run_dynesty,
+            self.run_scipy,
+        ):
+            known_args.update(get_arg_names(run_method)[1:])
+        for route_name, route in routes.items():
+            for method, settings in route["settings"].items():
+                if method not in METHODS:
+                    raise ValueError(
+                        'Route "{}" has settings for unknown method "{}"'.format(
+                            route_name, method
+                        )
+                    )
+                unknown = sorted(set(settings) - known_args)
+                if unknown:
+                    raise ValueError(
+                        'Route "{}" has settings for method "{}" that no recipe'
+                        " can take: {}".format(route_name, method, unknown)
+                    )
+
+    def _select_route(self):
+        """Route the current event for the current method; see `routes`"""
+        self.route_name = None
+        self._route_settings = {}
+        self._route_keys_used = set()
+        self._route_t0 = time.time()
+        if self.routes is None:
+            return
+
+        features = get_event_features(self.event)
+        for route_name, route in self.routes.items():
+            met = True
+            for feature, (low, high) in route["conditions"].items():
+                val = features.get(feature, None)
+                if (
+                    val is None
+                    or low is not None and val < low
+                    or high is not None and val >= high
+                ):
+                    met = False
+                    break
+            if met:
+                self.route_name = route_name
+                self._route_settings = route["settings"].get(self._method, {})
+                break
+
+        print(
+            'route "{}" for features {}: settings {}'.format(
+                self.route_name,
+                ", ".join("{}={}".format(k, v) for k, v in features.items()),
+                self._route_settings,
+            )
+        )
+
+    def _routed(self, **kwargs):
+        """`kwargs` with values overridden by the current route's settings for
+        the current method (keys not in `kwargs` are ignored here, and warned
+        about by `make_estimate` if no call uses them)"""
+        for key, val in self._route_settings.items():
+            if key in kwargs:
+                kwargs[key] = val
+                self._route_keys_used.add(key)
+        return kwargs
 
     def _reco_event(self, event, method, save_llhp, filter, save_estimate):
         """Recipes for performing different kinds of reconstructions.
@@ -461,6 +1223,8 @@ class Reco(object):
 
         """
         self.event = event
+        self._method = method
+        self.setup_time = 0.
 
         if filter is not None:
             assert isinstance(filter, string_types)
@@ -482,26 +1246,29 @@ class Reco(object):
 
             return fit_status
 
+        self._select_route()
+
         # simple 1-stage recos
-        if method in ("multinest", "test", "truth", "crs", "scipy", "nlopt", "skopt"):
+        if method in (
+            "multinest",
+            "test",
+            "truth",
+            "crs",
+            "scipy",
+            "nlopt",
+            "skopt",
+        ):
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="pegleg",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="pegleg",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             if method == "test":
                 run_info, fit_meta = self.run_test(seed=0)
@@ -509,28 +1276,34 @@ class Reco(object):
                 run_info, fit_meta = self.run_with_truth()
             elif method == "crs":
                 run_info, fit_meta = self.run_crs(
-                    n_live=250,
-                    max_iter=20000,
-                    max_noimprovement=5000,
-                    min_llh_std=0.1,
-                    stdthresh=dict(x=1, y=1, z=1, time=3),
-                    use_sobol=True,
-                    seed=0,
+                    **self._routed(
+                        n_live=250,
+                        max_iter=20000,
+                        max_noimprovement=5000,
+                        min_llh_std=0.1,
+                        stdthresh=dict(x=1, y=1, z=1, time=3),
+                        use_sobol=True,
+                        seed=0,
+                    )
                 )
             elif method == "multinest":
                 run_info, fit_meta = self.run_multinest(
-                    importance_sampling=True,
-                    max_modes=1,
-                    const_eff=True,
-                    n_live=160,
-                    evidence_tol=0.5,
-                    sampling_eff=0.3,
-                    max_iter=10000,
-                    seed=0,
+                    **self._routed(
+                        importance_sampling=True,
+                        max_modes=1,
+                        const_eff=True,
+                        n_live=160,
+                        evidence_tol=0.5,
+                        sampling_eff=0.3,
+                        max_iter=10000,
+                        seed=0,
+                    )
                 )
             elif method == "scipy":
                 run_info, fit_meta = self.run_scipy(
-                    method="differential_evolution", eps=0.02
+                    **self._routed(
+                        method="differential_evolution", eps=0.02
+                    )
                 )
             elif method == "nlopt":
                 run_info, fit_meta = self.run_nlopt()
@@ -539,9 +1312,7 @@ class Reco(object):
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
             self.make_estimate(
@@ -555,40 +1326,33 @@ class Reco(object):
 
         elif method == "fast":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_point_ckv",
-                track_kernel="pegleg",
-                track_time_step=3.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_point_ckv",
+                    track_kernel="pegleg",
+                    track_time_step=3.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_crs(
-                n_live=160,
-                max_iter=10000,
-                max_noimprovement=1000,
-                min_llh_std=0.5,
-                stdthresh=dict(x=5, y=5, z=5, time=15),
-                use_sobol=True,
-                seed=0,
+                **self._routed(
+                    n_live=160,
+                    max_iter=10000,
+                    max_noimprovement=1000,
+                    min_llh_std=0.5,
+                    stdthresh=dict(x=5, y=5, z=5, time=15),
+                    use_sobol=True,
+                    seed=0,
+                    coarse_stdthresh=dict(x=15, y=15, z=15, time=45),
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -603,7 +1367,9 @@ class Reco(object):
 
         elif method == "stopping_atm_muon_crs":
             self.setup_hypo(
-                track_kernel="stopping_table_energy_loss", track_time_step=3.0
+                **self._routed(
+                    track_kernel="stopping_table_energy_loss", track_time_step=3.0
+                )
             )
 
             self.generate_prior_method(
@@ -616,33 +1382,23 @@ class Reco(object):
                 ),
             )
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_crs(
-                n_live=160,
-                max_iter=10000,
-                max_noimprovement=1000,
-                min_llh_std=0.,
-                stdthresh=dict(x=5, y=5, z=4, time=20),
-                use_sobol=True,
-                seed=0,
+                **self._routed(
+                    n_live=160,
+                    max_iter=10000,
+                    max_noimprovement=1000,
+                    min_llh_std=0.,
+                    stdthresh=dict(x=5, y=5, z=4, time=20),
+                    use_sobol=True,
+                    seed=0,
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -657,40 +1413,33 @@ class Reco(object):
 
         elif method == "crs_prefit":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_point_ckv",
-                track_kernel="pegleg",
-                track_time_step=3.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_point_ckv",
+                    track_kernel="pegleg",
+                    track_time_step=3.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_crs(
-                n_live=160,
-                max_iter=10000,
-                max_noimprovement=1000,
-                min_llh_std=0.5,
-                stdthresh=dict(x=5, y=5, z=4, time=20),
-                use_sobol=True,
-                seed=0,
+                **self._routed(
+                    n_live=160,
+                    max_iter=10000,
+                    max_noimprovement=1000,
+                    min_llh_std=0.5,
+                    stdthresh=dict(x=5, y=5, z=4, time=20),
+                    use_sobol=True,
+                    seed=0,
+                    coarse_stdthresh=dict(x=15, y=15, z=12, time=60),
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -705,32 +1454,22 @@ class Reco(object):
 
         elif method == "emily_crs_ref":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="table_energy_loss",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="table_energy_loss",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
-            run_info, fit_meta = self.run_crs(**EMILY_CRS_SETTINGS)
+            run_info, fit_meta = self.run_crs(**self._routed(**EMILY_CRS_SETTINGS))
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -745,32 +1484,22 @@ class Reco(object):
 
         elif method == "emily_crs_test":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="table_energy_loss_secondary_light",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="table_energy_loss_secondary_light",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
-            run_info, fit_meta = self.run_crs(**EMILY_CRS_SETTINGS)
+            run_info, fit_meta = self.run_crs(**self._routed(**EMILY_CRS_SETTINGS))
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -785,41 +1514,33 @@ class Reco(object):
 
         elif method == "mn8d":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="pegleg",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="pegleg",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_CRS_MN)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_multinest(
-                importance_sampling=True,
-                max_modes=1,
-                const_eff=True,
-                n_live=250,
-                evidence_tol=0.02,
-                sampling_eff=0.5,
-                max_iter=10000,
-                seed=0,
+                **self._routed(
+                    importance_sampling=True,
+                    max_modes=1,
+                    const_eff=True,
+                    n_live=250,
+                    evidence_tol=0.02,
+                    sampling_eff=0.5,
+                    max_iter=10000,
+                    seed=0,
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -834,41 +1555,33 @@ class Reco(object):
 
         elif method == "emily_ref":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="table_energy_loss",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="table_energy_loss",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_CRS_MN)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_multinest(
-                importance_sampling=True,
-                max_modes=1,
-                const_eff=True,
-                n_live=250,
-                evidence_tol=0.02,
-                sampling_eff=0.5,
-                max_iter=10000,
-                seed=0,
+                **self._routed(
+                    importance_sampling=True,
+                    max_modes=1,
+                    const_eff=True,
+                    n_live=250,
+                    evidence_tol=0.02,
+                    sampling_eff=0.5,
+                    max_iter=10000,
+                    seed=0,
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -883,41 +1596,33 @@ class Reco(object):
 
         elif method == "emily_test":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="table_energy_loss_secondary_light",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="table_energy_loss_secondary_light",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(**PRISPEC_OSCNEXT_CRS_MN)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_multinest(
-                importance_sampling=True,
-                max_modes=1,
-                const_eff=True,
-                n_live=250,
-                evidence_tol=0.02,
-                sampling_eff=0.5,
-                max_iter=10000,
-                seed=0,
+                **self._routed(
+                    importance_sampling=True,
+                    max_modes=1,
+                    const_eff=True,
+                    n_live=250,
+                    evidence_tol=0.02,
+                    sampling_eff=0.5,
+                    max_iter=10000,
+                    seed=0,
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -932,38 +1637,31 @@ class Reco(object):
 
         elif method == "dn8d":
             self.setup_hypo(
-                cascade_kernel="scaling_aligned_one_dim",
-                track_kernel="pegleg",
-                track_time_step=1.0,
+                **self._routed(
+                    cascade_kernel="scaling_aligned_one_dim",
+                    track_kernel="pegleg",
+                    track_time_step=1.0,
+                )
             )
 
             self.generate_prior_method(return_cube=True, **PRISPEC_OSCNEXT_CRS_MN)
             #self.generate_prior_method(return_cube=True, **PRISPEC_OSCNEXT_PREFIT_TIGHT)
 
-            param_values = []
-            log_likelihoods = []
-            aux_values = []
-            t_start = []
-
-            self.generate_loglike_method(
-                param_values=param_values,
-                log_likelihoods=log_likelihoods,
-                aux_values=aux_values,
-                t_start=t_start,
-            )
+            llh_recorder = self.generate_loglike_method()
 
             run_info, fit_meta = self.run_dynesty(
-                n_live=100,
-                maxiter=2000,
-                maxcall=10000,
-                dlogz=0.1,
+                **self._routed(
+                    n_live=100,
+                    maxiter=2000,
+                    maxcall=10000,
+                    dlogz=0.1,
+                    seed=0,
+                )
             )
 
             llhp = self.make_llhp(
                 method=method,
-                log_likelihoods=log_likelihoods,
-                param_values=param_values,
-                aux_values=aux_values,
+                llh_recorder=llh_recorder,
                 save=save_llhp,
             )
 
@@ -1069,6 +1767,12 @@ class Reco(object):
         if len(set(methods)) != len(methods):
             raise ValueError("Same reco specified multiple times")
 
+        if self.checkpoint_dir is not None:
+            event_id = self._get_event_id(event)
+            if event_id in self._completed_events:
+                print("Event finished according to checkpoint; skipping")
+                return
+
         for method in methods:
             reco_name = "retro_" + method
 
@@ -1126,6 +1830,10 @@ class Reco(object):
                     fit_status=FitStatus.MissingSeed,
                 )
 
+        if self.checkpoint_dir is not None:
+            self._completed_events.add(event_id)
+            self._write_checkpoint()
+
     def generate_prior_method(self, return_cube=False, **kwargs):
         """Generate the prior transform method `self.prior` and info
         `self.priors_used` for a given event. Optionally, plots the priors to
@@ -1161,18 +1869,28 @@ class Reco(object):
         **kwargs
             Prior definitions; anything unspecified falls back to a default
             (since all params must have priors, including ranges, for e.g.
-            MultiNest and CRS).
+            MultiNest and CRS). Prior functions that do not depend on the event
+            are cached and reused for subsequent events.
 
         """
+        t0 = time.time()
         prior_funcs = []
         self.priors_used = OrderedDict()
 
         miscellany = []
         for dim_num, dim_name in enumerate(self.hypo_handler.opt_param_names):
             spec = kwargs.get(dim_name, {})
-            prior_func, prior_def, misc = get_prior_func(
-                dim_num=dim_num, dim_name=dim_name, event=self.event, **spec
-            )
+            if prior_depends_on_event(dim_name=dim_name, **spec):
+                prior_func, prior_def, misc = get_prior_func(
+                    dim_num=dim_num, dim_name=dim_name, event=self.event, **spec
+                )
+            else:
+                key = (dim_num, dim_name, repr(sorted(spec.items())))
+                if key not in self._prior_funcs:
+                    self._prior_funcs[key] = get_prior_func(
+                        dim_num=dim_num, dim_name=dim_name, event=None, **spec
+                    )
+                prior_func, prior_def, misc = self._prior_funcs[key]
             prior_funcs.append(prior_func)
             self.priors_used[dim_name] = prior_def
             miscellany.append(misc)
@@ -1196,7 +1914,33 @@ class Reco(object):
             if return_cube:
                 return cube
 
+        def prior_batch(cubes):
+            """Apply `prior_funcs` to many points at once, mapping each row of
+            `cubes` from the unit hypercube onto the physical parameter space.
+
+            Each prior function transforms all points' values for its
+            dimension with a single (vectorized) call. The result overwrites
+            the values in `cubes`.
+
+            Parameters
+            ----------
+            cubes : shape-(n_points, n_dims) array of float
+
+            Returns
+            -------
+            cubes : shape-(n_points, n_dims) array of float
+
+            """
+            # Prior funcs transform item `dim_num` of their argument; passing
+            # the transpose (a view) makes that a column of `cubes`
+            cubes_t = cubes.T
+            for prior_func in prior_funcs:
+                prior_func(cubes_t)
+            return cubes
+
         self.prior = prior
+        self.prior_batch = prior_batch
+        self.setup_time += time.time() - t0
 
         if self.debug:
             # -- Plot priors and save to png's in current dir -- #
@@ -1248,36 +1992,31 @@ class Reco(object):
             plt_fpath_base = self.event.meta["prefix"] + "priors"
             fig.savefig(plt_fpath_base + ".png", dpi=120)
 
-    def generate_loglike_method(
-        self, param_values, log_likelihoods, aux_values, t_start
-    ):
+    def generate_loglike_method(self):
         """Generate the LLH callback method `self.loglike` for a given event.
 
-        Parameters
-        ----------
-        param_values : list
-        log_likelihoods : list
-        aux_values : list
-        t_start : list
-            Needs to be a list for `t_start` to be passed by reference (and
-            therefore universally accessible within all methods that require
-            knowing `t_start`).
+        Returns
+        -------
+        llh_recorder : LLHRecorder
+            Every LLH computed by `self.loglike` (or `self.loglike_batch`) is
+            recorded here along with the parameter and aux values
 
         """
+        t0 = time.time()
+
         # -- Variables to be captured by `loglike` closure -- #
 
         all_param_names = self.hypo_handler.all_param_names
         opt_param_names = self.hypo_handler.opt_param_names
         n_opt_params = self.hypo_handler.n_opt_params
-        fixed_params = self.hypo_handler.fixed_params
+        fixed_param_values = tuple(self.hypo_handler.fixed_params.values())
+        llh_recorder = LLHRecorder(param_names=all_param_names)
         event = self.event
         hits = event["hits"]
         hits_indexer = event["hits_indexer"]
         hypo_handler = self.hypo_handler
         pegleg_muon_dt = hypo_handler.pegleg_kernel_kwargs.get("dt")
         pegleg_muon_const_e_loss = True
-        dom_info = self.dom_tables.dom_info
-        sd_idx_table_indexer = self.dom_tables.sd_idx_table_indexer
         if "truth" in event:
             truth = event["truth"]
             truth_info = OrderedDict(
@@ -1306,11 +2045,9 @@ class Reco(object):
         else:
             truth_info = None
 
-        num_operational_doms = np.sum(dom_info["operational"])
-
-        # Array containing only DOMs operational during the event & info
-        # relevant to the hits these DOMs got (if any)
-        event_dom_info = np.zeros(shape=num_operational_doms, dtype=EVT_DOM_INFO_T)
+        # Copy of the event-independent info for operational DOMs; info
+        # relevant to the hits these DOMs got (if any) is filled in below
+        event_dom_info = self._event_dom_info.copy()
 
         # Array containing all relevant hit info for the event, including a
         # pointer back to the index of the DOM in the `event_dom_info` array
@@ -1319,74 +2056,286 @@ class Reco(object):
         # Copy 'time' and 'charge' over directly; add 'event_dom_idx' below
         event_hit_info[["time", "charge"]] = hits[["time", "charge"]]
 
-        # Must be a list, not tuple:
-        copy_fields = [
-            "sd_idx",
-            "x",
-            "y",
-            "z",
-            "quantum_efficiency",
-            "noise_rate_per_ns",
-        ]
-
-        print("all noise rate %.5f" % np.nansum(dom_info["noise_rate_per_ns"]))
-        print(
-            "DOMs with zero or NaN noise %i"
-            % np.count_nonzero(
-                np.isnan(dom_info["noise_rate_per_ns"])
-                | (dom_info["noise_rate_per_ns"] == 0)
-            )
-        )
-
-        # Fill `event_{hit,dom}_info` arrays only for operational DOMs
-        for dom_idx, this_dom_info in enumerate(dom_info[dom_info["operational"]]):
-            this_event_dom_info = event_dom_info[dom_idx : dom_idx + 1]
-            this_event_dom_info[copy_fields] = this_dom_info[copy_fields]
-            sd_idx = this_dom_info["sd_idx"]
-            this_event_dom_info["table_idx"] = sd_idx_table_indexer[sd_idx]
-
-            # Copy any hit info from `hits_indexer` and total charge from
-            # `hits` into `event_hit_info` and `event_dom_info` arrays
-            this_hits_indexer = hits_indexer[hits_indexer["sd_idx"] == sd_idx]
-            if len(this_hits_indexer) == 0:
-                this_event_dom_info["hits_start_idx"] = 0
-                this_event_dom_info["hits_stop_idx"] = 0
-                this_event_dom_info["total_observed_charge"] = 0
+        # Copy any hit info from `hits_indexer` and total charge from `hits`
+        # into `event_hit_info` and `event_dom_info` arrays (hits in
+        # non-operational DOMs are ignored)
+        event_dom_indices = self._sd_idx_to_event_dom_idx[hits_indexer["sd_idx"]]
+        for this_hits_indexer, dom_idx in zip(hits_indexer, event_dom_indices):
+            if dom_idx < 0:
                 continue
-
-            start = this_hits_indexer[0]["offset"]
-            stop = start + this_hits_indexer[0]["num"]
+            start = this_hits_indexer["offset"]
+            stop = start + this_hits_indexer["num"]
             event_hit_info[start:stop]["event_dom_idx"] = dom_idx
+            this_event_dom_info = event_dom_info[dom_idx : dom_idx + 1]
             this_event_dom_info["hits_start_idx"] = start
             this_event_dom_info["hits_stop_idx"] = stop
             this_event_dom_info["total_observed_charge"] = np.sum(
                 hits[start:stop]["charge"]
             )
 
-        print("this evt. noise rate %.5f" % np.sum(event_dom_info["noise_rate_per_ns"]))
-        print(
-            "DOMs with zero noise: %i"
-            % np.sum(event_dom_info["noise_rate_per_ns"] == 0)
-        )
-        # settings those to minimum noise
-        noise = event_dom_info["noise_rate_per_ns"]
-        mask = noise < 1e-7
-        noise[mask] = 1e-7
-        print("this evt. noise rate %.5f" % np.sum(event_dom_info["noise_rate_per_ns"]))
-        print(
-            "DOMs with zero noise: %i"
-            % np.sum(event_dom_info["noise_rate_per_ns"] == 0)
-        )
-        print("min noise: ", np.min(noise))
-        print("mean noise: ", np.mean(noise))
-
-        assert np.sum(event_dom_info["quantum_efficiency"] <= 0) == 0, "negative QE"
         assert np.sum(event_dom_info["total_observed_charge"]) > 0, "no charge"
         assert np.isfinite(
             np.sum(event_dom_info["total_observed_charge"])
         ), "non-finite charge"
 
-        def loglike(cube, ndim=None, nparams=None):  # pylint: disable=unused-argument
+        # Adaptively-sampled track kernels need to know where the hit DOMs are
+        hit_doms = event_dom_info[event_dom_info["total_observed_charge"] > 0]
+        hit_dom_coords = np.stack(
+            [hit_doms["x"], hit_doms["y"], hit_doms["z"]], axis=1
+        ).astype(np.float64)
+        adaptive_pegleg = False
+        for kernel_kwargs in (
+            list(hypo_handler.generic_kernels_kwargs)
+            + [hypo_handler.pegleg_kernel_kwargs]
+        ):
+            if "hit_dom_coords" in kernel_kwargs:
+                kernel_kwargs["hit_dom_coords"] = hit_dom_coords
+        if "hit_dom_coords" in hypo_handler.pegleg_kernel_kwargs:
+            adaptive_pegleg = True
+
+        # Structure-of-arrays view of the per-hit info used in the LLH loops
+        event_hits = get_event_hits(event_dom_info, event_hit_info)
+        # Scratch buffers reused by every LLH evaluation for this event; one
+        # set per thread for `loglike_batch`
+        llh_workspace = get_llh_workspace(len(event_hit_info))
+        llh_workspaces = [llh_workspace] + [
+            get_llh_workspace(len(event_hit_info))
+            for _ in range(self.n_llh_threads - 1)
+        ]
+        # `loglike` can also be called from several threads at once (e.g. by
+        # dynesty's pool); each thread then gets its own scratch buffers, and
+        # the Python-side bookkeeping (recording, LLH cache) is serialized
+        thread_local = threading.local()
+        thread_local.workspace = llh_workspace
+        bookkeeping_lock = threading.Lock()
+
+        def get_workspace():
+            """Scratch buffers for the calling thread"""
+            workspace = getattr(thread_local, "workspace", None)
+            if workspace is None:
+                workspace = get_llh_workspace(len(event_hit_info))
+                thread_local.workspace = workspace
+            return workspace
+
+        # Counts and run times of calls to `loglike` that were / were not cut
+        # short by an `llh_threshold`
+        early_termination = OrderedDict(
+            [
+                ("num_full", 0),
+                ("num_terminated", 0),
+                ("full_time", 0.),
+                ("terminated_time", 0.),
+            ]
+        )
+        self.llh_early_termination = early_termination
+        self.llh_recorder = llh_recorder
+
+        # LLH budget for this method; "enforce" can be switched off by
+        # optimizers that cannot be stopped from within `loglike`. Only LLHs
+        # actually computed (with the full or coarse tables) count as calls;
+        # reused, replayed, and cached LLHs are free
+        llh_budget = OrderedDict(
+            [
+                ("max_time", self._get_llh_budget(self.llh_time_budget)),
+                ("max_calls", self._get_llh_budget(self.llh_calls_budget)),
+                ("num_calls", 0),
+                ("t_start", time.time()),
+                ("enforce", True),
+                ("exhausted", False),
+            ]
+        )
+        self.llh_budget = llh_budget
+        max_llh_time = llh_budget["max_time"]
+        max_llh_calls = llh_budget["max_calls"]
+        use_llh_budget = max_llh_time is not None or max_llh_calls is not None
+        method = self._method
+        llh_budget_hits = self.llh_budget_hits
+
+        # LLH cache persists across stages (i.e., calls to this method) for
+        # the same event; entries are also keyed by hypothesis handler since
+        # stages can use different kernels
+        use_llh_cache = self.llh_cache_size > 0
+        llh_cache = self._llh_cache
+        llh_cache_size = self.llh_cache_size
+        llh_cache_stats = self.llh_cache_stats
+        if use_llh_cache:
+            event_id = self._get_event_id(event)
+            if event_id != self._llh_cache_event_id:
+                self._reset_llh_cache(event_id=event_id)
+            llh_cache_stats = self.llh_cache_stats
+            llh_cache_resolution = self._get_llh_cache_resolution()
+            hypo_key = self._hypo_key
+
+        # If resuming this method on this event from a checkpoint, its LLHs
+        # are recorded up front and, when the optimizer asks for them again,
+        # returned without being recomputed or recorded again
+        replay = {}
+        resume_state = self._resume_state
+        self._resume_state = None
+        self._resumed = False
+        if resume_state is not None and (
+            resume_state["event_id"] == self._get_event_id(event)
+            and resume_state["method"] == self._method
+            and resume_state["hypo_key"] == self._hypo_key
+            and resume_state["param_names"] == llh_recorder.param_names
+        ):
+            llh_recorder.extend(
+                llhs=resume_state["llhs"],
+                params=resume_state["params"],
+                aux=resume_state["aux"],
+            )
+            for llh, opt_params in zip(
+                resume_state["llhs"], resume_state["params"][:, :n_opt_params]
+            ):
+                replay[tuple(opt_params)] = llh
+            self._resumed = True
+            print("Replaying {} checkpointed LLHs".format(len(llh_recorder)))
+
+        use_checkpoint = self.checkpoint_dir is not None
+        checkpoint_interval = self.checkpoint_interval
+        # "periodic" can be switched off by optimizers that write checkpoints
+        # themselves when their own state is saved
+        checkpoint_info = dict(t_last=time.time(), periodic=True)
+        self._checkpoint_info = checkpoint_info
+
+        self.setup_time += time.time() - t0
+
+        def get_cache_key(cube):
+            """Key for `cube` in the LLH cache"""
+            return (hypo_key,) + tuple(
+                int(round(val / res)) if res > 0 else float(val)
+                for val, res in zip(cube[:n_opt_params], llh_cache_resolution)
+            )
+
+        def lookup(cube):
+            """Look up `cube` in the LLH cache (if enabled); returns the cache
+            key and the cached `(llh, aux, additional_results)` or None"""
+            if not use_llh_cache:
+                return None, None
+            cache_key = get_cache_key(cube)
+            cached = llh_cache.pop(cache_key, None)
+            if cached is None:
+                return cache_key, None
+            # Re-insert to mark as most recently used
+            llh_cache[cache_key] = cached
+            llh_cache_stats["hits"] += 1
+            return cache_key, cached[0]
+
+        def process(get_llh_retval, pegleg_sources, cache_key):
+            """Derive `(llh, aux, additional_results)` from the return value of
+            `get_llh` and store these in the LLH cache (if enabled)"""
+            llh, pegleg_idx, scalefactor = get_llh_retval[:3]
+            llh += LLH_FUDGE_SUMMAND
+
+            aux = get_llh_retval[3:6]
+
+            assert np.isfinite(llh), "LLH not finite: {}".format(llh)
+            # assert llh <= 0, "LLH positive: {}".format(llh)
+
+            additional_results = []
+
+            if self.hypo_handler.pegleg_kernel:
+                pegleg_result = pegleg_eval(
+                    pegleg_idx=pegleg_idx,
+                    dt=pegleg_muon_dt,
+                    const_e_loss=pegleg_muon_const_e_loss,
+                    pegleg_sources=pegleg_sources if adaptive_pegleg else None,
+                )
+                additional_results.append(pegleg_result)
+
+            if self.hypo_handler.scaling_kernel:
+                additional_results.append(scalefactor * SCALING_CASCADE_ENERGY)
+
+            value = (llh, aux, tuple(additional_results))
+
+            if use_llh_cache:
+                llh_cache_stats["misses"] += 1
+                nbytes = _get_nbytes(cache_key) + _get_nbytes(value)
+                llh_cache[cache_key] = (value, nbytes)
+                llh_cache_stats["bytes"] += nbytes
+                while len(llh_cache) > llh_cache_size:
+                    _, (_, evicted_nbytes) = llh_cache.popitem(last=False)
+                    llh_cache_stats["bytes"] -= evicted_nbytes
+                llh_cache_stats["entries"] = len(llh_cache)
+
+            return value
+
+        def record(cube, value, llh_time):
+            """Record the LLH (and aux values) for `cube`; `llh_time` is the
+            time it took to compute it, or None if it was taken from the cache"""
+            llh, aux, additional_results = value
+
+            result = (
+                tuple(cube[:n_opt_params]) + fixed_param_values + additional_results
+            )
+            llh_recorder.append(llh, result, aux)
+            n_calls = len(llh_recorder)
+            if llh_time is not None:
+                early_termination["num_full"] += 1
+                early_termination["full_time"] += llh_time
+
+            if (
+                use_checkpoint
+                and checkpoint_info["periodic"]
+                and time.time() - checkpoint_info["t_last"] >= checkpoint_interval
+            ):
+                self._write_checkpoint(llh_recorder=llh_recorder)
+                checkpoint_info["t_last"] = time.time()
+
+            if n_calls % REPORT_AFTER == 0:
+                print("")
+                if truth_info:
+                    msg = "truth:                "
+                    for key, val in zip(all_param_names, result):
+                        try:
+                            msg += " %s=%.1f" % (key, truth_info[key])
+                        except KeyError:
+                            pass
+                    print(msg)
+                t_now = time.time()
+                best_llh = llh_recorder.best_llh
+                best_p = llh_recorder.best_param_values
+                msg = "best llh = {:.3f} @ ".format(best_llh)
+                for key, val in zip(all_param_names, best_p):
+                    msg += " %s=%.1f" % (key, val)
+                print(msg)
+                msg = "this llh = {:.3f} @ ".format(llh)
+                for key, val in zip(all_param_names, result):
+                    msg += " %s=%.1f" % (key, val)
+                print(msg)
+                print("{} LLH computed".format(n_calls))
+                print(
+                    "avg time per llh: {:.3f} ms".format(
+                        (t_now - llh_recorder.t_start) / n_calls * 1000
+                    )
+                )
+                print("this llh took:    {:.3f} ms".format((llh_time or 0.) * 1000))
+                print("")
+
+            return llh
+
+        def check_budget():
+            """Raise `LLHBudgetExhaustedError` if the LLH budget is used up"""
+            if not llh_budget["enforce"]:
+                return
+            num_calls = llh_budget["num_calls"]
+            elapsed = time.time() - llh_budget["t_start"]
+            if not (
+                max_llh_calls is not None and num_calls >= max_llh_calls
+                or max_llh_time is not None and elapsed >= max_llh_time
+            ):
+                return
+            with bookkeeping_lock:
+                if not llh_budget["exhausted"]:
+                    llh_budget["exhausted"] = True
+                    llh_budget_hits[method] = llh_budget_hits.get(method, 0) + 1
+            raise LLHBudgetExhaustedError(
+                "LLH budget of method {} used up after {} LLHs in {:.3f} s".format(
+                    method, num_calls, elapsed
+                )
+            )
+
+        def loglike(cube, ndim=None, nparams=None, llh_threshold=None, coarse=False, value=None):  # pylint: disable=unused-argument
             """Get log likelihood values.
 
             Defined as a closure to capture particulars of the event and priors
@@ -1401,21 +2350,70 @@ class Reco(object):
             cube
             ndim : int, optional
             nparams : int, optional
+            llh_threshold : float, optional
+                Caller discards points with LLH below this; points found to
+                be below it are cut short, an upper bound on their LLH is
+                returned, and they are not recorded
+            coarse : bool, optional
+                Compute the LLH with the coarse tables (see
+                `coarse_table_factors` in `Reco`); such LLHs are not recorded
+            value : tuple, optional
+                `(llh, aux, additional_results)` for `cube` already known from
+                an earlier method using the same hypothesis; this is recorded
+                without computing the LLH
 
             Returns
             -------
             llh : float
 
+            Raises
+            ------
+            LLHBudgetExhaustedError
+                If the method's LLH budget is used up
+
             """
             t0 = time.time()
-            if len(t_start) == 0:
-                t_start.append(time.time())
-
-            hypo = OrderedDict(list(zip(opt_param_names, cube)))
+            if llh_recorder.t_start is None:
+                llh_recorder.t_start = time.time()
+            if use_llh_budget:
+                check_budget()
+
+            if replay:
+                with bookkeeping_lock:
+                    llh = replay.pop(tuple(cube[:n_opt_params]), None)
+                if llh is not None:
+                    return llh
+
+            if value is not None:
+                with bookkeeping_lock:
+                    return record(cube, value, llh_time=None)
+
+            if not coarse:
+                with bookkeeping_lock:
+                    cache_key, cached = lookup(cube)
+                    if cached is not None:
+                        return record(cube, cached, llh_time=None)
+
+            workspace = get_workspace()
+            with bookkeeping_lock:
+                llh_budget["num_calls"] += 1
+
+            generic_sources, pegleg_sources, scaling_sources = (
+                hypo_handler.get_sources(dict(zip(opt_param_names, cube)))
+            )
 
-            generic_sources = hypo_handler.get_generic_sources(hypo)
-            pegleg_sources = hypo_handler.get_pegleg_sources(hypo)
-            scaling_sources = hypo_handler.get_scaling_sources(hypo)
+            if coarse:
+                get_llh_retval = self.coarse_get_llh(
+                    generic_sources=generic_sources,
+                    pegleg_sources=pegleg_sources,
+                    scaling_sources=scaling_sources,
+                    event_hit_info=event_hit_info,
+                    event_dom_info=event_dom_info,
+                    pegleg_stepsize=1,
+                    event_hits=event_hits,
+                    workspace=workspace,
+                )
+                return get_llh_retval[0] + LLH_FUDGE_SUMMAND
 
             get_llh_retval = self.get_llh(
                 generic_sources=generic_sources,
@@ -1424,75 +2422,231 @@ class Reco(object):
                 event_hit_info=event_hit_info,
                 event_dom_info=event_dom_info,
                 pegleg_stepsize=1,
+                event_hits=event_hits,
+                workspace=workspace,
+                llh_threshold=(
+                    -np.inf if llh_threshold is None
+                    else llh_threshold - LLH_FUDGE_SUMMAND
+                ),
             )
 
-            llh, pegleg_idx, scalefactor = get_llh_retval[:3]
-            llh += LLH_FUDGE_SUMMAND
-            aux_values.append(get_llh_retval[3:])
+            with bookkeeping_lock:
+                if get_llh_retval[6]:
+                    early_termination["num_terminated"] += 1
+                    early_termination["terminated_time"] += time.time() - t0
+                    return get_llh_retval[0] + LLH_FUDGE_SUMMAND
 
-            assert np.isfinite(llh), "LLH not finite: {}".format(llh)
-            # assert llh <= 0, "LLH positive: {}".format(llh)
+                value = process(get_llh_retval, pegleg_sources, cache_key)
+                return record(cube, value, llh_time=time.time() - t0)
 
-            additional_results = []
+        def loglike_batch(cubes):
+            """Get log likelihood values for several points at once.
 
-            if self.hypo_handler.pegleg_kernel:
-                pegleg_result = pegleg_eval(
-                    pegleg_idx=pegleg_idx,
-                    dt=pegleg_muon_dt,
-                    const_e_loss=pegleg_muon_const_e_loss,
-                )
-                additional_results.append(pegleg_result)
+            Sources for all points are generated first and the LLHs are then
+            evaluated on `n_llh_threads` threads (see `Reco`), each with its
+            own scratch buffers; points are recorded in the order given.
+
+            Parameters
+            ----------
+            cubes : shape-(n_points, n_dims) array
+                Parameter values, already scaled to their physical ranges
+
+            Returns
+            -------
+            llhs : shape-(n_points,) array
+
+            Raises
+            ------
+            LLHBudgetExhaustedError
+                If the method's LLH budget is used up (checked before the
+                batch is evaluated)
+
+            """
+            t0 = time.time()
+            if llh_recorder.t_start is None:
+                llh_recorder.t_start = time.time()
+            if use_llh_budget:
+                check_budget()
+
+            with bookkeeping_lock:
+                replayed = [
+                    replay.pop(tuple(cube[:n_opt_params]), None) if replay else None
+                    for cube in cubes
+                ]
+                lookups = [
+                    lookup(cube) if llh is None else (None, None)
+                    for cube, llh in zip(cubes, replayed)
+                ]
+            to_eval = [
+                i
+                for i, (_, cached) in enumerate(lookups)
+                if cached is None and replayed[i] is None
+            ]
+            with bookkeeping_lock:
+                llh_budget["num_calls"] += len(to_eval)
+
+            sources_batch = [
+                hypo_handler.get_sources(dict(zip(opt_param_names, cubes[i])))
+                for i in to_eval
+            ]
+            get_llh_retvals = get_llh_batch(
+                get_llh=self.get_llh,
+                sources_batch=sources_batch,
+                event_hit_info=event_hit_info,
+                event_dom_info=event_dom_info,
+                pegleg_stepsize=1,
+                event_hits=event_hits,
+                workspaces=llh_workspaces,
+                pool=self._llh_pool,
+            )
+            llh_time = (time.time() - t0) / max(1, len(to_eval))
+
+            with bookkeeping_lock:
+                values = [cached for _, cached in lookups]
+                for i, sources, get_llh_retval in zip(
+                    to_eval, sources_batch, get_llh_retvals
+                ):
+                    values[i] = process(get_llh_retval, sources[1], lookups[i][0])
 
-            if self.hypo_handler.scaling_kernel:
-                additional_results.append(scalefactor * SCALING_CASCADE_ENERGY)
+                return np.array(
+                    [
+                        llh
+                        if llh is not None
+                        else record(
+                            cube,
+                            value,
+                            llh_time=None if cached is not None else llh_time,
+                        )
+                        for cube, value, (_, cached), llh in zip(
+                            cubes, values, lookups, replayed
+                        )
+                    ]
+                )
 
-            result = (
-                tuple(cube[:n_opt_params])
-                + tuple(fixed_params.values())
-                + tuple(additional_results)
+        self.loglike = loglike
+        self.loglike_batch = loglike_batch
+
+        return llh_recorder
+
+    def _write_checkpoint(self, llh_recorder=None):
+        """Write the events all methods have finished on and, if
+        `llh_recorder` is given, the LLHs it holds for the method running on
+        the current event to the checkpoint file; see `checkpoint_dir` in
+        `Reco`"""
+        in_progress = None
+        if llh_recorder is not None:
+            in_progress = OrderedDict(
+                [
+                    ("event_id", self._get_event_id(self.event)),
+                    ("method", self._method),
+                    ("hypo_key", self._hypo_key),
+                    ("param_names", llh_recorder.param_names),
+                    ("llhs", llh_recorder.log_likelihoods.copy()),
+                    ("params", llh_recorder.param_values.copy()),
+                    ("aux", llh_recorder.aux_values.copy()),
+                ]
             )
-            param_values.append(result)
+        checkpoint = OrderedDict(
+            [
+                ("completed_events", list(self._completed_events)),
+                ("in_progress", in_progress),
+                # Populations of earlier methods seed warm-started ones
+                ("populations_event_id", self._populations_event_id),
+                ("populations", self._populations),
+            ]
+        )
+        # Write to a temporary file first so a job killed while writing
+        # leaves the previous checkpoint intact
+        checkpoint_fpath = join(self.checkpoint_dir, CHECKPOINT_FNAME)
+        tmp_fpath = checkpoint_fpath + ".tmp"
+        with open(tmp_fpath, "wb") as outfile:
+            pickle.dump(checkpoint, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_fpath, checkpoint_fpath)
+
+    def _store_population(self, method, llh_recorder):
+        """Keep the best (up to `WARM_START_MAX_POINTS`) points found by
+        `method` for the current event so later methods can start from them;
+        see `Reco._get_warm_start`"""
+        event_id = self._get_event_id(self.event)
+        if event_id != self._populations_event_id:
+            self._populations.clear()
+            self._populations_event_id = event_id
+
+        if len(llh_recorder) == 0:
+            return
 
-            log_likelihoods.append(llh)
-            n_calls = len(log_likelihoods)
-            t1 = time.time()
+        n_opt_params = self.hypo_handler.n_opt_params
+        n_fixed_params = len(self.hypo_handler.fixed_params)
+        llhs = llh_recorder.log_likelihoods
+        param_values = llh_recorder.param_values
+        aux_values = llh_recorder.aux_values
+        best_indices = np.argsort(llhs)[::-1][:WARM_START_MAX_POINTS]
+        self._populations[method] = OrderedDict(
+            [
+                ("hypo_key", self._hypo_key),
+                ("opt_param_names", tuple(self.hypo_handler.opt_param_names)),
+                (
+                    "points",
+                    param_values[best_indices, :n_opt_params],
+                ),
+                (
+                    "values",
+                    [
+                        (
+                            llhs[i],
+                            tuple(aux_values[i]),
+                            tuple(param_values[i][n_opt_params + n_fixed_params :]),
+                        )
+                        for i in best_indices
+                    ],
+                ),
+            ]
+        )
 
-            if n_calls % REPORT_AFTER == 0:
-                print("")
-                if truth_info:
-                    msg = "truth:                "
-                    for key, val in zip(all_param_names, result):
-                        try:
-                            msg += " %s=%.1f" % (key, truth_info[key])
-                        except KeyError:
-                            pass
-                    print(msg)
-                t_now = time.time()
-                best_idx = np.argmax(log_likelihoods)
-                best_llh = log_likelihoods[best_idx]
-                best_p = param_values[best_idx]
-                msg = "best llh = {:.3f} @ ".format(best_llh)
-                for key, val in zip(all_param_names, best_p):
-                    msg += " %s=%.1f" % (key, val)
-                print(msg)
-                msg = "this llh = {:.3f} @ ".format(llh)
-                for key, val in zip(all_param_names, result):
-                    msg += " %s=%.1f" % (key, val)
-                print(msg)
-                print("{} LLH computed".format(n_calls))
-                print(
-                    "avg time per llh: {:.3f} ms".format(
-                        (t_now - t_start[0]) / n_calls * 1000
-                    )
-                )
-                print("this llh took:    {:.3f} ms".format((t1 - t0) * 1000))
-                print("")
+    def _get_warm_start(self, methods, n_points):
+        """Get the best `n_points` points found for the current event by the
+        first of `methods` that has been run and that has all of the current
+        hypothesis' optimized parameters.
 
-            return llh
+        Returns
+        -------
+        method : str or None
+            None if no population is available
+        points : shape-(n, n_opt_params) array, n <= n_points
+        values : list of `(llh, aux, additional_results)` tuples or None
+            Only if `method` used the same hypothesis, so its LLHs are valid
+            for the current one
 
-        self.loglike = loglike
+        """
+        if (
+            methods is None
+            or self._populations_event_id != self._get_event_id(self.event)
+        ):
+            return None, None, None
+
+        if isinstance(methods, string_types):
+            methods = [methods]
+
+        for method in methods:
+            population = self._populations.get(method, None)
+            if population is None:
+                continue
+            try:
+                indices = [
+                    population["opt_param_names"].index(pname)
+                    for pname in self.hypo_handler.opt_param_names
+                ]
+            except ValueError:
+                continue
+            points = population["points"][:n_points, indices]
+            values = None
+            if population["hypo_key"] == self._hypo_key:
+                values = population["values"][:n_points]
+            return method, points, values
+
+        return None, None, None
 
-    def make_llhp(self, method, log_likelihoods, param_values, aux_values, save):
+    def make_llhp(self, method, llh_recorder, save):
         """Create a structured numpy array containing the reco information;
         also add derived dimensions, and optionally save to disk.
 
@@ -1500,11 +2654,8 @@ class Reco(object):
         ----------
         method : str
 
-        log_likelihoods : array
-
-        param_values : array
-
-        aux_values : array
+        llh_recorder : LLHRecorder
+            As returned by `generate_loglike_method`
 
         save : bool
 
@@ -1516,6 +2667,8 @@ class Reco(object):
         """
         reco_name = "retro_" + method
 
+        self._store_population(method=method, llh_recorder=llh_recorder)
+
         # Setup LLHP dtype
         dim_names = list(self.hypo_handler.all_param_names)
 
@@ -1531,11 +2684,12 @@ class Reco(object):
         llhp_t = np.dtype([(field, np.float32) for field in ["llh"] + all_dim_names])
 
         # dump
-        llhp = np.zeros(shape=len(param_values), dtype=llhp_t)
-        llhp["llh"] = log_likelihoods
-        llhp[dim_names] = param_values
-
-        llhp[aux_names] = aux_values
+        llhp = np.zeros(shape=len(llh_recorder), dtype=llhp_t)
+        llhp["llh"] = llh_recorder.log_likelihoods
+        for dim_name, values in zip(dim_names, llh_recorder.param_values.T):
+            llhp[dim_name] = values
+        for aux_name, values in zip(aux_names, llh_recorder.aux_values.T):
+            llhp[aux_name] = values
 
         # create derived dimensions
         if "energy" in derived_dim_names:
@@ -1612,6 +2766,15 @@ class Reco(object):
         remove_priors : bool
             Remove effect of priors
         fit_meta : mapping, optional
+            Per-event setup time (see `setup_time`) is added as "setup_time"
+            and, if the LLH cache is enabled, its statistics (see
+            `llh_cache_stats`) as "llh_cache_hits", "llh_cache_misses",
+            "llh_cache_hit_rate" and "llh_cache_bytes"; if the method has an
+            LLH budget, whether it was used up for this event as
+            "llh_budget_exhausted" and the number of events for which it has
+            been (see `llh_budget_hits`) as "llh_budget_hits"; if routing is
+            enabled, the index of the event's route in `routes` as "route"
+            and the time expected for it as "route_expected_time"
         save : bool
             store to npy file
 
@@ -1622,6 +2785,72 @@ class Reco(object):
         """
         reco_name = "retro_" + method
 
+        print("per-event setup time: {:.3f} ms".format(self.setup_time * 1e3))
+        if fit_meta is not None:
+            fit_meta["setup_time"] = np.float32(self.setup_time)
+
+        if self.llh_cache_size > 0:
+            stats = self.llh_cache_stats
+            n_lookups = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / n_lookups if n_lookups > 0 else 0.
+            print(
+                "LLH cache: {} hits, {} misses (hit rate {:.3f}), {} entries"
+                " using {:.1f} kB".format(
+                    stats["hits"],
+                    stats["misses"],
+                    hit_rate,
+                    stats["entries"],
+                    stats["bytes"] / 1024,
+                )
+            )
+            if fit_meta is not None:
+                fit_meta["llh_cache_hits"] = np.int32(stats["hits"])
+                fit_meta["llh_cache_misses"] = np.int32(stats["misses"])
+                fit_meta["llh_cache_hit_rate"] = np.float32(hit_rate)
+                fit_meta["llh_cache_bytes"] = np.int64(stats["bytes"])
+
+        budget = self.llh_budget
+        if budget is not None and (
+            budget["max_time"] is not None or budget["max_calls"] is not None
+        ):
+            num_hits = self.llh_budget_hits.get(method, 0)
+            print(
+                "LLH budget {}used up; used up for {} event(s) so far".format(
+                    "" if budget["exhausted"] else "not ", num_hits
+                )
+            )
+            if fit_meta is not None:
+                fit_meta["llh_budget_exhausted"] = np.int8(budget["exhausted"])
+                fit_meta["llh_budget_hits"] = np.int32(num_hits)
+
+        if self.routes is not None:
+            route_time = time.time() - self._route_t0
+            method_stats = self.route_stats.setdefault(
+                self.route_name, OrderedDict()
+            )
+            count, total_time = method_stats.get(method, (0, 0.))
+            expected_time = total_time / count if count > 0 else np.nan
+            print(
+                'route "{}": expected time {:.3f} s, actual time {:.3f} s'.format(
+                    self.route_name, expected_time, route_time
+                )
+            )
+            method_stats[method] = (count + 1, total_time + route_time)
+            unused = sorted(set(self._route_settings) - self._route_keys_used)
+            if unused:
+                sys.stderr.write(
+                    'WARNING: Route "{}" has settings that method "{}" does not'
+                    " use: {}\n".format(self.route_name, method, unused)
+                )
+            if fit_meta is not None:
+                route_names = list(self.routes.keys())
+                fit_meta["route"] = np.int8(
+                    route_names.index(self.route_name)
+                    if self.route_name in route_names
+                    else -1
+                )
+                fit_meta["route_expected_time"] = np.float32(expected_time)
+
         estimate, _ = estimate_from_llhp(
             llhp=llhp,
             treat_dims_independently=False,
@@ -1638,13 +2867,17 @@ class Reco(object):
                 )
             )
             if estimate.dtype.names and "fit_status" in estimate.dtype.names:
-                if estimate["fit_status"] not in (FitStatus.OK, FitStatus.PositiveLLH):
+                if estimate["fit_status"] not in (
+                    FitStatus.OK, FitStatus.PositiveLLH, FitStatus.BudgetExhausted
+                ):
                     raise ValueError(
                         "Postive LLH *and* fit failed with fit_status = {}".format(
                             estimate["fit_status"]
                         )
                     )
-                estimate["fit_status"] = FitStatus.PositiveLLH
+                # A fit cut short by the LLH budget keeps that status
+                if estimate["fit_status"] != FitStatus.BudgetExhausted:
+                    estimate["fit_status"] = FitStatus.PositiveLLH
 
         # Place reco in current event in case another reco depends on it
         if "recos" not in self.event:
@@ -1803,6 +3036,10 @@ class Reco(object):
         stdthresh,
         use_sobol,
         seed,
+        coarse_stdthresh=None,
+        batch_size=None,
+        warm_start=None,
+        warm_start_fraction=0.5,
     ):
         """
         At the moment Cartesian (standard) parameters and spherical parameters
@@ -1835,10 +3072,43 @@ class Reco(object):
             so far)
         seed : int
             Random seed
+        coarse_stdthresh : mapping or None
+            If not None and coarse tables are available (see
+            `coarse_table_factors` in `Reco`), first minimize the LLH computed
+            with the coarse tables until the stddevs of the Cartesian
+            dimensions specified here (same format as `stdthresh`) drop below
+            these values; the live points at that stage then seed the
+            minimization with the full tables. Other stopping criteria apply
+            to both stages.
+        batch_size : int or None
+            Number of trial points CRS2 proposes (and evaluates with
+            `loglike_batch`, in parallel) per iteration with the full tables;
+            defaults to `n_llh_threads` (see `Reco`) and is limited to
+            ``(n_live - 1) // n_dims``. With batches, no LLH evaluations are
+            cut short (since the live points are then not necessarily the best
+            points evaluated)
+        warm_start : string, sequence thereof, or None
+            Method(s) that may already have run on this event; the best points
+            found by the first of these that did replace some of the initial
+            points (see `warm_start_fraction`). If that method used the same
+            hypothesis, their LLHs are reused instead of recomputed. The
+            coarse-table stage (see `coarse_stdthresh`) is skipped when
+            warm-starting. What was used is recorded in
+            `run_info["warm_start"]`. By default, no warm start is used.
+        warm_start_fraction : float in [0, 1]
+            Fraction of the `n_live` initial points replaced when
+            warm-starting; the rest are still drawn from the prior so CRS can
+            get away from a poor earlier fit
 
         Returns
         -------
         run_info : OrderedDict
+        fit_meta : OrderedDict
+            Includes the number and fraction of LLH evaluations cut short
+            because they were below the worst live point, and the time this
+            saved. How often this happens depends on how loose the bound on
+            the hit terms is for the tables in use (see `get_llh` in
+            `retro.tables.pexp_5d`).
         """
         t0 = time.time()
 
@@ -1849,6 +3119,12 @@ class Reco(object):
 
         rand = np.random.RandomState(seed=seed)
 
+        if batch_size is None:
+            batch_size = self.n_llh_threads
+        batch_size = max(1, min(batch_size, (n_live - 1) // self.n_opt_params))
+
+        assert 0 <= warm_start_fraction <= 1, str(warm_start_fraction)
+
         # Record kwargs user supplied (after translation & standardization)
         kwargs = OrderedDict()
         for arg_name in get_arg_names(self.run_crs)[1:]:
@@ -1862,8 +3138,13 @@ class Reco(object):
             ]
         )
 
+        use_coarse = coarse_stdthresh is not None and self.coarse_get_llh is not None
+        if coarse_stdthresh is None:
+            coarse_stdthresh = {}
+
         spherical_pairs = []
         cstdthresh = []
+        coarse_cstdthresh = []
         opt_param_properties = OrderedDict()
         for idx, pname in enumerate(self.hypo_handler.opt_param_names):
             if "azimuth" in pname:
@@ -1885,6 +3166,7 @@ class Reco(object):
                 # "azimuth"
                 assert pname not in stdthresh, "threshold on sph params not implemented yet"
             else:
+                coarse_cstdthresh.append(coarse_stdthresh.get(pname, -1))
                 if pname in stdthresh:
                     thresh = stdthresh[pname]
                     cstdthresh.append(thresh)
@@ -1929,12 +3211,51 @@ class Reco(object):
                 ("num_simplex_successes", np.int32(-1)),
                 ("num_mutation_successes", np.int32(-1)),
                 ("num_failures", np.int32(-1)),
+                ("coarse_iterations", np.int32(-1)),
+                ("coarse_run_time", np.float32(np.nan)),
+                ("num_early_terminated", np.int32(-1)),
+                ("early_termination_fraction", np.float32(np.nan)),
+                ("early_termination_time_saved", np.float32(np.nan)),
                 ("run_time", np.float32(np.nan)),
             ]
         )
 
+        # CRS2 (with one trial point per iteration) replaces its worst live
+        # point only by a better one, so the live points are the `n_live` best
+        # of all points evaluated; trial points whose LLH is known to be below
+        # the worst of these can be cut short
+        live_llhs = []
+        early_termination = self.llh_early_termination
+        counts_at_start = dict(early_termination)
+
+        # Known `(llh, aux, additional_results)` (or None) for the initial
+        # points, in the order these are evaluated, if warm-starting
+        pending_values = deque()
+
         def func(x):
-            return -self.loglike(x)
+            if len(live_llhs) < n_live:
+                value = pending_values.popleft() if pending_values else None
+                llh = self.loglike(x, value=value)
+                heapq.heappush(live_llhs, llh)
+            else:
+                llh = self.loglike(x, llh_threshold=live_llhs[0])
+                if llh > live_llhs[0]:
+                    heapq.heapreplace(live_llhs, llh)
+            return -llh
+
+        if batch_size > 1:
+            def func(x):  # pylint: disable=function-redefined
+                if not pending_values:
+                    return -self.loglike_batch(x)
+                values = [pending_values.popleft() for _ in range(len(x))]
+                llhs = np.empty(len(x))
+                for idx, value in enumerate(values):
+                    if value is not None:
+                        llhs[idx] = self.loglike(x[idx], value=value)
+                to_compute = [idx for idx, value in enumerate(values) if value is None]
+                if to_compute:
+                    llhs[to_compute] = self.loglike_batch(x[to_compute])
+                return -llhs
 
         try:
             initial_points = []
@@ -1954,19 +3275,58 @@ class Reco(object):
                     )
                 else:
                     x = rand.uniform(0, 1, self.n_opt_params)
+                initial_points.append(x)
 
-                # Apply prior xforms to `param_vals` (contents are overwritten)
+            # Apply prior xforms to all points at once (contents are
+            # overwritten)
+            initial_points = self.prior_batch(
+                np.vstack(initial_points).astype(np.float64)
+            )
 
-                self.prior(x)
-                initial_points.append(x)
+            # Replace initial points by the best ones of an earlier method
+            ws_method, ws_points, ws_values = self._get_warm_start(
+                methods=warm_start, n_points=int(warm_start_fraction * n_live)
+            )
+            num_warm = 0 if ws_points is None else len(ws_points)
+            if num_warm > 0:
+                initial_points[:num_warm] = ws_points
+                if ws_values is not None:
+                    pending_values.extend(ws_values)
+                    pending_values.extend([None] * (n_live - num_warm))
+            run_info["warm_start"] = OrderedDict(
+                [
+                    ("method", ws_method),
+                    ("num_points", num_warm),
+                    ("num_calls_saved", 0 if ws_values is None else num_warm),
+                ]
+            )
 
-            initial_points = np.vstack(initial_points)
+            # Move the live points close to the optimum with cheap LLHs from
+            # the coarse tables before switching to the full tables
+            if use_coarse and num_warm == 0:
+                t_coarse = time.time()
+                coarse_fit = spherical_opt(
+                    func=lambda x: -self.loglike(x, coarse=True),
+                    method="CRS2",
+                    initial_points=initial_points,
+                    spherical_indices=spherical_pairs,
+                    max_iter=max_iter,
+                    max_noimprovement=max_noimprovement,
+                    fstdthresh=min_llh_std,
+                    cstdthresh=coarse_cstdthresh,
+                    meta=True,
+                    rand=rand,
+                )
+                initial_points = coarse_fit["final_simplex"][0]
+                fit_meta["coarse_iterations"] = np.int32(coarse_fit["nit"])
+                fit_meta["coarse_run_time"] = np.float32(time.time() - t_coarse)
 
             fit = spherical_opt(
                 func=func,
                 method="CRS2",
                 initial_points=initial_points,
                 spherical_indices=spherical_pairs,
+                batch_size=batch_size,
                 max_iter=max_iter,
                 max_noimprovement=max_noimprovement,
                 fstdthresh=min_llh_std,
@@ -2016,11 +3376,31 @@ class Reco(object):
             fit_meta["num_simplex_successes"] = np.int32(fit["meta"]["num_simplex_successes"])
             fit_meta["num_mutation_successes"] = np.int32(fit["meta"]["num_mutation_successes"])
             fit_meta["num_failures"] = np.int32(fit["meta"]["num_failures"])
+
+            counts = OrderedDict(
+                (key, early_termination[key] - counts_at_start[key])
+                for key in early_termination
+            )
+            num_calls = counts["num_full"] + counts["num_terminated"]
+            fit_meta["num_early_terminated"] = np.int32(counts["num_terminated"])
+            fit_meta["early_termination_fraction"] = np.float32(
+                counts["num_terminated"] / max(1, num_calls)
+            )
+            # Estimated from the mean time of the calls that ran to completion
+            fit_meta["early_termination_time_saved"] = np.float32(
+                counts["num_terminated"] * counts["full_time"] / max(1, counts["num_full"])
+                - counts["terminated_time"]
+            )
             fit_meta["run_time"] = np.float32(time.time() - t0)
 
         except KeyboardInterrupt:
             raise
 
+        except LLHBudgetExhaustedError as error:
+            fit_meta["fit_status"] = np.int8(FitStatus.BudgetExhausted)
+            fit_meta["run_time"] = np.float32(time.time() - t0)
+            print(error)
+
         except MissingOrInvalidPrefitError:
             fit_meta["fit_status"] = FitStatus.MissingSeed
             self._print_non_fatal_exception(method=run_info["method"])
@@ -2030,6 +3410,219 @@ class Reco(object):
 
         return run_info, fit_meta
 
+    def get_llh_and_grad(self, param_values, step_sizes=None):
+        """Compute the log likelihood and its gradient with respect to the
+        optimized parameters via central finite differences.
+
+        The LLH uses binned tables and so is piecewise constant on the scale
+        of the table bins; steps are therefore chosen on that scale (see
+        `GRAD_STEP_SIZES`) and the result is a gradient of the LLH smoothed
+        over that scale. Each call evaluates `self.loglike` up to ``2 *
+        n_opt_params + 1`` times (all of which are recorded like any other LLH
+        evaluation). Azimuth angles are wrapped into [0, 2pi); at the bounds
+        of zenith angles ([0, pi]) and energies and lengths (>= 0), steps are
+        shortened to stay within the bounds, down to one-sided differences.
+
+        Parameters
+        ----------
+        param_values : sequence of `n_opt_params` floats
+            Values of `self.hypo_handler.opt_param_names` (i.e., after prior
+            transform)
+        step_sizes : sequence of `n_opt_params` floats, optional
+            Defaults to `self._get_grad_step_sizes()`
+
+        Returns
+        -------
+        llh : float
+        grad : shape (n_opt_params,) array
+
+        """
+        if step_sizes is None:
+            step_sizes = self._get_grad_step_sizes()
+        x = np.array(param_values[: self.n_opt_params], dtype=np.float64)
+
+        lower, upper, periodic = self._get_grad_param_bounds()
+        x[periodic] %= 2 * np.pi
+        x = np.clip(x, lower, upper)
+
+        llh = self.loglike(x.copy())
+        grad = np.zeros(shape=self.n_opt_params, dtype=np.float64)
+        for dim_num, step_size in enumerate(step_sizes):
+            val = x[dim_num]
+            if periodic[dim_num]:
+                val_hi, val_lo = val + step_size, val - step_size
+            else:
+                val_hi = min(val + step_size, upper[dim_num])
+                val_lo = max(val - step_size, lower[dim_num])
+            if val_hi <= val_lo:
+                continue
+            llhs = []
+            for step_val in (val_hi, val_lo):
+                if step_val == val:
+                    llhs.append(llh)
+                    continue
+                x_step = x.copy()
+                x_step[dim_num] = (
+                    step_val % (2 * np.pi) if periodic[dim_num] else step_val
+                )
+                llhs.append(self.loglike(x_step))
+            grad[dim_num] = (llhs[0] - llhs[1]) / (val_hi - val_lo)
+
+        return llh, grad
+
+    def _get_grad_param_bounds(self):
+        """Lower and upper bounds of the optimized parameters as used by
+        `get_llh_and_grad` and `run_lbfgsb_polish`: zenith angles are within
+        [0, pi], energies and lengths are non-negative, and azimuth angles
+        (flagged in `periodic`) are unbounded but periodic in 2pi.
+
+        Returns
+        -------
+        lower, upper : shape (n_opt_params,) arrays
+        periodic : shape (n_opt_params,) bool array
+
+        """
+        pnames = self.hypo_handler.opt_param_names
+        lower = np.full(shape=len(pnames), fill_value=-np.inf)
+        upper = np.full(shape=len(pnames), fill_value=np.inf)
+        periodic = np.zeros(shape=len(pnames), dtype=bool)
+        for dim_num, pname in enumerate(pnames):
+            if "azimuth" in pname:
+                periodic[dim_num] = True
+            elif "zenith" in pname:
+                lower[dim_num], upper[dim_num] = 0, np.pi
+            elif "energy" in pname or "length" in pname:
+                lower[dim_num] = 0
+        return lower, upper, periodic
+
+    def _get_grad_step_sizes(self):
+        """Finite-difference step size for each of the optimized parameters,
+        taken from `GRAD_STEP_SIZES` (1.0 for names matching no key)"""
+        step_sizes = []
+        for pname in self.hypo_handler.opt_param_names:
+            step_size = 1.0
+            for key, val in GRAD_STEP_SIZES.items():
+                if key in pname:
+                    step_size = val
+                    break
+            step_sizes.append(step_size)
+        return np.array(step_sizes, dtype=np.float64)
+
+    def run_lbfgsb_polish(self, x0, max_iter=20, llh_tol=0.05, step_sizes=None):
+        """Polish a fit using scipy's L-BFGS-B with finite-difference gradients
+        from `get_llh_and_grad`.
+
+        Parameters are rescaled by their finite-difference step sizes so the
+        problem is well-conditioned for the minimizer; zenith angles are
+        bounded to [0, pi] and energies and lengths to >= 0, while azimuth
+        angles are left unbounded and wrapped into [0, 2pi).
+
+        Parameters
+        ----------
+        x0 : sequence of `n_opt_params` floats or None
+            Starting point (parameter values after prior transform), e.g. the
+            best point found by a preceding global optimizer; if None, the
+            polish is skipped (and `fit_meta` has fit status `NotSet`)
+        max_iter : int
+            Maximum number of L-BFGS-B iterations
+        llh_tol : float
+            Stop once an iteration improves the LLH by less than this
+        step_sizes : sequence of `n_opt_params` floats, optional
+            Defaults to `self._get_grad_step_sizes()`
+
+        Returns
+        -------
+        run_info : OrderedDict
+        fit_meta : OrderedDict
+
+        """
+        t0 = time.time()
+
+        from scipy import optimize
+
+        kwargs = OrderedDict()
+        for arg_name in get_arg_names(self.run_lbfgsb_polish)[1:]:
+            kwargs[arg_name] = locals()[arg_name]
+        run_info = OrderedDict([("method", "run_lbfgsb_polish"), ("kwargs", kwargs)])
+
+        fit_meta = OrderedDict(
+            [
+                ("fit_status", np.int8(FitStatus.NotSet)),
+                ("iterations", np.int32(-1)),
+                ("num_llh", np.int32(-1)),
+                ("delta_llh", np.float32(np.nan)),
+                ("run_time", np.float32(np.nan)),
+            ]
+        )
+
+        if x0 is None:
+            print("Nothing to polish; skipping")
+            return run_info, fit_meta
+        fit_meta["fit_status"] = np.int8(FitStatus.GeneralFailure)
+
+        if step_sizes is None:
+            step_sizes = self._get_grad_step_sizes()
+        x0 = np.array(x0[: self.n_opt_params], dtype=np.float64)
+
+        lower, upper, periodic = self._get_grad_param_bounds()
+        x0[periodic] %= 2 * np.pi
+        x0 = np.clip(x0, lower, upper)
+        bounds = [
+            (
+                None if np.isinf(low) else (low - x0_val) / step_size,
+                None if np.isinf(high) else (high - x0_val) / step_size,
+            )
+            for low, high, x0_val, step_size in zip(lower, upper, x0, step_sizes)
+        ]
+
+        def func(u):  # pylint: disable=missing-docstring
+            param_values = x0 + u * step_sizes
+            param_values[periodic] %= 2 * np.pi
+            llh, grad = self.get_llh_and_grad(
+                param_values=param_values, step_sizes=step_sizes
+            )
+            return -llh, -grad * step_sizes
+
+        llh_recorder = self.llh_recorder
+        num_recorded_at_start = len(llh_recorder)
+
+        try:
+            llh0 = self.loglike(x0.copy())
+            result = optimize.minimize(
+                func,
+                np.zeros(self.n_opt_params),
+                jac=True,
+                method="L-BFGS-B",
+                bounds=bounds,
+                options=dict(
+                    maxiter=max_iter,
+                    ftol=llh_tol / max(1., abs(llh0)),
+                    gtol=llh_tol,
+                ),
+            )
+            fit_meta["fit_status"] = np.int8(
+                FitStatus.OK if result.success else FitStatus.FailedToConverge
+            )
+            fit_meta["iterations"] = np.int32(result.nit)
+            fit_meta["delta_llh"] = np.float32(-result.fun - llh0)
+
+        except KeyboardInterrupt:
+            raise
+
+        except LLHBudgetExhaustedError as error:
+            fit_meta["fit_status"] = np.int8(FitStatus.BudgetExhausted)
+            print(error)
+
+        except Exception:
+            self._print_non_fatal_exception(method=run_info["method"])
+
+        # LLHs replayed from a checkpoint are not recorded again and so are
+        # not counted
+        fit_meta["num_llh"] = np.int32(len(llh_recorder) - num_recorded_at_start)
+        fit_meta["run_time"] = np.float32(time.time() - t0)
+
+        return run_info, fit_meta
+
     def run_scipy(self, method, eps):
         """Use an optimizer from scipy"""
         t0 = time.time()
@@ -2069,6 +3662,10 @@ class Reco(object):
         except KeyboardInterrupt:
             raise
 
+        except LLHBudgetExhaustedError as error:
+            fit_status = FitStatus.BudgetExhausted
+            print(error)
+
         except MissingOrInvalidPrefitError:
             fit_status = FitStatus.MissingSeed
             self._print_non_fatal_exception(method=run_info["method"])
@@ -2125,6 +3722,10 @@ class Reco(object):
         except KeyboardInterrupt:
             raise
 
+        except LLHBudgetExhaustedError as error:
+            fit_status = FitStatus.BudgetExhausted
+            print(error)
+
         except MissingOrInvalidPrefitError:
             fit_status = FitStatus.MissingSeed
             self._print_non_fatal_exception(method=run_info["method"])
@@ -2280,6 +3881,10 @@ class Reco(object):
         except KeyboardInterrupt:
             raise
 
+        except LLHBudgetExhaustedError as error:
+            fit_status = FitStatus.BudgetExhausted
+            print(error)
+
         except MissingOrInvalidPrefitError:
             fit_status = FitStatus.MissingSeed
             self._print_non_fatal_exception(method=run_info["method"])
@@ -2309,11 +3914,19 @@ class Reco(object):
         maxiter,
         maxcall,
         dlogz,
+        seed=None,
     ):
         """Setup and run Dynesty on an event.
 
         Parameters
         ----------
+        n_live
+        maxiter
+        maxcall
+        dlogz
+        seed : int, optional
+            Seed for the initial live points and the sampler; a fixed seed is
+            needed for the run to be replayed when resuming from a checkpoint
 
         Returns
         -------
@@ -2363,18 +3976,38 @@ class Reco(object):
 
         fit_meta = OrderedDict()
         fit_meta["fit_status"] = np.int8(FitStatus.NotSet)
-        sampler = dynesty.NestedSampler(
-            loglikelihood=self.loglike,
-            prior_transform=self.prior,
-            method="unif",
-            bound="single",
-            update_interval=1,
-            **dn_kwargs
-        )
-        print("sampler instantiated")
-        sampler.run_nested(**sampler_kwargs)
 
-        fit_meta["fit_status"] = np.int8(FitStatus.OK)
+        # Initial live points are drawn the same way dynesty would, but with
+        # prior xforms applied to all points at once
+        rstate = np.random.default_rng(seed)
+        live_u = rstate.random((n_live, self.n_opt_params))
+        live_v = self.prior_batch(np.copy(live_u))
+
+        # Proposals are evaluated `queue_size` at a time on the LLH threads
+        if self._llh_pool is not None:
+            dn_kwargs["queue_size"] = self.n_llh_threads
+
+        try:
+            live_logl = self.loglike_batch(live_v)
+            sampler = dynesty.NestedSampler(
+                loglikelihood=self.loglike,
+                prior_transform=self.prior,
+                method="unif",
+                bound="single",
+                update_interval=1,
+                live_points=[live_u, live_v, live_logl],
+                rstate=rstate,
+                pool=self._llh_pool,
+                **dn_kwargs
+            )
+            print("sampler instantiated")
+            sampler.run_nested(**sampler_kwargs)
+            fit_meta["fit_status"] = np.int8(FitStatus.OK)
+
+        except LLHBudgetExhaustedError as error:
+            fit_meta["fit_status"] = np.int8(FitStatus.BudgetExhausted)
+            print(error)
+
         fit_meta["run_time"] = np.float32(time.time() - t0)
 
         print(fit_meta)
@@ -2461,24 +4094,53 @@ class Reco(object):
         )
 
         fit_status = FitStatus.GeneralFailure
-        tmpdir = mkdtemp()
+        dump_callback = None
+        if self.checkpoint_dir is None:
+            tmpdir = mkdtemp()
+        else:
+            # Left in place if interrupted so MultiNest can resume from it;
+            # named by a (short) hash of the event ID since MultiNest limits
+            # the length of its output paths
+            event_id = self._get_event_id(self.event)
+            tmpdir = join(
+                self.checkpoint_dir,
+                "multinest",
+                hashlib.md5(str(event_id).encode("utf-8")).hexdigest()[:16],
+            )
+            if not self._resumed and isdir(tmpdir):
+                rmtree(tmpdir)
+            if not isdir(tmpdir):
+                os.makedirs(tmpdir)
+
+            # Checkpoint only right after MultiNest writes its resume files:
+            # on resuming, MultiNest continues from those, so LLHs recorded
+            # after them would otherwise be replayed _and_ recorded again
+            def dump_callback(*args):  # pylint: disable=unused-argument
+                self._write_checkpoint(llh_recorder=self.llh_recorder)
+
+            self._checkpoint_info["periodic"] = False
+        keep_tmpdir = False
         outputfiles_basename = join(tmpdir, "")
         mn_fit_meta = {}
+        # MultiNest's sampling loop cannot be stopped from the LLH callback
+        self.llh_budget["enforce"] = False
         try:
             pymultinest.run(
                 LogLikelihood=self.loglike,
                 Prior=self.prior,
                 verbose=True,
                 outputfiles_basename=outputfiles_basename,
-                resume=False,
+                resume=self._resumed,
                 write_output=True,
                 n_iter_before_update=REPORT_AFTER,
+                dump_callback=dump_callback,
                 **mn_kwargs
             )
             fit_status = FitStatus.OK
             mn_fit_meta = get_multinest_meta(outputfiles_basename=outputfiles_basename)
 
         except KeyboardInterrupt:
+            keep_tmpdir = self.checkpoint_dir is not None
             raise
 
         except MissingOrInvalidPrefitError:
@@ -2489,7 +4151,10 @@ class Reco(object):
             self._print_non_fatal_exception(method=run_info["method"])
 
         finally:
-            rmtree(tmpdir)
+            self.llh_budget["enforce"] = True
+            self._checkpoint_info["periodic"] = True
+            if not keep_tmpdir:
+                rmtree(tmpdir)
 
         # TODO: If MultiNest fails in specific ways, set fit_status accordingly...
 
@@ -2514,6 +4179,150 @@ class Reco(object):
         return run_info, fit_meta
 
 
+def _setup_test_llh(reco, event, method):
+    """Set up `reco` to compute LLHs on `event` for `method` with the
+    hypothesis of the 1-stage recipes (pegleg muon and scaling cascade) but
+    with priors that need no prefit; used by the tests below.
+
+    Returns
+    -------
+    llh_recorder : LLHRecorder
+
+    """
+    reco.event = event
+    reco._method = method  # pylint: disable=protected-access
+    reco.setup_hypo(
+        cascade_kernel="scaling_aligned_one_dim",
+        track_kernel="pegleg",
+        track_time_step=1.0,
+    )
+    reco.generate_prior_method(
+        x=dict(kind=PRI_UNIFORM, extents=EXT_IC["x"]),
+        y=dict(kind=PRI_UNIFORM, extents=EXT_IC["y"]),
+        z=dict(kind=PRI_UNIFORM, extents=EXT_IC["z"]),
+        time=dict(kind=PRI_TIME_RANGE),
+    )
+    return reco.generate_loglike_method()
+
+
+def test_llh_cache(reco_kw, event, num_points=20):
+    """Check that points served from the LLH cache (see `llh_cache_size` in
+    `Reco`) are recorded with the same LLH, aux, pegleg, and scaling values as
+    fresh evaluations of those points.
+
+    Parameters
+    ----------
+    reco_kw : mapping
+        Keyword arguments for `Reco` (e.g. `dom_tables_kw` and
+        `tdi_tables_kw`) other than the LLH cache settings
+    event : mapping
+        Event as loaded by `StandaloneEvents`
+    num_points : int
+
+    """
+    reco = Reco(llh_cache_size=num_points, **reco_kw)
+    llh_recorder = _setup_test_llh(reco=reco, event=event, method="test")
+    rand = np.random.RandomState(0)
+    cubes = rand.uniform(size=(num_points, reco.n_opt_params))
+    reco.prior_batch(cubes)
+
+    fresh_llhs = [reco.loglike(cube) for cube in cubes]
+    assert reco.llh_cache_stats["misses"] == num_points
+
+    # Same points again, one at a time and as a batch
+    cached_llhs = [reco.loglike(cube) for cube in cubes]
+    batch_llhs = reco.loglike_batch(cubes)
+    assert reco.llh_cache_stats["hits"] == 2 * num_points
+    assert reco.llh_cache_stats["misses"] == num_points
+    assert np.array_equal(cached_llhs, fresh_llhs)
+    assert np.array_equal(batch_llhs, fresh_llhs)
+
+    # Recorded parameter values include the pegleg and scaling results
+    assert len(llh_recorder.param_names) > reco.n_opt_params
+    llhs = llh_recorder.log_likelihoods.reshape(3, num_points)
+    params = llh_recorder.param_values.reshape(3, num_points, -1)
+    aux = llh_recorder.aux_values.reshape(3, num_points, -1)
+    for idx in (1, 2):
+        assert np.array_equal(llhs[idx], llhs[0])
+        assert np.array_equal(params[idx], params[0])
+        assert np.array_equal(aux[idx], aux[0])
+
+    # A later stage on the same event uses the same cache
+    llh_recorder = reco.generate_loglike_method()
+    for cube in cubes:
+        reco.loglike(cube)
+    assert reco.llh_cache_stats["hits"] == 3 * num_points
+    assert np.array_equal(llh_recorder.log_likelihoods, llhs[0])
+    assert np.array_equal(llh_recorder.param_values, params[0])
+    assert np.array_equal(llh_recorder.aux_values, aux[0])
+
+    print("<< PASS : test_llh_cache >>")
+
+
+def test_checkpoint_resume(reco_kw, event, num_before=300):
+    """Check that a CRS run stopped after writing a checkpoint (see
+    `checkpoint_dir` in `Reco`) and then resumed with `resume=True` evaluates
+    the same points and ends with the same LLHs as the same run without
+    interruption.
+
+    Parameters
+    ----------
+    reco_kw : mapping
+        Keyword arguments for `Reco` (e.g. `dom_tables_kw` and
+        `tdi_tables_kw`) other than the checkpoint and LLH budget settings
+    event : mapping
+        Event as loaded by `StandaloneEvents`
+    num_before : int
+        Number of LLHs computed before the run is stopped
+
+    """
+    crs_kw = dict(
+        n_live=60,
+        max_iter=1500,
+        max_noimprovement=300,
+        min_llh_std=0.,
+        stdthresh=dict(x=3, y=3, z=3, time=10),
+        use_sobol=False,
+        seed=0,
+    )
+
+    reco = Reco(**reco_kw)
+    ref_recorder = _setup_test_llh(reco=reco, event=event, method="crs")
+    reco.run_crs(**crs_kw)
+    assert len(ref_recorder) > num_before
+
+    checkpoint_dir = mkdtemp()
+    try:
+        # The LLH budget stops the run; a checkpoint is written at every LLH
+        reco = Reco(
+            checkpoint_dir=checkpoint_dir,
+            checkpoint_interval=0.,
+            llh_calls_budget=num_before,
+            **reco_kw
+        )
+        _setup_test_llh(reco=reco, event=event, method="crs")
+        _, fit_meta = reco.run_crs(**crs_kw)
+        assert fit_meta["fit_status"] == FitStatus.BudgetExhausted
+
+        reco = Reco(checkpoint_dir=checkpoint_dir, resume=True, **reco_kw)
+        llh_recorder = _setup_test_llh(reco=reco, event=event, method="crs")
+        # LLHs cut short count towards the budget but are not recorded
+        num_checkpointed = len(llh_recorder)
+        assert 0 < num_checkpointed <= num_before, num_checkpointed
+        reco.run_crs(**crs_kw)
+    finally:
+        rmtree(checkpoint_dir)
+
+    # Checkpointed LLHs are replayed, not recomputed
+    num_full = reco.llh_early_termination["num_full"]
+    assert num_full == len(ref_recorder) - num_checkpointed, num_full
+    assert np.array_equal(llh_recorder.log_likelihoods, ref_recorder.log_likelihoods)
+    assert np.array_equal(llh_recorder.param_values, ref_recorder.param_values)
+    assert np.array_equal(llh_recorder.aux_values, ref_recorder.aux_values)
+
+    print("<< PASS : test_checkpoint_resume >>")
+
+
 def get_multinest_meta(outputfiles_basename):
     """Get metadata from files that MultiNest writes to disk.
 
@@ -2602,13 +4411,136 @@ def main(description=__doc__):
         --filter='event["header"]["L5_oscNext_bool"] and len(event["hits"]) >= 8'"""
     )
 
+    parser.add_argument(
+        "--track-max-time-step",
+        type=float,
+        default=None,
+        help="""Sample tracks adaptively, with time steps (ns) growing from
+        each recipe's track time step up to this value with distance from the
+        nearest hit DOM. Default is to use fixed time steps.""",
+    )
+    parser.add_argument(
+        "--src-agg-opening-angle",
+        type=float,
+        default=None,
+        help="""Aggregate sources that subtend less than this opening angle
+        (radians) as seen from a DOM into a single effective source when
+        computing expectations. Default is to not aggregate sources.""",
+    )
+    parser.add_argument(
+        "--hypo-backend",
+        choices=init_obj.HYPO_BACKENDS,
+        default="discrete",
+        help="""Hypothesis implementation to use for recipes that do not
+        specify one""",
+    )
+    parser.add_argument(
+        "--coarse-table-factors",
+        type=int,
+        nargs=len(DOM_TABLE_DIMS),
+        default=None,
+        metavar=tuple(dim.upper() for dim in DOM_TABLE_DIMS),
+        help="""Also build coarse DOM tables by merging this many consecutive
+        bins in each dimension; the "fast" and "crs_prefit" recipes then run
+        their first iterations on the coarse tables. Default is to not use
+        coarse tables.""",
+    )
+    parser.add_argument(
+        "--coarse-tdi-factors",
+        type=int,
+        nargs=len(TDI_TABLE_DIMS),
+        default=None,
+        metavar=tuple(dim.upper() for dim in TDI_TABLE_DIMS),
+        help="""Merge this many consecutive bins in each dimension of the TDI
+        tables for use with the coarse DOM tables. Default is to use the full
+        TDI tables.""",
+    )
+    parser.add_argument(
+        "--llh-cache-size",
+        type=int,
+        default=0,
+        help="""Cache up to this many LLH evaluations per event, shared across
+        the stages of a reconstruction and keyed on parameter values quantized
+        to `LLH_CACHE_RESOLUTION`. Default (0) is to not cache.""",
+    )
+    parser.add_argument(
+        "--llh-threads",
+        type=int,
+        default=1,
+        help="""Evaluate LLHs on this many threads; CRS recipes then propose
+        this many trial points per iteration and dynesty recipes evaluate this
+        many proposals at a time""",
+    )
+    parser.add_argument(
+        "--llh-time-budget",
+        type=float,
+        default=None,
+        help="""Stop each reconstruction method after it has spent this many
+        seconds evaluating LLHs for an event, making the estimate from the
+        points evaluated so far. Default is no limit.""",
+    )
+    parser.add_argument(
+        "--llh-calls-budget",
+        type=int,
+        default=None,
+        help="""Stop each reconstruction method after this many LLH
+        evaluations for an event. Default is no limit.""",
+    )
+    parser.add_argument(
+        "--route",
+        action="store_true",
+        help="""Route each event to reco settings by its difficulty (charge,
+        hit DOMs, time spread, and prefit quality) according to the rules in
+        DFLT_ROUTES""",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="""Periodically checkpoint the reconstruction running on the
+        current event (and the events already finished) to this directory""",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=60.,
+        help="""Seconds between checkpoints""",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="""Resume from the checkpoint in --checkpoint-dir: skip the
+        events finished and continue the reconstruction that was running""",
+    )
+
     split_kwargs = init_obj.parse_args(
         dom_tables=True, tdi_tables=True, events=True, parser=parser
     )
     other_kw = split_kwargs.pop("other_kw")
     events_kw = split_kwargs.pop("events_kw")
 
-    my_reco = Reco(**split_kwargs)
+    coarse_table_factors = other_kw.pop("coarse_table_factors")
+    if coarse_table_factors is not None:
+        coarse_table_factors = dict(zip(DOM_TABLE_DIMS, coarse_table_factors))
+    coarse_tdi_factors = other_kw.pop("coarse_tdi_factors")
+    if coarse_tdi_factors is not None:
+        coarse_tdi_factors = dict(zip(TDI_TABLE_DIMS, coarse_tdi_factors))
+
+    my_reco = Reco(
+        track_max_time_step=other_kw.pop("track_max_time_step"),
+        src_agg_opening_angle=other_kw.pop("src_agg_opening_angle"),
+        hypo_backend=other_kw.pop("hypo_backend"),
+        coarse_table_factors=coarse_table_factors,
+        coarse_tdi_factors=coarse_tdi_factors,
+        llh_cache_size=other_kw.pop("llh_cache_size"),
+        n_llh_threads=other_kw.pop("llh_threads"),
+        llh_time_budget=other_kw.pop("llh_time_budget"),
+        llh_calls_budget=other_kw.pop("llh_calls_budget"),
+        routes=DFLT_ROUTES if other_kw.pop("route") else None,
+        checkpoint_dir=other_kw.pop("checkpoint_dir"),
+        checkpoint_interval=other_kw.pop("checkpoint_interval"),
+        resume=other_kw.pop("resume"),
+        **split_kwargs
+    )
     start_time = time.time()
     my_events = StandaloneEvents(events_kw)
     for event in my_events.events:
@@ -20,6 +20,8 @@ __all__ = [
     'TimeCart3DCoord',
     'TimePolCoord',
     'TimeSphCoord',
+    'EventHits',
+    'LlhWorkspace',
     'OMKEY_T',
     'I3POSITION_T',
     'I3DIRECTION_T',
@@ -218,6 +220,52 @@ TimeSphCoord = namedtuple( # pylint: disable=invalid-name
 )
 """Time and spherical coordinate: t, r, theta, phi."""
 
+EventHits = namedtuple( # pylint: disable=invalid-name
+    typename='EventHits',
+    field_names=(
+        'hit_time',
+        'hit_charge',
+        'hit_noise',
+        'hit_dom_x',
+        'hit_dom_y',
+        'hit_dom_z',
+        'hit_qe',
+        'hit_table_idx',
+        'hit_log_noise',
+        'noise_llh',
+    )
+)
+"""Structure-of-arrays layout of an event's hits, each `hit_*` field a
+contiguous array of length n_hits: hit time and charge along with the noise
+rate, position, quantum efficiency, and table index of the DOM that recorded
+the hit, and log(hit_noise) in double precision. Used by LLH hot loops in
+place of `EVT_HIT_INFO_T` / `EVT_DOM_INFO_T` record arrays. `noise_llh` is the
+time-dependent LLH of the noise-only hypothesis,
+sum(hit_charge * hit_log_noise)."""
+
+LlhWorkspace = namedtuple( # pylint: disable=invalid-name
+    typename='LlhWorkspace',
+    field_names=(
+        'hit_exps',
+        't_indep_exps',
+        'llhs',
+        'scalefactors',
+        'segment_scalefactors',
+        'hit_active',
+        'active_hits',
+        'num_active_hits',
+        'terminated_early',
+    )
+)
+"""Scratch buffers reused across LLH evaluations for one event: `hit_exps`
+has shape (n_rows, n_hits), `t_indep_exps` and `segment_scalefactors` have
+shape (n_rows,), and `llhs` and `scalefactors` have shape (max_llhs,).
+`active_hits[:num_active_hits[0]]` are the indices of the hits that have
+received expectation from any source since the start of the current LLH
+evaluation, and `hit_active` flags these hits. `terminated_early[0]` is
+whether the last LLH evaluation was stopped early because it could not reach
+the LLH threshold it was given. Not safe to share between threads."""
+
 
 OMKEY_T = np.dtype(
     [
@@ -882,6 +930,7 @@ class FitStatus(enum.IntEnum):
     FailedToConverge = 30
     MissingSeed = 40
     InsufficientQuality = 50
+    BudgetExhausted = 60  # NOT present in IceCube / icetray software
 
 
 class LocationType(enum.IntEnum):
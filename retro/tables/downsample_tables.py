@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=wrong-import-position
+
+"""
+Downsample (rebin by integer factors) Cherenkov 5D tables, their
+time-independent counterparts, template-compressed tables, and TDI tables to
+obtain coarser tables, e.g. for use in pre-fit stages of a reconstruction.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__all__ = [
+    "DOM_TABLE_DIMS",
+    "TDI_TABLE_DIMS",
+    "get_factors",
+    "downsample_bin_edges",
+    "downsample_array",
+    "downsample_templ_compr_table",
+    "downsample_tdi_table",
+    "downsample_ckv_table",
+    "main",
+]
+
+__author__ = "P. Eller, J.L. Lanfranchi"
+
+__license__ = """Copyright 2019 Philipp Eller and Justin L. Lanfranchi
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License."""
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from copy import copy
+from os.path import abspath, dirname, join
+import pickle
+import sys
+
+import numpy as np
+
+if __name__ == "__main__" and __package__ is None:
+    RETRO_DIR = dirname(dirname(dirname(abspath(__file__))))
+    if RETRO_DIR not in sys.path:
+        sys.path.append(RETRO_DIR)
+from retro import load_pickle
+from retro.tables.ckv_tables import CKV_TABLE_KEYS, load_ckv_table
+from retro.utils.misc import expand, mkdir
+
+
+DOM_TABLE_DIMS = ("r", "costheta", "t", "costhetadir", "deltaphidir")
+"""Dimensions of single-DOM 5D tables, in the order of the table's axes"""
+
+TDI_TABLE_DIMS = ("x", "y", "z", "costhetadir", "phidir")
+"""Dimensions of TDI tables, in the order of the table's axes"""
+
+
+def get_factors(factors, dims):
+    """Convert a mapping `factors` from dimension name to integer downsampling
+    factor into a tuple of factors, one per entry in `dims`.
+
+    Parameters
+    ----------
+    factors : mapping or None
+        Dimensions not specified are not downsampled (factor 1)
+    dims : sequence of str
+
+    Returns
+    -------
+    factors : tuple of int
+
+    """
+    if factors is None:
+        factors = {}
+    unknown = set(factors.keys()).difference(dims)
+    if unknown:
+        raise ValueError(
+            "Unknown dimension(s) {}; must be one of {}".format(sorted(unknown), dims)
+        )
+    factors = tuple(int(factors.get(dim, 1)) for dim in dims)
+    if any(factor < 1 for factor in factors):
+        raise ValueError("Factors must be integers >= 1; got {}".format(factors))
+    return factors
+
+
+def downsample_bin_edges(bin_edges, factor):
+    """Merge each `factor` consecutive bins into one.
+
+    Parameters
+    ----------
+    bin_edges : 1D array
+    factor : int >= 1
+        Must evenly divide the number of bins
+
+    Returns
+    -------
+    coarse_bin_edges : 1D array
+
+    """
+    bin_edges = np.asarray(bin_edges)
+    n_bins = len(bin_edges) - 1
+    if factor < 1 or n_bins % factor != 0:
+        raise ValueError(
+            "Factor {} does not evenly divide {} bins".format(factor, n_bins)
+        )
+    return bin_edges[::factor]
+
+
+def _group_trailing_axes(array, factors):
+    """Reshape `array` such that all fine bins that fall into a coarse bin are
+    found along a new last axis. Leading axes of `array` not covered by
+    `factors` (e.g. the table index of stacked tables) are left as-is.
+
+    Returns an array of shape ``leading_shape + coarse_shape + (prod(factors),)``
+    """
+    n_lead = array.ndim - len(factors)
+    if n_lead < 0:
+        raise ValueError(
+            "{} factors specified for {}-dimensional array".format(
+                len(factors), array.ndim
+            )
+        )
+    shape = list(array.shape[:n_lead])
+    coarse_shape = []
+    for size, factor in zip(array.shape[n_lead:], factors):
+        if size % factor != 0:
+            raise ValueError(
+                "Factor {} does not evenly divide {} bins".format(factor, size)
+            )
+        coarse_shape.append(size // factor)
+        shape.extend([size // factor, factor])
+
+    lead_axes = list(range(n_lead))
+    coarse_axes = [n_lead + 2*i for i in range(len(factors))]
+    group_axes = [n_lead + 2*i + 1 for i in range(len(factors))]
+    grouped = array.reshape(shape).transpose(lead_axes + coarse_axes + group_axes)
+    return grouped.reshape(
+        tuple(array.shape[:n_lead]) + tuple(coarse_shape) + (-1,)
+    )
+
+
+def downsample_array(array, factors, how="sum"):
+    """Rebin the trailing axes of `array` by integer `factors`.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+    factors : sequence of int
+        One factor per trailing axis of `array`
+    how : str in {"sum", "mean"}
+        Sum photon counts (to be re-normalized with the coarse binning) or
+        average already-normalized quantities (e.g. TDI tables)
+
+    Returns
+    -------
+    coarse_array : numpy.ndarray
+        Same dtype as `array`
+
+    """
+    array = np.asarray(array)
+    grouped = _group_trailing_axes(array, tuple(factors))
+    # Accumulate in double precision even if the table is single precision
+    if how == "sum":
+        coarse = grouped.sum(axis=-1, dtype=np.float64)
+    elif how == "mean":
+        coarse = grouped.mean(axis=-1, dtype=np.float64)
+    else:
+        raise ValueError('`how` must be "sum" or "mean"; got "{}"'.format(how))
+    return coarse.astype(array.dtype)
+
+
+def downsample_templ_compr_table(table, template_library, factors):
+    """Rebin a template-compressed table.
+
+    Template weights are summed over the fine bins that make up a coarse bin,
+    and the coarse bin uses the directionality template of the fine bin with
+    the largest weight (templates are not mixed, so this is an approximation
+    to the directionality of the coarse bin). Templates are rebinned by
+    summing their directional bins.
+
+    Parameters
+    ----------
+    table : shape-(n_r, n_costheta, n_t) array with fields "weight", "index"
+    template_library : shape-(n_templates, n_costhetadir, n_deltaphidir) array
+    factors : sequence of 5 int
+        Factors for (r, costheta, t, costhetadir, deltaphidir)
+
+    Returns
+    -------
+    coarse_table : shape-(n_r', n_costheta', n_t') array
+    coarse_template_library : shape-(n_templates, n_costhetadir', n_deltaphidir') array
+
+    """
+    factors = tuple(factors)
+    weights = _group_trailing_axes(np.asarray(table["weight"]), factors[:3])
+    indices = _group_trailing_axes(np.asarray(table["index"]), factors[:3])
+    dominant = np.argmax(weights, axis=-1)[..., np.newaxis]
+
+    coarse_table = np.empty(shape=weights.shape[:-1], dtype=table.dtype)
+    coarse_table["weight"] = weights.sum(axis=-1, dtype=np.float64)
+    coarse_table["index"] = np.take_along_axis(indices, dominant, axis=-1)[..., 0]
+
+    coarse_template_library = downsample_array(template_library, factors[3:])
+
+    return coarse_table, coarse_template_library
+
+
+def downsample_tdi_table(tdi_table, tdi_meta, factors):
+    """Rebin a TDI table by averaging over the fine bins in each coarse bin.
+
+    Parameters
+    ----------
+    tdi_table : shape-(n_x, n_y, n_z, n_costhetadir, n_phidir) array
+    tdi_meta : mapping
+        As returned by `retro.init_obj.setup_tdi_tables`; must contain
+        "bin_edges"
+    factors : mapping
+        Downsampling factor for each of `TDI_TABLE_DIMS` to be rebinned
+
+    Returns
+    -------
+    coarse_tdi_table : numpy.ndarray
+    coarse_tdi_meta : OrderedDict
+
+    """
+    factors = get_factors(factors, TDI_TABLE_DIMS)
+    coarse_tdi_table = downsample_array(tdi_table, factors, how="mean")
+
+    coarse_tdi_meta = OrderedDict(tdi_meta)
+    bin_edges = copy(tdi_meta["bin_edges"])
+    for dim, factor in zip(TDI_TABLE_DIMS, factors):
+        bin_edges[dim] = downsample_bin_edges(bin_edges[dim], factor)
+    coarse_tdi_meta["bin_edges"] = bin_edges
+    coarse_tdi_meta["downsample_factors"] = OrderedDict(zip(TDI_TABLE_DIMS, factors))
+
+    return coarse_tdi_table, coarse_tdi_meta
+
+
+def downsample_ckv_table(input_dir, output_dir, factors):
+    """Rebin a Cherenkov table stored as .npy files in `input_dir` and write
+    the result (in the same format) to `output_dir`.
+
+    Parameters
+    ----------
+    input_dir, output_dir : str
+    factors : mapping
+        Downsampling factor for each of `DOM_TABLE_DIMS` to be rebinned
+
+    """
+    input_dir = expand(input_dir)
+    output_dir = expand(output_dir)
+    if abspath(output_dir) == abspath(input_dir):
+        raise ValueError("Will not allow output dir to be same as input dir")
+    mkdir(output_dir)
+
+    factors = get_factors(factors, DOM_TABLE_DIMS)
+    table = load_ckv_table(fpath=input_dir, mmap=True)
+
+    for key in CKV_TABLE_KEYS + ["t_indep_ckv_table"]:
+        if key not in table:
+            continue
+        val = table[key]
+        if key == "ckv_table":
+            val = downsample_array(val, factors)
+        elif key == "t_indep_ckv_table":
+            val = downsample_array(val, factors[:2] + factors[3:])
+        elif key.endswith("_bin_edges"):
+            dim = key[: -len("_bin_edges")]
+            val = downsample_bin_edges(val, factors[DOM_TABLE_DIMS.index(dim)])
+        np.save(join(output_dir, key + ".npy"), val)
+
+
+def main(description=__doc__):
+    """Command-line interface to `downsample_ckv_table` and
+    `downsample_tdi_table`."""
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "--kind",
+        required=True,
+        choices=["ckv", "tdi"],
+        help="""Kind of table to downsample: "ckv" for a Cherenkov table
+        directory, "tdi" for a directory containing `ckv_tdi_table.npy`""",
+    )
+    parser.add_argument("--input-dir", required=True, help="Input table dir")
+    parser.add_argument("--output-dir", required=True, help="Output table dir")
+    for dim in sorted(set(DOM_TABLE_DIMS + TDI_TABLE_DIMS)):
+        parser.add_argument(
+            "--{}-factor".format(dim),
+            type=int,
+            default=1,
+            help="""Number of consecutive {} bins to merge""".format(dim),
+        )
+    kwargs = vars(parser.parse_args())
+    kind = kwargs.pop("kind")
+    input_dir = expand(kwargs.pop("input_dir"))
+    output_dir = expand(kwargs.pop("output_dir"))
+
+    dims = DOM_TABLE_DIMS if kind == "ckv" else TDI_TABLE_DIMS
+    factors = OrderedDict()
+    for dim in set(DOM_TABLE_DIMS + TDI_TABLE_DIMS):
+        factor = kwargs.pop("{}_factor".format(dim))
+        if dim in dims:
+            factors[dim] = factor
+        elif factor != 1:
+            raise ValueError(
+                'Dimension "{}" does not exist in {} tables'.format(dim, kind)
+            )
+
+    if kind == "ckv":
+        downsample_ckv_table(
+            input_dir=input_dir, output_dir=output_dir, factors=factors
+        )
+        return
+
+    if abspath(output_dir) == abspath(input_dir):
+        raise ValueError("Will not allow output dir to be same as input dir")
+    mkdir(output_dir)
+    tdi_meta = load_pickle(join(input_dir, "tdi_metadata.pkl"))
+    tdi_meta["bin_edges"] = load_pickle(join(input_dir, "tdi_bin_edges.pkl"))
+    tdi_table = np.load(join(input_dir, "ckv_tdi_table.npy"), mmap_mode="r")
+
+    coarse_tdi_table, coarse_tdi_meta = downsample_tdi_table(
+        tdi_table=tdi_table, tdi_meta=tdi_meta, factors=factors
+    )
+    bin_edges = coarse_tdi_meta.pop("bin_edges")
+    np.save(join(output_dir, "ckv_tdi_table.npy"), coarse_tdi_table)
+    for name, obj in [("tdi_bin_edges", bin_edges), ("tdi_metadata", coarse_tdi_meta)]:
+        with open(join(output_dir, name + ".pkl"), "wb") as outfile:
+            pickle.dump(obj, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,20 @@ __all__ = [
     'MACHINE_EPS',
     'MAX_RAD_SQ',
     'SCALE_FACTOR_MINIMIZER',
+    'SCALE_FACTOR_MAX_ITER',
+    'SCALE_FACTOR_LLH_TOL',
     'PEGLEG_SPACING',
     'PEGLEG_BEST_DELTA_LLH_THRESHOLD',
     'USE_JITTER',
+    'SRC_AGG_MIN_SOURCES',
+    'NUM_OPT_SEGMENTS',
+    'LLH_NUMBA_JIT_KWARGS',
+    'get_event_hits',
+    'get_llh_workspace',
+    'get_llh_batch',
+    'simple_llh',
+    'get_optimal_scalefactor',
+    'test_get_optimal_scalefactor',
     'generate_pexp_and_llh_functions',
 ]
 
@@ -41,6 +52,7 @@ import enum
 import math
 from os.path import abspath, dirname
 import sys
+import types
 
 import numpy as np
 from scipy import stats
@@ -51,8 +63,10 @@ if __name__ == '__main__' and __package__ is None:
         sys.path.append(RETRO_DIR)
 from retro import DFLT_NUMBA_JIT_KWARGS, numba_jit
 from retro.const import SPEED_OF_LIGHT_M_PER_NS, SRC_OMNI, SRC_CKV_BETA1
+from retro.retro_types import EventHits, LlhWorkspace
 from retro.utils.geom import generate_digitizer
 from retro.hypo.discrete_cascade_kernels import SCALING_CASCADE_ENERGY
+from retro.hypo.discrete_muon_kernels import PEGLEG_NUM_SEGMENTS
 
 
 class Minimizer(enum.IntEnum):
@@ -60,6 +74,7 @@ class Minimizer(enum.IntEnum):
     GRADIENT_DESCENT = 0
     NEWTON = 1
     BINARY_SEARCH = 2
+    HALLEY = 3
 
 class TrackType(enum.IntEnum):
     """How to treat track energy depositions"""
@@ -76,8 +91,19 @@ MACHINE_EPS = 1e-10
 MAX_RAD_SQ = 500**2
 """Maximum radius to consider, squared (units of m^2)"""
 
-SCALE_FACTOR_MINIMIZER = Minimizer.BINARY_SEARCH
-"""Choice of which minimizer to use for computing scaling factor for scaling sources"""
+SCALE_FACTOR_MINIMIZER = Minimizer.HALLEY
+"""Choice of which minimizer to use for computing scaling factor for scaling sources.
+`HALLEY` is Halley's method safeguarded by bisection within a bracket of the
+optimum; it typically converges in a few passes over the hits, while
+`BINARY_SEARCH` takes up to 22."""
+
+SCALE_FACTOR_MAX_ITER = 30
+"""Maximum number of iterations (passes over the hits) for the `HALLEY`
+scale factor minimizer"""
+
+SCALE_FACTOR_LLH_TOL = 1e-4
+"""The `HALLEY` scale factor minimizer stops once the LLH improvement predicted
+for a Newton step, grad^2 / (2 * hessian), falls below this value"""
 
 PEGLEG_SPACING = StepSpacing.LINEAR
 """Pegleg adds segments either linearly (same number of segments independent of energy)
@@ -93,6 +119,9 @@ take all LLH that are within this threshold of the maximum LLH"""
 PEGLEG_BREAK_COUNTER = 100
 """After how many steps without improving the llh to exit the pegleg loop adding more track segments"""
 
+NUM_OPT_SEGMENTS = 100
+"""Maximum number of independently-scaled track segments for ``TRACK_TYPE = STOCHASTIC``"""
+
 MAX_CASCADE_ENERGY = 1000.
 """Maximum cascade energy (for LowEn events 1000. is a good value, for HESE 10000000.)"""
 
@@ -103,11 +132,674 @@ MAX_CASCADE_ENERGY = 1000.
 USE_JITTER = True
 """Whether to use a crude jitter implementation"""
 
+SRC_AGG_MIN_SOURCES = 8
+"""Minimum number of sources passed to `pexp` for hierarchical source
+aggregation to be attempted (if enabled); fewer are evaluated one-by-one"""
+
+
+LLH_NUMBA_JIT_KWARGS = dict(DFLT_NUMBA_JIT_KWARGS)
+LLH_NUMBA_JIT_KWARGS.update(fastmath={'reassoc'}, error_model='numpy')
+"""Numba jit kwargs for the LLH-only loops over hits (`simple_llh`,
+`get_optimal_scalefactor`): allowing reassociation of floating point sums
+and skipping Python's division-by-zero checks lets LLVM vectorize these"""
+
+
+def get_event_hits(event_dom_info, event_hit_info):
+    """Create the structure-of-arrays representation of an event's hits
+    consumed by the LLH functions.
+
+    Parameters
+    ----------
+    event_dom_info : shape (n_operational_doms,) array of dtype EVT_DOM_INFO_T
+    event_hit_info : shape (n_hits,) array of dtype EVT_HIT_INFO_T
+
+    Returns
+    -------
+    event_hits : EventHits
+
+    """
+    hit_dom_info = event_dom_info[event_hit_info['event_dom_idx']]
+    hit_log_noise = np.log(hit_dom_info['noise_rate_per_ns'].astype(np.float64))
+    noise_llh = np.sum(event_hit_info['charge'].astype(np.float64) * hit_log_noise)
+    return EventHits(
+        hit_time=np.ascontiguousarray(event_hit_info['time']),
+        hit_charge=np.ascontiguousarray(event_hit_info['charge']),
+        hit_noise=np.ascontiguousarray(hit_dom_info['noise_rate_per_ns']),
+        hit_dom_x=np.ascontiguousarray(hit_dom_info['x']),
+        hit_dom_y=np.ascontiguousarray(hit_dom_info['y']),
+        hit_dom_z=np.ascontiguousarray(hit_dom_info['z']),
+        hit_qe=np.ascontiguousarray(hit_dom_info['quantum_efficiency']),
+        hit_table_idx=np.ascontiguousarray(hit_dom_info['table_idx']),
+        hit_log_noise=hit_log_noise,
+        noise_llh=float(noise_llh),
+    )
+
+
+def get_llh_workspace(num_hits, max_llhs=PEGLEG_NUM_SEGMENTS + 2):
+    """Allocate scratch buffers for `get_llh` to reuse across calls for one
+    event.
+
+    Parameters
+    ----------
+    num_hits : int
+    max_llhs : int
+        Number of pegleg steps (plus two) that fit in the buffers; `get_llh`
+        falls back to allocating temporary arrays for hypotheses with more
+        pegleg sources than this
+
+    Returns
+    -------
+    workspace : LlhWorkspace
+
+    """
+    num_rows = 2 if TRACK_TYPE == TrackType.CONST else NUM_OPT_SEGMENTS
+    return LlhWorkspace(
+        hit_exps=np.zeros(shape=(num_rows, num_hits), dtype=np.float64),
+        t_indep_exps=np.zeros(shape=num_rows, dtype=np.float64),
+        llhs=np.zeros(shape=max_llhs, dtype=np.float64),
+        scalefactors=np.zeros(shape=max_llhs, dtype=np.float64),
+        segment_scalefactors=np.zeros(shape=num_rows, dtype=np.float64),
+        hit_active=np.zeros(shape=num_hits, dtype=np.bool_),
+        active_hits=np.zeros(shape=num_hits, dtype=np.int64),
+        num_active_hits=np.zeros(shape=1, dtype=np.int64),
+        terminated_early=np.zeros(shape=1, dtype=np.bool_),
+    )
+
+
+def get_llh_batch(
+    get_llh,
+    sources_batch,
+    event_hit_info,
+    event_dom_info,
+    pegleg_stepsize,
+    event_hits,
+    workspaces,
+    pool=None,
+):
+    """Evaluate `get_llh` for a batch of hypotheses, split into contiguous
+    chunks, one per workspace. If a `pool` is given, each chunk runs on its own
+    thread with its own workspace (the compiled LLH releases the GIL).
+
+    Parameters
+    ----------
+    get_llh : callable
+        As returned by `generate_pexp_and_llh_functions`
+    sources_batch : sequence of (generic_sources, pegleg_sources, scaling_sources)
+    event_hit_info, event_dom_info, pegleg_stepsize, event_hits
+        See `get_llh`
+    workspaces : sequence of LlhWorkspace
+        One per thread, each as returned by `get_llh_workspace`
+    pool : multiprocessing.pool.ThreadPool, optional
+        Should have at least ``len(workspaces)`` threads; if None, chunks are
+        evaluated sequentially
+
+    Returns
+    -------
+    retvals : list
+        `get_llh` return value for each hypothesis in `sources_batch`
+
+    """
+    sources_batch = list(sources_batch)
+    num_chunks = max(1, min(len(workspaces), len(sources_batch)))
+    bounds = np.linspace(0, len(sources_batch), num_chunks + 1).astype(int)
+
+    def eval_chunk(chunk_idx):
+        workspace = workspaces[chunk_idx]
+        return [
+            get_llh(
+                generic_sources=generic_sources,
+                pegleg_sources=pegleg_sources,
+                scaling_sources=scaling_sources,
+                event_hit_info=event_hit_info,
+                event_dom_info=event_dom_info,
+                pegleg_stepsize=pegleg_stepsize,
+                event_hits=event_hits,
+                workspace=workspace,
+            )
+            for generic_sources, pegleg_sources, scaling_sources in sources_batch[
+                bounds[chunk_idx] : bounds[chunk_idx + 1]
+            ]
+        ]
+
+    if pool is None or num_chunks == 1:
+        chunks = [eval_chunk(chunk_idx) for chunk_idx in range(num_chunks)]
+    else:
+        chunks = pool.map(eval_chunk, range(num_chunks))
+
+    return [retval for chunk in chunks for retval in chunk]
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def _get_buffer(buf, size, fill_value):
+    """Return the first `size` elements of `buf` set to `fill_value`, or a
+    newly-allocated array if `buf` is too small"""
+    if size <= len(buf):
+        out = buf[:size]
+    else:
+        out = np.empty(shape=size, dtype=np.float64)
+    out[:] = fill_value
+    return out
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def _clear_active_hits(workspace):
+    """Reset the active-hit bookkeeping in `workspace` (touching only hits
+    that were marked active)"""
+    for active_idx in range(workspace.num_active_hits[0]):
+        workspace.hit_active[workspace.active_hits[active_idx]] = False
+    workspace.num_active_hits[0] = 0
+
+
+@numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+def _get_active_hits(workspace):
+    """Indices of the hits that received expectation since the last call to
+    `_clear_active_hits`"""
+    return workspace.active_hits[:workspace.num_active_hits[0]]
+
+
+@numba_jit(**LLH_NUMBA_JIT_KWARGS)
+def simple_llh(
+    event_hits,
+    nonscaling_hit_exp,
+    nonscaling_t_indep_exp,
+    active_hits,
+):
+    """Get llh if no scaling sources are present.
+
+    Parameters:
+    -----------
+    event_hits : EventHits
+    nonscaling_hit_exp : shape (n_hits,) array of dtype float
+    nonscaling_t_indep_exp : float
+    active_hits : shape (n_active_hits,) array of ints
+        Indices of all hits with nonzero expectation; all other hits
+        contribute only to the noise-only baseline `event_hits.noise_llh`
+
+    Returns
+    -------
+    llh
+
+    """
+    hit_charge = event_hits.hit_charge
+    hit_noise = event_hits.hit_noise
+    hit_log_noise = event_hits.hit_log_noise
+
+    # Time- and DOM-independent part of LLH
+    llh = -nonscaling_t_indep_exp
+
+    if len(active_hits) == len(hit_charge):
+        # Time-dependent part of LLH (i.e., at hit times)
+        for hit_idx in range(len(hit_charge)):
+            llh += hit_charge[hit_idx] * math.log(
+                hit_noise[hit_idx] + nonscaling_hit_exp[hit_idx]
+            )
+    else:
+        # Noise-only LLH plus the change due to hits with nonzero expectation
+        llh += event_hits.noise_llh
+        for active_idx in range(len(active_hits)):
+            hit_idx = active_hits[active_idx]
+            llh += hit_charge[hit_idx] * (
+                math.log(hit_noise[hit_idx] + nonscaling_hit_exp[hit_idx])
+                - hit_log_noise[hit_idx]
+            )
+
+    return llh
+
+@numba_jit(**LLH_NUMBA_JIT_KWARGS)
+def get_optimal_scalefactor(
+    event_hits,
+    nonscaling_hit_exp,
+    nonscaling_t_indep_exp,
+    nominal_scaling_hit_exp,
+    nominal_scaling_t_indep_exp,
+    initial_scalefactor,
+    active_hits,
+):
+    """Find optimal (highest-likelihood) `scalefactor` for scaling sources.
+
+    Parameters:
+    -----------
+    event_hits : EventHits
+    nonscaling_hit_exp : shape (n_hits, 2) array of dtype float
+        Detected-charge-rate expectation at each hit time due to pegleg sources;
+        this is lambda_d^p(t_{k_d}) in `likelihood_function_derivation.ipynb`
+    nonscaling_t_indep_exp : float
+        Total charge expected across the detector due to non-scaling sources
+        (Lambda^s in `likelihood_function_derivation.ipynb`)
+    nominal_scaling_hit_exp : shape (n_hits, 2) array of dtype float
+        Detected-charge-rate expectation at each hit time due to scaling sources at
+        nominal values (i.e., with `scalefactor = 1`); this quantity is
+        lambda_d^s(t_{k_d}) in `likelihood_function_derivation.ipynb`
+    nominal_scaling_t_indep_exp : float
+        Total charge expected across the detector due to nominal scaling sources
+        (Lambda^s in `likelihood_function_derivation.ipynb`)
+    initial_scalefactor : float > 0
+        Starting point for minimizer
+    active_hits : shape (n_active_hits,) array of ints
+        Indices of all hits with nonzero nonscaling or scaling expectation;
+        all other hits do not depend on `scalefactor` and contribute only to
+        the noise-only baseline `event_hits.noise_llh`
+
+    Returns
+    -------
+    scalefactor
+    llh
+
+    """
+    hit_charge = event_hits.hit_charge
+    hit_noise = event_hits.hit_noise
+
+    # Gather the hits that depend on `scalefactor` into contiguous arrays so
+    # the minimizer's passes over them can be vectorized
+    num_active_hits = len(active_hits)
+    all_hits_active = num_active_hits == len(hit_charge)
+    if all_hits_active:
+        active_charge = hit_charge
+        active_noise = hit_noise
+        active_nonscaling_exp = nonscaling_hit_exp
+        active_nominal_exp = nominal_scaling_hit_exp
+    else:
+        active_charge = np.empty(shape=num_active_hits, dtype=hit_charge.dtype)
+        active_noise = np.empty(shape=num_active_hits, dtype=hit_noise.dtype)
+        active_nonscaling_exp = np.empty(shape=num_active_hits, dtype=np.float64)
+        active_nominal_exp = np.empty(shape=num_active_hits, dtype=np.float64)
+        for active_idx in range(num_active_hits):
+            hit_idx = active_hits[active_idx]
+            active_charge[active_idx] = hit_charge[hit_idx]
+            active_noise[active_idx] = hit_noise[hit_idx]
+            active_nonscaling_exp[active_idx] = nonscaling_hit_exp[hit_idx]
+            active_nominal_exp[active_idx] = nominal_scaling_hit_exp[hit_idx]
+
+    # Note: defining as closure is faster than as external function
+    if SCALE_FACTOR_MINIMIZER in (Minimizer.GRADIENT_DESCENT, Minimizer.BINARY_SEARCH):
+
+        def get_grad_neg_llh_wrt_scalefactor(scalefactor):
+            """Compute the gradient of -LLH with respect to `scalefactor`.
+
+            Typically we use `scalefactor` with cascade energy, .. ::
+
+                cascade_energy = scalefactor * nominal_cascade_energy
+
+            so the gradient is proportional to cascade energy by a factor of
+            `nominal_cascade_energy`.
+
+            Parameters
+            ----------
+            scalefactor : float
+
+            Returns
+            -------
+            grad_neg_llh : float
+
+            """
+
+            # Time- and DOM-independent part of grad(-LLH)
+            grad_neg_llh = nominal_scaling_t_indep_exp
+
+            # Time-dependent part of grad(-LLH) (i.e., at hit times)
+            for hit_idx in range(num_active_hits):
+                grad_neg_llh -= (
+                    active_charge[hit_idx] * active_nominal_exp[hit_idx]
+                    / (
+                        active_noise[hit_idx]
+                        + scalefactor * active_nominal_exp[hit_idx]
+                        + active_nonscaling_exp[hit_idx]
+                    )
+                )
+
+            return grad_neg_llh
+
+    if SCALE_FACTOR_MINIMIZER is Minimizer.GRADIENT_DESCENT:
+        # See, e.g., https://en.wikipedia.org/wiki/Gradient_descent#Python
+
+        #print('Initial scalefactor: ', initial_scalefactor)
+        scalefactor = initial_scalefactor
+        #previous_scalefactor = initial_scalefactor
+        gamma = 0.1 # step size multiplier
+        epsilon = 1e-2 # tolerance
+        iters = 0 # iteration counter
+        max_iter = 500
+        while True:
+            gradient = get_grad_neg_llh_wrt_scalefactor(scalefactor)
+
+            if scalefactor < epsilon:
+                if gradient > 0:
+                    #scalefactor = 0
+                    #print('exiting because pos grad below 0')
+                    break
+
+            else:
+                step = -gamma * gradient
+
+            scalefactor += step
+            scalefactor = max(scalefactor, 0)
+            #print('scalef: ',scalefactor)
+            iters += 1
+            if (
+                abs(step) < epsilon
+                or iters >= max_iter
+            ):
+                break
+
+        #print('arrived at ',scalefactor)
+        if iters >= max_iter:
+            print('exceeded gradient descent iteration limit!')
+            print('arrived at ', scalefactor)
+        #print('\n')
+        scalefactor = max(0., min(MAX_CASCADE_ENERGY / SCALING_CASCADE_ENERGY, scalefactor))
+
+    elif SCALE_FACTOR_MINIMIZER is Minimizer.BINARY_SEARCH:
+
+        epsilon = 1e-2
+        done = False
+        first = 0.
+        first_grad = get_grad_neg_llh_wrt_scalefactor(first)
+        if first_grad > 0 or abs(first_grad) < epsilon:
+            scalefactor = first
+            done = True
+            #print('trivial 0')
+        if not done:
+            last = MAX_CASCADE_ENERGY/SCALING_CASCADE_ENERGY
+            last_grad = get_grad_neg_llh_wrt_scalefactor(last)
+            if last_grad < 0 or abs(last_grad) < epsilon:
+                scalefactor = last
+                done = True
+        if not done:
+            iters = 0
+            while iters < 20:
+                iters += 1
+                test = (first + last)/2.
+                scalefactor = test
+                test_grad = get_grad_neg_llh_wrt_scalefactor(test)
+                #print('test :', test)
+                #print('test_grad :',test_grad)
+                if abs(test_grad) < epsilon:
+                    break
+                elif test_grad < 0:
+                    first = test
+                else:
+                    last = test
+        #print('found :',scalefactor)
+        #print('\n')
+
+    elif SCALE_FACTOR_MINIMIZER is Minimizer.NEWTON:
+
+        def get_newton_step(scalefactor):
+            """Compute the step for the newton method for the `scalefactor`
+
+            the step is defined as -f'/f'' where f is the LLH(scalefactor)
+
+            Parameters
+            ----------
+            scalefactor : float
+
+            Returns
+            -------
+            step : float
+
+            """
+
+            # Time- and DOM-independent part of grad(-LLH)
+            numerator = nominal_scaling_t_indep_exp
+            denominator = 0
+
+            # Time-dependent part of grad(-LLH) (i.e., at hit times)
+            for hit_idx in range(num_active_hits):
+                s = (
+                    active_charge[hit_idx] * active_nominal_exp[hit_idx]
+                    / (
+                        active_noise[hit_idx]
+                        + scalefactor * active_nominal_exp[hit_idx]
+                        + active_nonscaling_exp[hit_idx]
+                    )
+                )
+                numerator -= s
+                denominator += s**2
+
+            if denominator == 0:
+                return -1
+            return numerator / denominator
+
+        scalefactor = initial_scalefactor
+        iters = 0 # iteration counter
+        epsilon = 1e-2
+        max_iter = 100
+        while True:
+            step = get_newton_step(scalefactor)
+            if step == -1:
+                scalefactor = 0
+                break
+            if scalefactor < epsilon and step > 0:
+                break
+            scalefactor -= step
+            #print(scalefactor)
+            scalefactor = max(scalefactor, 0)
+            iters += 1
+            if abs(step) < epsilon or iters >= max_iter:
+                break
+
+        #print('arrived at ',scalefactor, 'in iters = ', iters)
+        #if iters >= max_iter:
+        #    print('exceeded gradient descent iteration limit!')
+        #    print('arrived at ',scalefactor)
+        #print('\n')
+        scalefactor = max(0., min(MAX_CASCADE_ENERGY/SCALING_CASCADE_ENERGY, scalefactor))
+
+    elif SCALE_FACTOR_MINIMIZER is Minimizer.HALLEY:
+        # grad(-LLH) is monotonically increasing and concave in
+        # `scalefactor`, so its root is bracketed by [low, high] where the
+        # gradient is negative at `low` and positive at `high`. Halley
+        # steps (using first & second derivatives of grad(-LLH) computed
+        # in the same pass over the hits) that leave the bracket are
+        # replaced by an evaluation at a not-yet-tested boundary or by
+        # bisection.
+
+        low = 0.
+        high = MAX_CASCADE_ENERGY / SCALING_CASCADE_ENERGY
+        low_tested = False
+        high_tested = False
+        scalefactor = max(low, min(high, initial_scalefactor))
+
+        for _ in range(SCALE_FACTOR_MAX_ITER):
+            # Time- and DOM-independent part of grad(-LLH)
+            grad_neg_llh = nominal_scaling_t_indep_exp
+            grad2_neg_llh = 0.
+            grad3_neg_llh = 0.
+
+            # Time-dependent part of grad(-LLH) and its derivatives
+            for hit_idx in range(num_active_hits):
+                nominal_exp = active_nominal_exp[hit_idx]
+                ratio = nominal_exp / (
+                    active_noise[hit_idx]
+                    + scalefactor * nominal_exp
+                    + active_nonscaling_exp[hit_idx]
+                )
+                charge_ratio = active_charge[hit_idx] * ratio
+                grad_neg_llh -= charge_ratio
+                charge_ratio *= ratio
+                grad2_neg_llh += charge_ratio
+                grad3_neg_llh -= 2 * charge_ratio * ratio
+
+            if grad_neg_llh == 0 or (
+                grad_neg_llh * grad_neg_llh < 2 * SCALE_FACTOR_LLH_TOL * grad2_neg_llh
+            ):
+                break
+
+            if grad_neg_llh > 0:
+                if scalefactor <= low:
+                    break
+                high = scalefactor
+                high_tested = True
+            else:
+                if scalefactor >= high:
+                    break
+                low = scalefactor
+                low_tested = True
+
+            # Halley step; fall back to Newton step if the former is not
+            # well defined far from the optimum
+            denominator = (
+                2 * grad2_neg_llh * grad2_neg_llh - grad_neg_llh * grad3_neg_llh
+            )
+            if denominator > 0:
+                scalefactor -= 2 * grad_neg_llh * grad2_neg_llh / denominator
+            elif grad2_neg_llh > 0:
+                scalefactor -= grad_neg_llh / grad2_neg_llh
+            elif grad_neg_llh > 0:
+                scalefactor = low
+            else:
+                scalefactor = high
+
+            if scalefactor <= low:
+                scalefactor = low if not low_tested else 0.5 * (low + high)
+            elif scalefactor >= high:
+                scalefactor = high if not high_tested else 0.5 * (low + high)
+
+    # -- Calculate llh at the optimal `scalefactor` found -- #
+
+    # Time- and DOM-independent part of LLH
+    llh = -scalefactor * nominal_scaling_t_indep_exp - nonscaling_t_indep_exp
+
+    # Time-dependent part of LLH (i.e., at hit times)
+    for hit_idx in range(num_active_hits):
+        llh += active_charge[hit_idx] * math.log(
+            active_noise[hit_idx]
+            + scalefactor * active_nominal_exp[hit_idx]
+            + active_nonscaling_exp[hit_idx]
+        )
+
+    # Hits without expectation contribute only noise; the noise-only LLH of
+    # the active hits is subtracted here rather than in the loop above
+    if not all_hits_active:
+        llh += event_hits.noise_llh
+        for active_idx in range(num_active_hits):
+            hit_idx = active_hits[active_idx]
+            llh -= hit_charge[hit_idx] * event_hits.hit_log_noise[hit_idx]
+
+    return scalefactor, llh
+
+
+def _compile_get_optimal_scalefactor(minimizer):
+    """Compile a copy of `get_optimal_scalefactor` that uses `minimizer`
+    instead of `SCALE_FACTOR_MINIMIZER`"""
+    py_func = get_optimal_scalefactor.py_func
+    func_globals = dict(py_func.__globals__)
+    func_globals['SCALE_FACTOR_MINIMIZER'] = minimizer
+    func = types.FunctionType(
+        py_func.__code__,
+        func_globals,
+        py_func.__name__,
+        py_func.__defaults__,
+        py_func.__closure__,
+    )
+    # Compiled functions are cached per source location, so don't cache
+    jit_kwargs = dict(LLH_NUMBA_JIT_KWARGS)
+    jit_kwargs['cache'] = False
+    return numba_jit(**jit_kwargs)(func)
+
+
+def test_get_optimal_scalefactor():
+    """Unit test for `get_optimal_scalefactor`: the `HALLEY` minimizer must
+    agree with `BINARY_SEARCH` (to within the latter's tolerance `epsilon`
+    where it converges), never find a worse LLH than it (beyond
+    `SCALE_FACTOR_LLH_TOL`), and return exactly 0 or the maximum scale
+    factor when the optimum is at these bounds."""
+    halley = _compile_get_optimal_scalefactor(Minimizer.HALLEY)
+    binary_search = _compile_get_optimal_scalefactor(Minimizer.BINARY_SEARCH)
+    epsilon = 1e-2
+    max_scalefactor = MAX_CASCADE_ENERGY / SCALING_CASCADE_ENERGY
+
+    rand = np.random.RandomState(0)
+    num_at_bounds = 0
+    for trial in range(500):
+        num_hits = rand.randint(1, 300)
+        hit_charge = rand.uniform(0.2, 3, num_hits).astype(np.float32)
+        hit_noise = rand.uniform(5e-7, 2e-6, num_hits).astype(np.float32)
+        hit_log_noise = np.log(hit_noise.astype(np.float64))
+        dummy = np.zeros(num_hits, dtype=np.float32)
+        event_hits = EventHits(
+            hit_time=dummy,
+            hit_charge=hit_charge,
+            hit_noise=hit_noise,
+            hit_dom_x=dummy,
+            hit_dom_y=dummy,
+            hit_dom_z=dummy,
+            hit_qe=dummy,
+            hit_table_idx=np.zeros(num_hits, dtype=np.int32),
+            hit_log_noise=hit_log_noise,
+            noise_llh=float(np.sum(hit_charge * hit_log_noise)),
+        )
+        nonscaling_hit_exp = (
+            rand.exponential(1e-3, num_hits) * (rand.uniform(size=num_hits) < 0.7)
+        )
+        nominal_scaling_hit_exp = (
+            rand.exponential(10**rand.uniform(-5, -1), num_hits)
+            * (rand.uniform(size=num_hits) < 0.7)
+        )
+        nonscaling_t_indep_exp = rand.exponential(5.)
+        # Every tenth trial, force the optimum to 0 or the max scale factor
+        if trial % 10 == 0:
+            nominal_scaling_t_indep_exp = 1e9
+        elif trial % 10 == 1:
+            nominal_scaling_t_indep_exp = 1e-9
+        else:
+            nominal_scaling_t_indep_exp = 10**rand.uniform(0, 4)
+        if trial % 2:
+            active_hits = np.flatnonzero(
+                (nonscaling_hit_exp > 0) | (nominal_scaling_hit_exp > 0)
+            )
+        else:
+            active_hits = np.arange(num_hits)
+
+        args = (
+            event_hits,
+            nonscaling_hit_exp,
+            nonscaling_t_indep_exp,
+            nominal_scaling_hit_exp,
+            nominal_scaling_t_indep_exp,
+            10.,
+            active_hits,
+        )
+        halley_sf, halley_llh = halley(*args)
+        binary_sf, binary_llh = binary_search(*args)
+
+        # Gradient of -LLH with respect to the scale factor
+        def grad_neg_llh(scalefactor):
+            idx = active_hits
+            return nominal_scaling_t_indep_exp - np.sum(
+                hit_charge[idx] * nominal_scaling_hit_exp[idx] / (
+                    hit_noise[idx]
+                    + scalefactor * nominal_scaling_hit_exp[idx]
+                    + nonscaling_hit_exp[idx]
+                )
+            )
+
+        if grad_neg_llh(0.) >= 0:
+            assert halley_sf == binary_sf == 0, (trial, halley_sf, binary_sf)
+            num_at_bounds += 1
+        elif grad_neg_llh(max_scalefactor) <= 0:
+            assert halley_sf == binary_sf == max_scalefactor, (
+                trial, halley_sf, binary_sf
+            )
+            num_at_bounds += 1
+
+        assert binary_llh - halley_llh <= 10 * SCALE_FACTOR_LLH_TOL, (
+            trial, halley_llh, binary_llh
+        )
+        if abs(grad_neg_llh(binary_sf)) < epsilon:
+            assert abs(halley_llh - binary_llh) < epsilon, (
+                trial, halley_llh, binary_llh
+            )
+
+    assert num_at_bounds >= 100, num_at_bounds
+    print('<< PASS : test_get_optimal_scalefactor >>')
+
 
 def generate_pexp_and_llh_functions(
     dom_tables,
     tdi_tables=None,
     tdi_metas=None,
+    src_agg_opening_angle=None,
 ):
     """Generate a numba-compiled function for computing expected photon counts
     at a DOM, where the table's binning info is used to pre-compute various
@@ -133,6 +825,15 @@ def generate_pexp_and_llh_functions(
         "phidir" must span [-pi, pi] inclusive). All edges must be strictly
         monotonic and increasing.
 
+    src_agg_opening_angle : float > 0 or None
+        If specified, sources are grouped into a tree for each call to `pexp`
+        and any group of sources that subtends less than this angle (in
+        radians) as seen from a DOM, and whose directions agree to within
+        this angle, is replaced by a single merged pseudo-source (summed
+        photons; photon-weighted mean position, time, and direction). Larger
+        values are faster but less accurate; None or 0 disables aggregation
+        and every source is evaluated individually.
+
     Returns
     -------
     pexp : callable
@@ -171,6 +872,8 @@ def generate_pexp_and_llh_functions(
         meta['table_binning'][key] = dom_tables.table_meta[key]
 
     meta['tdi'] = tdi_metas
+    meta['src_agg_opening_angle'] = src_agg_opening_angle
+    src_agg_opening_angle = float(src_agg_opening_angle or 0)
     if len(tdi_tables) == 1:
         tdi_tables = (tdi_tables[0], tdi_tables[0])
 
@@ -206,9 +909,12 @@ def generate_pexp_and_llh_functions(
         dom_tables.table_meta['costhetadir_bin_edges'],
         clip=True
     )
-    digitize_deltaphidir = generate_digitizer(
+    # Bins cos(deltaphidir) into deltaphidir bins exactly as digitizing
+    # acos(cos(deltaphidir)) would
+    digitize_cosdeltaphidir = generate_digitizer(
         dom_tables.table_meta['deltaphidir_bin_edges'],
-        clip=True
+        clip=True,
+        transform='acos',
     )
 
     num_tdi_tables = len(tdi_metas)
@@ -286,6 +992,28 @@ def generate_pexp_and_llh_functions(
     t_indep_dom_tables.flags.writeable = False
     t_indep_dom_table_norms.flags.writeable = False
 
+    # Largest expected charge per source photon at a DOM using each table
+    # from a source in each r-bin or beyond (max over all other bins of norm *
+    # survival probability); bounds the hit expectations for stopping LLH
+    # evaluations early
+    num_tables = len(dom_table_norms)
+    max_exp_per_photon = np.empty(
+        shape=(num_tables, dom_table_norms.shape[1]), dtype=np.float64
+    )
+    if tbl_is_templ_compr:
+        templ_max = dom_tables_template_library.reshape(
+            len(dom_tables_template_library), -1
+        ).max(axis=1)
+    for table_idx in range(num_tables):
+        if tbl_is_templ_compr:
+            templ = dom_tables[table_idx]
+            surv_prob_max = templ['weight'] * templ_max[templ['index']]
+        else:
+            surv_prob_max = dom_tables[table_idx].max(axis=(3, 4))
+        r_max = np.max(dom_table_norms[table_idx] * surv_prob_max.max(axis=1), axis=1)
+        max_exp_per_photon[table_idx] = np.maximum.accumulate(r_max[::-1])[::-1]
+    max_exp_per_photon.flags.writeable = False
+
     if USE_JITTER:
         # Time offsets to sample for DOM jitter
         jitter_dt = np.arange(-10, 11, 2)
@@ -394,6 +1122,8 @@ def generate_pexp_and_llh_functions(
     #   cos(deltaphidir) = (cos(phidir)*dx + sin(phidir)*dy) / rho
     # Finally, solve for deltaphidir
     #   deltaphidir = acos((cos(phidir)*dx + sin(phidir)*dy) / rho)
+    # (in practice, cos(deltaphidir) is binned directly against the
+    # deltaphidir bin edges; see `digitize_cosdeltaphidir`)
 
     # A photon that starts immediately in the past (before the
     # DOM was hit) will show up in the Retro DOM tables in bin
@@ -432,13 +1162,18 @@ def generate_pexp_and_llh_functions(
 
         event_dom_info : shape (n_operational_doms,) array of dtype EVT_DOM_INFO_T
 
-        event_hit_info : shape (n_hits,) array of dtype EVT_HIT_INFO_T
+        event_hits : EventHits
+            See `get_event_hits`
 
         hit_exp : shape (n_hits,) array of floats
             Time-dependent hit expectation at each (actual) hit time;
             initialize outside of this function, as values are incremented
-            within this function. Values in `hit_exp` correspond to the values
-            in `event_hit_info`.
+            within this function. Values in `hit_exp` correspond to the hits
+            in `event_hits`.
+
+        workspace : LlhWorkspace
+            Hits that receive expectation are recorded in the active-hit
+            fields, see `get_llh_workspace`
 
         dom_tables : array
             DOM time-dependent photon survival probability tables. If using an
@@ -464,6 +1199,12 @@ def generate_pexp_and_llh_functions(
         tdi_tables : {type}
             {text}
 
+        max_t_indep_exp : float
+            Stop as soon as `t_indep_exp` is known to exceed this (with TDI
+            tables, once the TDI term is in; otherwise after each DOM) and set
+            `workspace.terminated_early`; the returned `t_indep_exp` and
+            `hit_exp` are then partial. Pass np.inf to disable.
+
         Returns
         -------
         t_indep_exp : float
@@ -478,6 +1219,215 @@ def generate_pexp_and_llh_functions(
         """
     )
 
+    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+    def copy_src(dst, src):
+        """Copy all fields of SRC_T record `src` into record `dst`"""
+        dst['kind'] = src['kind']
+        dst['time'] = src['time']
+        dst['x'] = src['x']
+        dst['y'] = src['y']
+        dst['z'] = src['z']
+        dst['photons'] = src['photons']
+        dst['dir_costheta'] = src['dir_costheta']
+        dst['dir_sintheta'] = src['dir_sintheta']
+        dst['dir_phi'] = src['dir_phi']
+        dst['dir_cosphi'] = src['dir_cosphi']
+        dst['dir_sinphi'] = src['dir_sinphi']
+
+    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+    def build_source_tree(sources, sources_start, sources_stop):
+        """Group `sources[sources_start:sources_stop]` into a binary tree
+        of contiguous index ranges (sources are ordered in time, hence
+        close in space for tracks and cascades) and compute the merged
+        pseudo-source for each node.
+
+        Returns
+        -------
+        node_srcs : shape (n_nodes,) array of dtype SRC_T
+            Merged pseudo-source for each node (for leaves, the source)
+        node_children : shape (n_nodes, 2) array of int
+            Indices of the child nodes, -1 for leaves
+        node_radius : shape (n_nodes,) array of float
+            Radius of the sphere about the node's pseudo-source position
+            containing all of its sources
+        node_mergeable : shape (n_nodes,) array of bool
+            False if the sources in the node are of mixed kinds or
+            directions that are not coherent to within the opening angle
+
+        """
+        num_sources = sources_stop - sources_start
+        max_num_nodes = 2*num_sources - 1
+
+        node_srcs = np.empty(shape=max_num_nodes, dtype=sources.dtype)
+        node_start = np.empty(shape=max_num_nodes, dtype=np.int64)
+        node_stop = np.empty(shape=max_num_nodes, dtype=np.int64)
+        node_children = np.full(shape=(max_num_nodes, 2), fill_value=-1, dtype=np.int64)
+        node_radius = np.zeros(shape=max_num_nodes, dtype=np.float64)
+        node_mergeable = np.ones(shape=max_num_nodes, dtype=np.bool_)
+        # Photon-weighted (unnormalized) direction vector of each node
+        node_dir = np.zeros(shape=(max_num_nodes, 3), dtype=np.float64)
+
+        # Top-down: split ranges in half, children always have larger node
+        # indices than their parents
+        node_start[0] = sources_start
+        node_stop[0] = sources_stop
+        num_nodes = 1
+        node_idx = 0
+        while node_idx < num_nodes:
+            start = node_start[node_idx]
+            stop = node_stop[node_idx]
+            if stop - start > 1:
+                mid = (start + stop) // 2
+                node_start[num_nodes] = start
+                node_stop[num_nodes] = mid
+                node_start[num_nodes + 1] = mid
+                node_stop[num_nodes + 1] = stop
+                node_children[node_idx, 0] = num_nodes
+                node_children[node_idx, 1] = num_nodes + 1
+                num_nodes += 2
+            node_idx += 1
+
+        # Bottom-up: merge children into their parents
+        for node_idx in range(num_nodes - 1, -1, -1):
+            merged = node_srcs[node_idx]
+            left = node_children[node_idx, 0]
+            if left < 0:
+                src = sources[node_start[node_idx]]
+                copy_src(merged, src)
+                node_dir[node_idx, 0] = src['photons'] * src['dir_sintheta'] * src['dir_cosphi']
+                node_dir[node_idx, 1] = src['photons'] * src['dir_sintheta'] * src['dir_sinphi']
+                node_dir[node_idx, 2] = src['photons'] * src['dir_costheta']
+                continue
+
+            right = node_children[node_idx, 1]
+            lsrc = node_srcs[left]
+            rsrc = node_srcs[right]
+
+            # Start from the left child, then overwrite what gets merged
+            copy_src(merged, lsrc)
+
+            photons = np.float64(lsrc['photons']) + np.float64(rsrc['photons'])
+            merged['photons'] = photons
+            if photons <= 0:
+                # No light: position, time, and direction are irrelevant
+                continue
+
+            lwt = lsrc['photons'] / photons
+            rwt = rsrc['photons'] / photons
+            x = lwt*lsrc['x'] + rwt*rsrc['x']
+            y = lwt*lsrc['y'] + rwt*rsrc['y']
+            z = lwt*lsrc['z'] + rwt*rsrc['z']
+            merged['x'] = x
+            merged['y'] = y
+            merged['z'] = z
+            merged['time'] = lwt*lsrc['time'] + rwt*rsrc['time']
+
+            node_radius[node_idx] = max(
+                math.sqrt((lsrc['x'] - x)**2 + (lsrc['y'] - y)**2 + (lsrc['z'] - z)**2)
+                + node_radius[left],
+                math.sqrt((rsrc['x'] - x)**2 + (rsrc['y'] - y)**2 + (rsrc['z'] - z)**2)
+                + node_radius[right],
+            )
+
+            node_mergeable[node_idx] = (
+                node_mergeable[left]
+                and node_mergeable[right]
+                and lsrc['kind'] == rsrc['kind']
+            )
+
+            dir_x = node_dir[left, 0] + node_dir[right, 0]
+            dir_y = node_dir[left, 1] + node_dir[right, 1]
+            dir_z = node_dir[left, 2] + node_dir[right, 2]
+            node_dir[node_idx, 0] = dir_x
+            node_dir[node_idx, 1] = dir_y
+            node_dir[node_idx, 2] = dir_z
+
+            if lsrc['kind'] != SRC_CKV_BETA1:
+                continue
+
+            # Length of the mean of unit direction vectors is ~ 1 - spread^2/2
+            dir_len = math.sqrt(dir_x**2 + dir_y**2 + dir_z**2)
+            if (
+                dir_len <= 0
+                or math.sqrt(max(0., 2*(1 - dir_len/photons))) > src_agg_opening_angle
+            ):
+                node_mergeable[node_idx] = False
+                continue
+
+            costheta = max(-1., min(1., dir_z / dir_len))
+            phi = math.atan2(dir_y, dir_x)
+            merged['dir_costheta'] = costheta
+            merged['dir_sintheta'] = math.sqrt(1 - costheta**2)
+            merged['dir_phi'] = phi
+            merged['dir_cosphi'] = math.cos(phi)
+            merged['dir_sinphi'] = math.sin(phi)
+
+        return node_srcs, node_children, node_radius, node_mergeable
+
+    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+    def select_tree_nodes(
+        node_srcs,
+        node_children,
+        node_radius,
+        node_mergeable,
+        dom_x,
+        dom_y,
+        dom_z,
+        stack,
+        selected_nodes,
+    ):
+        """Select the coarsest set of nodes from a tree built by
+        `build_source_tree` such that each selected node is either a single
+        source or a mergeable group of sources subtending less than
+        `src_agg_opening_angle` (radians) as seen from the DOM. Groups entirely
+        out of range of the DOM are skipped.
+
+        Parameters
+        ----------
+        node_srcs, node_children, node_radius, node_mergeable
+            As returned by `build_source_tree`
+        dom_x, dom_y, dom_z : float
+            DOM position
+        stack, selected_nodes : arrays of int with at least n_nodes elements
+            Scratch space and output, respectively
+
+        Returns
+        -------
+        num_selected_nodes : int
+            Indices of selected nodes are ``selected_nodes[:num_selected_nodes]``
+
+        """
+        r_max = math.sqrt(rsquared_max)
+        num_selected_nodes = 0
+        stack[0] = 0
+        stack_size = 1
+        while stack_size > 0:
+            stack_size -= 1
+            node_idx = stack[stack_size]
+            src = node_srcs[node_idx]
+
+            dist = math.sqrt(
+                (src['x'] - dom_x)**2
+                + (src['y'] - dom_y)**2
+                + (src['z'] - dom_z)**2
+            )
+
+            if dist - node_radius[node_idx] > r_max:
+                continue
+
+            if node_children[node_idx, 0] < 0 or (
+                node_mergeable[node_idx]
+                and node_radius[node_idx] < src_agg_opening_angle * dist
+            ):
+                selected_nodes[num_selected_nodes] = node_idx
+                num_selected_nodes += 1
+            else:
+                stack[stack_size] = node_children[node_idx, 0]
+                stack[stack_size + 1] = node_children[node_idx, 1]
+                stack_size += 2
+
+        return num_selected_nodes
+
     if num_tdi_tables == 0:
 
         @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
@@ -486,25 +1436,61 @@ def generate_pexp_and_llh_functions(
             sources_start,
             sources_stop,
             event_dom_info,
-            event_hit_info,
+            event_hits,
             hit_exp,
+            workspace,
             dom_tables,
             dom_table_norms,
             t_indep_dom_tables,
             t_indep_dom_table_norms,
             tdi_tables, # pylint: disable=unused-argument
+            max_t_indep_exp,
         ): # pylint: disable=missing-docstring, too-many-arguments
             num_operational_doms = len(event_dom_info)
+            hit_time = event_hits.hit_time
+            hit_active = workspace.hit_active
+            active_hits = workspace.active_hits
+            num_active_hits = workspace.num_active_hits
             t_indep_exp = 0.
-            for source_idx in range(sources_start, sources_stop):
-                src = sources[source_idx]
 
-                for op_dom_idx in range(num_operational_doms):
-                    dom_info = event_dom_info[op_dom_idx]
-                    dom_tbl_idx = dom_info['table_idx']
-                    dom_qe = dom_info['quantum_efficiency']
-                    dom_hits_start_idx = dom_info['hits_start_idx']
-                    dom_hits_stop_idx = dom_info['hits_stop_idx']
+            use_tree = (
+                src_agg_opening_angle > 0
+                and sources_stop - sources_start >= SRC_AGG_MIN_SOURCES
+            )
+            if use_tree:
+                srcs, node_children, node_radius, node_mergeable = build_source_tree(
+                    sources, sources_start, sources_stop
+                )
+                stack = np.empty(shape=len(srcs), dtype=np.int64)
+                src_idxs = np.empty(shape=len(srcs), dtype=np.int64)
+            else:
+                srcs = sources
+                src_idxs = np.arange(sources_start, sources_stop)
+                num_srcs = len(src_idxs)
+
+            for op_dom_idx in range(num_operational_doms):
+                dom_info = event_dom_info[op_dom_idx]
+
+                if use_tree:
+                    num_srcs = select_tree_nodes(
+                        srcs,
+                        node_children,
+                        node_radius,
+                        node_mergeable,
+                        dom_info['x'],
+                        dom_info['y'],
+                        dom_info['z'],
+                        stack,
+                        src_idxs,
+                    )
+
+                dom_tbl_idx = dom_info['table_idx']
+                dom_qe = dom_info['quantum_efficiency']
+                dom_hits_start_idx = dom_info['hits_start_idx']
+                dom_hits_stop_idx = dom_info['hits_stop_idx']
+
+                for src_num in range(num_srcs):
+                    src = srcs[src_idxs[src_num]]
 
                     dx = src['x'] - dom_info['x']
                     dy = src['y'] - dom_info['y']
@@ -531,14 +1517,14 @@ def generate_pexp_and_llh_functions(
                         rho = math.sqrt(rhosquared)
 
                         if rho <= MACHINE_EPS:
-                            absdeltaphidir = 0.
+                            cosdeltaphidir = 1.
                         else:
-                            absdeltaphidir = abs(math.acos(
-                                max(-1., min(1., -(src['dir_cosphi']*dx + src['dir_sinphi']*dy) / rho))
-                            ))
+                            cosdeltaphidir = max(
+                                -1., min(1., -(src['dir_cosphi']*dx + src['dir_sinphi']*dy) / rho)
+                            )
 
                         costhetadir_bin_idx = digitize_costhetadir(src['dir_costheta'])
-                        deltaphidir_bin_idx = digitize_deltaphidir(absdeltaphidir)
+                        deltaphidir_bin_idx = digitize_cosdeltaphidir(cosdeltaphidir)
 
                         t_indep_surv_prob = t_indep_dom_tables[dom_tbl_idx][
                             r_bin_idx,
@@ -551,11 +1537,10 @@ def generate_pexp_and_llh_functions(
                     t_indep_exp += src['photons'] * ti_norm * t_indep_surv_prob * dom_qe
 
                     for hit_idx in range(dom_hits_start_idx, dom_hits_stop_idx):
-                        hit_info = event_hit_info[hit_idx]
                         if t_is_residual_time:
-                            nominal_dt = hit_info['time'] - src['time'] - r * recip_max_group_vel
+                            nominal_dt = hit_time[hit_idx] - src['time'] - r * recip_max_group_vel
                         else:
-                            nominal_dt = hit_info['time'] - src['time']
+                            nominal_dt = hit_time[hit_idx] - src['time']
 
                         for jitter_idx in range(num_jitter_time_offsets):
                             dt = nominal_dt + jitter_dt[jitter_idx]
@@ -591,6 +1576,14 @@ def generate_pexp_and_llh_functions(
                             hit_exp[hit_idx] += jitter_weights[jitter_idx] * (
                                 src['photons'] * r_t_bin_norm * surv_prob_at_hit_t * dom_qe
                             )
+                            if not hit_active[hit_idx]:
+                                hit_active[hit_idx] = True
+                                active_hits[num_active_hits[0]] = hit_idx
+                                num_active_hits[0] += 1
+
+                if t_indep_exp > max_t_indep_exp:
+                    workspace.terminated_early[0] = True
+                    return t_indep_exp
 
             return t_indep_exp
 
@@ -598,7 +1591,7 @@ def generate_pexp_and_llh_functions(
             type='int',
             text="""Dummy argument for this version of `pexp` since it doesn't use TDI
             tables (but this argument needs to be present to maintain same
-            interface)"""
+            interface)""",
         )
 
     else: # pexp function given we are using TDI tables
@@ -609,13 +1602,15 @@ def generate_pexp_and_llh_functions(
             sources_start,
             sources_stop,
             event_dom_info,
-            event_hit_info,
+            event_hits,
             hit_exp,
+            workspace,
             dom_tables,
             dom_table_norms,
             t_indep_dom_tables, # pylint: disable=unused-argument
             t_indep_dom_table_norms, # pylint: disable=unused-argument
             tdi_tables,
+            max_t_indep_exp,
         ): # pylint: disable=missing-docstring, too-many-arguments
             # -- Time- and DOM-independent photon-detection expectation -- #
 
@@ -652,19 +1647,63 @@ def generate_pexp_and_llh_functions(
                 else:
                     continue
 
+            if t_indep_exp > max_t_indep_exp:
+                workspace.terminated_early[0] = True
+                return t_indep_exp
+
             # -- Time-dependent photon-det expectation for each hit DOM -- #
 
-            for hit_idx, hit_info in enumerate(event_hit_info):
-                dom_info = event_dom_info[hit_info['event_dom_idx']]
-                dom_tbl_idx = dom_info['table_idx']
-                dom_qe = dom_info['quantum_efficiency']
+            use_tree = (
+                src_agg_opening_angle > 0
+                and sources_stop - sources_start >= SRC_AGG_MIN_SOURCES
+            )
+            if use_tree:
+                srcs, node_children, node_radius, node_mergeable = build_source_tree(
+                    sources, sources_start, sources_stop
+                )
+                stack = np.empty(shape=len(srcs), dtype=np.int64)
+                src_idxs = np.empty(shape=len(srcs), dtype=np.int64)
+            else:
+                srcs = sources
+                src_idxs = np.arange(sources_start, sources_stop)
+                num_srcs = len(src_idxs)
+
+            hit_time = event_hits.hit_time
+            hit_dom_x = event_hits.hit_dom_x
+            hit_dom_y = event_hits.hit_dom_y
+            hit_dom_z = event_hits.hit_dom_z
+            hit_qe = event_hits.hit_qe
+            hit_table_idx = event_hits.hit_table_idx
+            hit_active = workspace.hit_active
+            active_hits = workspace.active_hits
+            num_active_hits = workspace.num_active_hits
+
+            for hit_idx in range(len(hit_time)):
+                dom_x = hit_dom_x[hit_idx]
+                dom_y = hit_dom_y[hit_idx]
+                dom_z = hit_dom_z[hit_idx]
+                dom_tbl_idx = hit_table_idx[hit_idx]
+                dom_qe = hit_qe[hit_idx]
+
+                if use_tree:
+                    num_srcs = select_tree_nodes(
+                        srcs,
+                        node_children,
+                        node_radius,
+                        node_mergeable,
+                        dom_x,
+                        dom_y,
+                        dom_z,
+                        stack,
+                        src_idxs,
+                    )
 
-                for source_idx in range(sources_start, sources_stop):
-                    src = sources[source_idx]
+                for src_num in range(num_srcs):
+                    src = srcs[src_idxs[src_num]]
 
-                    dx = src['x'] - dom_info['x']
-                    dy = src['y'] - dom_info['y']
-                    dz = src['z'] - dom_info['z']
+                    dx = src['x'] - dom_x
+                    dy = src['y'] - dom_y
+                    dz = src['z'] - dom_z
 
                     rhosquared = max(MACHINE_EPS, dx**2 + dy**2)
                     rsquared = rhosquared + dz**2
@@ -681,19 +1720,19 @@ def generate_pexp_and_llh_functions(
                         rho = math.sqrt(rhosquared)
 
                         if rho <= MACHINE_EPS:
-                            absdeltaphidir = 0.
+                            cosdeltaphidir = 1.
                         else:
-                            absdeltaphidir = abs(math.acos(
-                                max(-1., min(1., -(src['dir_cosphi']*dx + src['dir_sinphi']*dy) / rho))
-                            ))
+                            cosdeltaphidir = max(
+                                -1., min(1., -(src['dir_cosphi']*dx + src['dir_sinphi']*dy) / rho)
+                            )
 
                         costhetadir_bin_idx = digitize_costhetadir(src['dir_costheta'])
-                        deltaphidir_bin_idx = digitize_deltaphidir(absdeltaphidir)
+                        deltaphidir_bin_idx = digitize_cosdeltaphidir(cosdeltaphidir)
 
                     if t_is_residual_time:
-                        nominal_dt = hit_info['time'] - src['time'] - r * recip_max_group_vel
+                        nominal_dt = hit_time[hit_idx] - src['time'] - r * recip_max_group_vel
                     else:
-                        nominal_dt = hit_info['time'] - src['time']
+                        nominal_dt = hit_time[hit_idx] - src['time']
 
                     # Note: caching last `t_bin_idx`, `r_t_bin_norm`, and
                     # `surv_prob_at_hit_t` and checking for identical `t_bin_idx` seems
@@ -734,280 +1773,22 @@ def generate_pexp_and_llh_functions(
                         hit_exp[hit_idx] += jitter_weights[jitter_idx] * (
                             src['photons'] * r_t_bin_norm * surv_prob_at_hit_t * dom_qe
                         )
+                        if not hit_active[hit_idx]:
+                            hit_active[hit_idx] = True
+                            active_hits[num_active_hits[0]] = hit_idx
+                            num_active_hits[0] += 1
 
             return t_indep_exp
 
         pexp_.__doc__ = pexp_docstr.format(
             type='tuple of 1 or 2 arrays',
-            text="""TDI tables"""
+            text="""TDI tables""",
         )
 
-    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
-    def simple_llh(
-        event_dom_info,
-        event_hit_info,
-        nonscaling_hit_exp,
-        nonscaling_t_indep_exp,
-    ):
-        """Get llh if no scaling sources are present.
-
-        Parameters:
-        -----------
-        event_dom_info : array of dtype EVT_DOM_INFO_T
-            containing all relevant event per DOM info
-        event_hit_info : array of dtype EVT_HIT_INFO_T
-
-        Returns
-        -------
-        llh
-
-        """
-        # Time- and DOM-independent part of LLH
-        llh = -nonscaling_t_indep_exp
-
-        # Time-dependent part of LLH (i.e., at hit times)
-        for hit_idx, hit_info in enumerate(event_hit_info):
-            llh += hit_info['charge'] * math.log(
-                event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
-                + nonscaling_hit_exp[hit_idx]
-            )
-
-        return llh
-
-    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
-    def get_optimal_scalefactor(
-        event_dom_info,
-        event_hit_info,
-        nonscaling_hit_exp,
-        nonscaling_t_indep_exp,
-        nominal_scaling_hit_exp,
-        nominal_scaling_t_indep_exp,
-        initial_scalefactor,
-    ):
-        """Find optimal (highest-likelihood) `scalefactor` for scaling sources.
-
-        Parameters:
-        -----------
-        event_dom_info : array of dtype EVT_DOM_INFO_T
-            containing all relevant event per DOM info
-        event_hit_info : array of dtype EVT_HIT_INFO_T
-        nonscaling_hit_exp : shape (n_hits, 2) array of dtype float
-            Detected-charge-rate expectation at each hit time due to pegleg sources;
-            this is lambda_d^p(t_{k_d}) in `likelihood_function_derivation.ipynb`
-        nonscaling_t_indep_exp : float
-            Total charge expected across the detector due to non-scaling sources
-            (Lambda^s in `likelihood_function_derivation.ipynb`)
-        nominal_scaling_hit_exp : shape (n_hits, 2) array of dtype float
-            Detected-charge-rate expectation at each hit time due to scaling sources at
-            nominal values (i.e., with `scalefactor = 1`); this quantity is
-            lambda_d^s(t_{k_d}) in `likelihood_function_derivation.ipynb`
-        nominal_scaling_t_indep_exp : float
-            Total charge expected across the detector due to nominal scaling sources
-            (Lambda^s in `likelihood_function_derivation.ipynb`)
-        initial_scalefactor : float > 0
-            Starting point for minimizer
-
-        Returns
-        -------
-        scalefactor
-        llh
-
-        """
-        # Note: defining as closure is faster than as external function
-        if SCALE_FACTOR_MINIMIZER in (Minimizer.GRADIENT_DESCENT, Minimizer.BINARY_SEARCH):
-
-            def get_grad_neg_llh_wrt_scalefactor(scalefactor):
-                """Compute the gradient of -LLH with respect to `scalefactor`.
-
-                Typically we use `scalefactor` with cascade energy, .. ::
-
-                    cascade_energy = scalefactor * nominal_cascade_energy
-
-                so the gradient is proportional to cascade energy by a factor of
-                `nominal_cascade_energy`.
-
-                Parameters
-                ----------
-                scalefactor : float
-
-                Returns
-                -------
-                grad_neg_llh : float
-
-                """
-
-                # Time- and DOM-independent part of grad(-LLH)
-                grad_neg_llh = nominal_scaling_t_indep_exp
-
-                # Time-dependent part of grad(-LLH) (i.e., at hit times)
-                for hit_idx, hit_info in enumerate(event_hit_info):
-                    grad_neg_llh -= (
-                        hit_info['charge'] * nominal_scaling_hit_exp[hit_idx]
-                        / (
-                            event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
-                            + scalefactor * nominal_scaling_hit_exp[hit_idx]
-                            + nonscaling_hit_exp[hit_idx]
-                        )
-                    )
-
-                return grad_neg_llh
-
-        if SCALE_FACTOR_MINIMIZER is Minimizer.GRADIENT_DESCENT:
-            # See, e.g., https://en.wikipedia.org/wiki/Gradient_descent#Python
-
-            #print('Initial scalefactor: ', initial_scalefactor)
-            scalefactor = initial_scalefactor
-            #previous_scalefactor = initial_scalefactor
-            gamma = 0.1 # step size multiplier
-            epsilon = 1e-2 # tolerance
-            iters = 0 # iteration counter
-            max_iter = 500
-            while True:
-                gradient = get_grad_neg_llh_wrt_scalefactor(scalefactor)
-
-                if scalefactor < epsilon:
-                    if gradient > 0:
-                        #scalefactor = 0
-                        #print('exiting because pos grad below 0')
-                        break
-
-                else:
-                    step = -gamma * gradient
-
-                scalefactor += step
-                scalefactor = max(scalefactor, 0)
-                #print('scalef: ',scalefactor)
-                iters += 1
-                if (
-                    abs(step) < epsilon
-                    or iters >= max_iter
-                ):
-                    break
-
-            #print('arrived at ',scalefactor)
-            if iters >= max_iter:
-                print('exceeded gradient descent iteration limit!')
-                print('arrived at ', scalefactor)
-            #print('\n')
-            scalefactor = max(0., min(MAX_CASCADE_ENERGY / SCALING_CASCADE_ENERGY, scalefactor))
-
-        elif SCALE_FACTOR_MINIMIZER is Minimizer.BINARY_SEARCH:
-
-            epsilon = 1e-2
-            done = False
-            first = 0.
-            first_grad = get_grad_neg_llh_wrt_scalefactor(first)
-            if first_grad > 0 or abs(first_grad) < epsilon:
-                scalefactor = first
-                done = True
-                #print('trivial 0')
-            if not done:
-                last = MAX_CASCADE_ENERGY/SCALING_CASCADE_ENERGY
-                last_grad = get_grad_neg_llh_wrt_scalefactor(last)
-                if last_grad < 0 or abs(last_grad) < epsilon:
-                    scalefactor = last
-                    done = True
-            if not done:
-                iters = 0
-                while iters < 20:
-                    iters += 1
-                    test = (first + last)/2.
-                    scalefactor = test
-                    test_grad = get_grad_neg_llh_wrt_scalefactor(test)
-                    #print('test :', test)
-                    #print('test_grad :',test_grad)
-                    if abs(test_grad) < epsilon:
-                        break
-                    elif test_grad < 0:
-                        first = test
-                    else:
-                        last = test
-            #print('found :',scalefactor)
-            #print('\n')
-
-        elif SCALE_FACTOR_MINIMIZER is Minimizer.NEWTON:
-
-            def get_newton_step(scalefactor):
-                """Compute the step for the newton method for the `scalefactor`
-
-                the step is defined as -f'/f'' where f is the LLH(scalefactor)
-
-                Parameters
-                ----------
-                scalefactor : float
-
-                Returns
-                -------
-                step : float
-
-                """
-
-                # Time- and DOM-independent part of grad(-LLH)
-                numerator = nominal_scaling_t_indep_exp
-                denominator = 0
-
-                # Time-dependent part of grad(-LLH) (i.e., at hit times)
-                for hit_idx, hit_info in enumerate(event_hit_info):
-                    s = (
-                        hit_info['charge'] * nominal_scaling_hit_exp[hit_idx]
-                        / (
-                            event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
-                            + scalefactor * nominal_scaling_hit_exp[hit_idx]
-                            + nonscaling_hit_exp[hit_idx]
-                        )
-                    )
-                    numerator -= s
-                    denominator += s**2
-
-                if denominator == 0:
-                    return -1
-                return numerator / denominator
-
-            scalefactor = initial_scalefactor
-            iters = 0 # iteration counter
-            epsilon = 1e-2
-            max_iter = 100
-            while True:
-                step = get_newton_step(scalefactor)
-                if step == -1:
-                    scalefactor = 0
-                    break
-                if scalefactor < epsilon and step > 0:
-                    break
-                scalefactor -= step
-                #print(scalefactor)
-                scalefactor = max(scalefactor, 0)
-                iters += 1
-                if abs(step) < epsilon or iters >= max_iter:
-                    break
-
-            #print('arrived at ',scalefactor, 'in iters = ', iters)
-            #if iters >= max_iter:
-            #    print('exceeded gradient descent iteration limit!')
-            #    print('arrived at ',scalefactor)
-            #print('\n')
-            scalefactor = max(0., min(MAX_CASCADE_ENERGY/SCALING_CASCADE_ENERGY, scalefactor))
-
-        # -- Calculate llh at the optimal `scalefactor` found -- #
-
-        # Time- and DOM-independent part of LLH
-        llh = -scalefactor * nominal_scaling_t_indep_exp - nonscaling_t_indep_exp
-
-        # Time-dependent part of LLH (i.e., at hit times)
-        for hit_idx, hit_info in enumerate(event_hit_info):
-            llh += hit_info['charge'] * math.log(
-                event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
-                + scalefactor * nominal_scaling_hit_exp[hit_idx]
-                + nonscaling_hit_exp[hit_idx]
-            )
-
-        return scalefactor, llh
-
     @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
     def grad(
         sfs,
-        event_dom_info,
-        event_hit_info,
+        event_hits,
         nominal_scaling_hit_exps,
         nominal_scaling_t_indep_exps,
         idx,
@@ -1019,19 +1800,18 @@ def generate_pexp_and_llh_functions(
         g += nominal_scaling_t_indep_exps[:idx]
 
         # Time-dependent part of grad(-LLH) (i.e., at hit times)
-        for hit_idx, hit_info in enumerate(event_hit_info):
+        for hit_idx in range(len(event_hits.hit_charge)):
             norm = (
-                event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
+                event_hits.hit_noise[hit_idx]
                 + np.sum(sfs[:idx] * nominal_scaling_hit_exps[:idx,hit_idx])
             )
-            g -= hit_info['charge'] * nominal_scaling_hit_exps[:idx,hit_idx] / norm
+            g -= event_hits.hit_charge[hit_idx] * nominal_scaling_hit_exps[:idx,hit_idx] / norm
         return g
 
     @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
     def fun(
         sfs,
-        event_dom_info,
-        event_hit_info,
+        event_hits,
         nominal_scaling_hit_exps,
         nominal_scaling_t_indep_exps,
         idx,
@@ -1041,17 +1821,16 @@ def generate_pexp_and_llh_functions(
         llh = - np.sum(sfs[:idx] * nominal_scaling_t_indep_exps[:idx])
 
         # Time-dependent part of LLH (i.e., at hit times)
-        for hit_idx, hit_info in enumerate(event_hit_info):
-            llh += hit_info['charge'] * math.log(
-                event_dom_info[hit_info['event_dom_idx']]['noise_rate_per_ns']
+        for hit_idx in range(len(event_hits.hit_charge)):
+            llh += event_hits.hit_charge[hit_idx] * math.log(
+                event_hits.hit_noise[hit_idx]
                 + np.sum(sfs[:idx] * nominal_scaling_hit_exps[:idx,hit_idx])
             )
         return -llh
 
     @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
     def get_optimal_scalefactors(
-        event_dom_info,
-        event_hit_info,
+        event_hits,
         nominal_scaling_hit_exps,
         nominal_scaling_t_indep_exps,
         scalefacots,
@@ -1061,9 +1840,7 @@ def generate_pexp_and_llh_functions(
 
         Parameters:
         -----------
-        event_dom_info : array of dtype EVT_DOM_INFO_T
-            containing all relevant event per DOM info
-        event_hit_info : array of dtype EVT_HIT_INFO_T
+        event_hits : EventHits
         nominal_scaling_hit_exps : shape (n_sources, n_hits, 2) array of dtype float
             Detected-charge-rate expectation at each hit time due to scaling sources at
             nominal values (i.e., with `scalefactor = 1`); this quantity is
@@ -1132,8 +1909,7 @@ def generate_pexp_and_llh_functions(
             p0[p0 < 1] = 1.
             e0 = fun(
                 p0,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
@@ -1143,8 +1919,7 @@ def generate_pexp_and_llh_functions(
             p1[p1 < 1] = 1.
             e1 = fun(
                 p1,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
@@ -1158,8 +1933,7 @@ def generate_pexp_and_llh_functions(
             p2[p2 < 1] = 1.
             e2 = fun(
                 p2,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
@@ -1177,8 +1951,7 @@ def generate_pexp_and_llh_functions(
             p3[p3 < 1] = 1.
             e3 = fun(
                 p3,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
@@ -1194,16 +1967,14 @@ def generate_pexp_and_llh_functions(
         iter_num = 0
         g = grad(
             scalefacots,
-            event_dom_info,
-            event_hit_info,
+            event_hits,
             nominal_scaling_hit_exps,
             nominal_scaling_t_indep_exps,
             idx,
         )
         llh_old = fun(
             scalefacots,
-            event_dom_info,
-            event_hit_info,
+            event_hits,
             nominal_scaling_hit_exps,
             nominal_scaling_t_indep_exps,
             idx,
@@ -1225,16 +1996,14 @@ def generate_pexp_and_llh_functions(
 
             g1 = grad(
                 scalefacots,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
             )
             llh_new = fun(
                 scalefacots,
-                event_dom_info,
-                event_hit_info,
+                event_hits,
                 nominal_scaling_hit_exps,
                 nominal_scaling_t_indep_exps,
                 idx,
@@ -1262,19 +2031,138 @@ def generate_pexp_and_llh_functions(
         #print(iter_num)
         return -llh_new
 
+    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+    def get_source_bounds(sources, bounds, photons):
+        """Fill `bounds[i]` with the bounding box (x_min, x_max, y_min, y_max,
+        z_min, z_max) and `photons[i]` with the total photons of
+        ``sources[i:]``, for i in ``range(len(sources) + 1)``"""
+        num_sources = len(sources)
+        bounds[num_sources, 0::2] = np.inf
+        bounds[num_sources, 1::2] = -np.inf
+        photons[num_sources] = 0.
+        for source_idx in range(num_sources - 1, -1, -1):
+            src = sources[source_idx]
+            bounds[source_idx, 0] = min(bounds[source_idx + 1, 0], src['x'])
+            bounds[source_idx, 1] = max(bounds[source_idx + 1, 1], src['x'])
+            bounds[source_idx, 2] = min(bounds[source_idx + 1, 2], src['y'])
+            bounds[source_idx, 3] = max(bounds[source_idx + 1, 3], src['y'])
+            bounds[source_idx, 4] = min(bounds[source_idx + 1, 4], src['z'])
+            bounds[source_idx, 5] = max(bounds[source_idx + 1, 5], src['z'])
+            photons[source_idx] = photons[source_idx + 1] + src['photons']
+
+    @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
+    def get_max_llh(
+        event_hits,
+        nonscaling_hit_exp,
+        nonscaling_t_indep_exp,
+        added_bounds,
+        added_photons,
+        nominal_scaling_hit_exp,
+        nominal_scaling_t_indep_exp,
+        max_scalefactor,
+        scalefactor,
+    ):
+        """Upper bound on the LLH of any hypothesis made of the non-scaling
+        sources evaluated so far (`nonscaling_hit_exp` and
+        `nonscaling_t_indep_exp`), sources with `added_photons` photons in
+        total within the bounding box `added_bounds` (see
+        `get_source_bounds`), and scaling sources scaled by up to
+        `max_scalefactor`.
+
+        Each added photon contributes at most `max_exp_per_photon` at the
+        DOM's distance from the box (times the DOM's quantum efficiency) to a
+        hit, while added sources can only increase the time-independent
+        expectation. The LLH is concave in the scale factor, so its maximum
+        over scale factors is bounded by the tangent at a point near the
+        optimum, found by a Newton step from `scalefactor`.
+
+        Parameters
+        ----------
+        event_hits : EventHits
+        nonscaling_hit_exp : shape (n_hits,) array of dtype float
+        nonscaling_t_indep_exp : float
+        added_bounds : shape (6,) array of dtype float
+        added_photons : float
+        nominal_scaling_hit_exp : shape (n_hits,) array of dtype float
+            Ignored if `max_scalefactor` is 0
+        nominal_scaling_t_indep_exp : float
+            Ignored if `max_scalefactor` is 0
+        max_scalefactor : float
+        scalefactor : float
+            Starting point for the tangent
+
+        Returns
+        -------
+        max_llh : float
+
+        """
+        hit_charge = event_hits.hit_charge
+        hit_noise = event_hits.hit_noise
+        hit_dom_x = event_hits.hit_dom_x
+        hit_dom_y = event_hits.hit_dom_y
+        hit_dom_z = event_hits.hit_dom_z
+        hit_qe = event_hits.hit_qe
+        hit_table_idx = event_hits.hit_table_idx
+        num_hits = len(hit_charge)
+
+        # Bound on each hit's non-scaling expectation
+        max_exp = np.empty(shape=num_hits, dtype=np.float64)
+        for hit_idx in range(num_hits):
+            max_exp[hit_idx] = nonscaling_hit_exp[hit_idx]
+            if added_photons > 0:
+                dom_x = hit_dom_x[hit_idx]
+                dom_y = hit_dom_y[hit_idx]
+                dom_z = hit_dom_z[hit_idx]
+                dx = max(added_bounds[0] - dom_x, 0., dom_x - added_bounds[1])
+                dy = max(added_bounds[2] - dom_y, 0., dom_y - added_bounds[3])
+                dz = max(added_bounds[4] - dom_z, 0., dom_z - added_bounds[5])
+                rsquared = dx**2 + dy**2 + dz**2
+                if rsquared <= rsquared_max:
+                    r_bin_idx = digitize_r(max(MACHINE_EPS, math.sqrt(rsquared)))
+                    max_exp[hit_idx] += added_photons * hit_qe[hit_idx] * (
+                        max_exp_per_photon[hit_table_idx[hit_idx], r_bin_idx]
+                    )
+
+        if max_scalefactor <= 0:
+            max_llh = event_hits.noise_llh - nonscaling_t_indep_exp
+            for hit_idx in range(num_hits):
+                max_llh += hit_charge[hit_idx] * math.log1p(
+                    max_exp[hit_idx] / hit_noise[hit_idx]
+                )
+            return max_llh
+
+        for iter_num in range(2):
+            llh = event_hits.noise_llh - nonscaling_t_indep_exp - (
+                scalefactor * nominal_scaling_t_indep_exp
+            )
+            grad = -nominal_scaling_t_indep_exp
+            hess = 0.
+            for hit_idx in range(num_hits):
+                exp = max_exp[hit_idx] + scalefactor * nominal_scaling_hit_exp[hit_idx]
+                llh += hit_charge[hit_idx] * math.log1p(exp / hit_noise[hit_idx])
+                ratio = nominal_scaling_hit_exp[hit_idx] / (hit_noise[hit_idx] + exp)
+                grad += hit_charge[hit_idx] * ratio
+                hess -= hit_charge[hit_idx] * ratio**2
+            if iter_num == 0 and hess < 0:
+                scalefactor = max(0., min(max_scalefactor, scalefactor - grad / hess))
+
+        return llh + max(-scalefactor * grad, (max_scalefactor - scalefactor) * grad)
+
     @numba_jit(**DFLT_NUMBA_JIT_KWARGS)
     def get_llh_(
         generic_sources,
         pegleg_sources,
         scaling_sources,
-        event_hit_info,
         event_dom_info,
+        event_hits,
         pegleg_stepsize,
+        workspace,
         dom_tables,
         dom_table_norms,
         t_indep_dom_tables,
         t_indep_dom_table_norms,
         tdi_tables,
+        llh_threshold,
     ): # pylint: disable=too-many-arguments
         """Compute log likelihood for hypothesis sources given an event.
 
@@ -1294,21 +2182,32 @@ def generate_pexp_and_llh_functions(
             scaling the luminosity of these sources; if not using the pegleg/scaling
             procedure, `scaling_sources` will be an empty array (i.e.,
             `n_scaling_sources = 0`)
-        event_hit_info : shape (n_hits,) array of dtype EVT_HIT_INFO_T
         event_dom_info : shape (n_operational_doms,) array of dtype EVT_DOM_INFO_T
+        event_hits : EventHits
+            See `get_event_hits`
         pegleg_stepsize : int > 0
             Number of pegleg sources to add each time around the pegleg loop; ignored if
             pegleg procedure is not performed (i.e., if there are no `pegleg_sources`)
+        workspace : LlhWorkspace
+            Scratch buffers, see `get_llh_workspace`
         dom_tables
         dom_table_norms
         t_indep_dom_tables
         t_indep_dom_table_norms
         tdi_tables
+        llh_threshold : float
+            Stop as soon as the LLH is known to be below this, using the bound
+            of `get_max_llh`: before the generic
+            sources' hit expectations once their time-independent expectation
+            is too large, and before each further pegleg step once neither the
+            pegleg steps so far nor any longer track can reach it. Only done
+            for ``TRACK_TYPE = CONST``; pass -np.inf to always compute the LLH
 
         Returns
         -------
         llh : float
-            Log-likelihood value at best pegleg hypo
+            Log-likelihood value at best pegleg hypo, or an upper bound on it
+            if `below_threshold`
         pegleg_stop_idx : int or float
             Pegleg stop index for `pegleg_sources` to obtain `llh`. If integer, .. ::
                 pegleg_sources[:pegleg_stop_idx]
@@ -1322,72 +2221,133 @@ def generate_pexp_and_llh_functions(
             delta LLH of best fit pegleg LLH to LLH `PEGLEG_BREAK_COUNTER` track steps before best LLH
         upper_dllh : float >= 0
             delta LLH of best fit pegleg LLH to LLH `PEGLEG_BREAK_COUNTER` track steps after best LLH
+        below_threshold : bool
+            Whether the evaluation was cut short because the LLH was found to
+            be below `llh_threshold`; fully evaluated LLHs below the threshold
+            are not flagged
 
         """
+        _clear_active_hits(workspace)
+        workspace.terminated_early[0] = False
+
         if TRACK_TYPE == TrackType.CONST:
             num_pegleg_sources = len(pegleg_sources)
             num_pegleg_steps = 1 + int(num_pegleg_sources / pegleg_stepsize)
             num_scaling_sources = len(scaling_sources)
-            num_hits = len(event_hit_info)
+            num_hits = len(event_hits.hit_time)
+            use_threshold = llh_threshold > -np.inf
+
+            # -- Storage for exp due to nominal (`scalefactor = 1`) scaling sources -- #
+            nominal_scaling_t_indep_exp = 0.
+            nominal_scaling_hit_exp = workspace.hit_exps[1, :num_hits]
 
             if num_scaling_sources > 0:
-                # -- Storage for exp due to nominal (`scalefactor = 1`) scaling sources -- #
-                nominal_scaling_t_indep_exp = 0.
-                nominal_scaling_hit_exp = np.zeros(shape=num_hits, dtype=np.float64)
+                nominal_scaling_hit_exp[:] = 0.
 
                 nominal_scaling_t_indep_exp += pexp_(
                     sources=scaling_sources,
                     sources_start=0,
                     sources_stop=num_scaling_sources,
                     event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     hit_exp=nominal_scaling_hit_exp,
+                    workspace=workspace,
                     dom_tables=dom_tables,
                     dom_table_norms=dom_table_norms,
                     t_indep_dom_tables=t_indep_dom_tables,
                     t_indep_dom_table_norms=t_indep_dom_table_norms,
                     tdi_tables=tdi_tables,
+                    max_t_indep_exp=np.inf,
                 )
 
             # -- Storage for exp due to generic + pegleg (non-scaling) sources -- #
 
             nonscaling_t_indep_exp = 0.
-            nonscaling_hit_exp = np.zeros(shape=num_hits, dtype=np.float64)
+            nonscaling_hit_exp = workspace.hit_exps[0, :num_hits]
+            nonscaling_hit_exp[:] = 0.
+
+            # Where and how bright the pegleg sources still to be added are,
+            # and the largest scale factor, bound the hit terms of the LLH of
+            # all pegleg steps yet to come; the time-independent expectation
+            # only grows
+            max_scalefactor = 0.
+            if use_threshold:
+                pegleg_bounds = np.empty(shape=(num_pegleg_sources + 1, 6))
+                pegleg_photons = np.empty(shape=num_pegleg_sources + 1)
+                get_source_bounds(pegleg_sources, pegleg_bounds, pegleg_photons)
+                if num_scaling_sources > 0:
+                    max_scalefactor = MAX_CASCADE_ENERGY / SCALING_CASCADE_ENERGY
 
             # Expectations for generic-only sources (i.e. pegleg=0 at this point)
             if len(generic_sources) > 0:
+                max_t_indep_exp = np.inf
+                max_hit_llh = np.inf
+                if use_threshold:
+                    num_generic_sources = len(generic_sources)
+                    generic_bounds = np.empty(shape=(num_generic_sources + 1, 6))
+                    generic_photons = np.empty(shape=num_generic_sources + 1)
+                    get_source_bounds(generic_sources, generic_bounds, generic_photons)
+                    added_bounds = generic_bounds[0]
+                    added_bounds[0::2] = np.minimum(added_bounds[0::2], pegleg_bounds[0, 0::2])
+                    added_bounds[1::2] = np.maximum(added_bounds[1::2], pegleg_bounds[0, 1::2])
+                    # Generic sources' expectations are not in yet; the bound
+                    # drops one-for-one with their time-independent expectation
+                    max_hit_llh = get_max_llh(
+                        event_hits=event_hits,
+                        nonscaling_hit_exp=nonscaling_hit_exp,
+                        nonscaling_t_indep_exp=0.,
+                        added_bounds=added_bounds,
+                        added_photons=generic_photons[0] + pegleg_photons[0],
+                        nominal_scaling_hit_exp=nominal_scaling_hit_exp,
+                        nominal_scaling_t_indep_exp=nominal_scaling_t_indep_exp,
+                        max_scalefactor=max_scalefactor,
+                        scalefactor=10.,
+                    )
+                    max_t_indep_exp = max_hit_llh - llh_threshold
                 nonscaling_t_indep_exp += pexp_(
                     sources=generic_sources,
                     sources_start=0,
                     sources_stop=len(generic_sources),
                     event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     hit_exp=nonscaling_hit_exp,
+                    workspace=workspace,
                     dom_tables=dom_tables,
                     dom_table_norms=dom_table_norms,
                     t_indep_dom_tables=t_indep_dom_tables,
                     t_indep_dom_table_norms=t_indep_dom_table_norms,
                     tdi_tables=tdi_tables,
+                    max_t_indep_exp=max_t_indep_exp,
                 )
+                if workspace.terminated_early[0]:
+                    return (
+                        max_hit_llh - nonscaling_t_indep_exp,
+                        0,
+                        0.,
+                        0.,
+                        0.,
+                        0.,
+                        True,
+                    )
 
             if num_scaling_sources > 0:
                 # Compute initial scalefactor & LLH for generic-only (no pegleg) sources
                 scalefactor, llh = get_optimal_scalefactor(
-                    event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     nonscaling_hit_exp=nonscaling_hit_exp,
                     nonscaling_t_indep_exp=nonscaling_t_indep_exp,
                     nominal_scaling_hit_exp=nominal_scaling_hit_exp,
                     nominal_scaling_t_indep_exp=nominal_scaling_t_indep_exp,
                     initial_scalefactor=10.,
+                    active_hits=_get_active_hits(workspace),
                 )
             else:
                 scalefactor = 0
                 llh = simple_llh(
-                    event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     nonscaling_hit_exp=nonscaling_hit_exp,
                     nonscaling_t_indep_exp=nonscaling_t_indep_exp,
+                    active_hits=_get_active_hits(workspace),
                 )
 
             if num_pegleg_sources == 0:
@@ -1399,6 +2359,7 @@ def generate_pexp_and_llh_functions(
                     0.,
                     0.,
                     0.,
+                    False,
                 )
 
             # -- Pegleg loop -- #
@@ -1419,10 +2380,10 @@ def generate_pexp_and_llh_functions(
             # -- Loop initialization -- #
 
             num_llhs = num_pegleg_steps + 1
-            llhs = np.full(shape=num_llhs, fill_value=-np.inf, dtype=np.float64)
+            llhs = _get_buffer(workspace.llhs, num_llhs, -np.inf)
             llhs[0] = llh
 
-            all_scalefactors = np.zeros(shape=num_llhs, dtype=np.float64)
+            all_scalefactors = _get_buffer(workspace.scalefactors, num_llhs, 0.)
             all_scalefactors[0] = scalefactor
 
             best_llh = llh
@@ -1434,6 +2395,30 @@ def generate_pexp_and_llh_functions(
                 pegleg_stop_idx = pegleg_step * pegleg_stepsize
                 pegleg_start_idx = pegleg_stop_idx - pegleg_stepsize
 
+                if use_threshold and best_llh < llh_threshold:
+                    max_llh = get_max_llh(
+                        event_hits=event_hits,
+                        nonscaling_hit_exp=nonscaling_hit_exp,
+                        nonscaling_t_indep_exp=nonscaling_t_indep_exp,
+                        added_bounds=pegleg_bounds[pegleg_start_idx],
+                        added_photons=pegleg_photons[pegleg_start_idx],
+                        nominal_scaling_hit_exp=nominal_scaling_hit_exp,
+                        nominal_scaling_t_indep_exp=nominal_scaling_t_indep_exp,
+                        max_scalefactor=max_scalefactor,
+                        scalefactor=scalefactor,
+                    )
+                    if max_llh < llh_threshold:
+                        workspace.terminated_early[0] = True
+                        return (
+                            max(best_llh, max_llh),
+                            0,
+                            0.,
+                            0.,
+                            0.,
+                            0.,
+                            True,
+                        )
+
                 # Add to expectations by including another "batch" or segment of pegleg
                 # sources
                 nonscaling_t_indep_exp += pexp_(
@@ -1441,33 +2426,35 @@ def generate_pexp_and_llh_functions(
                     sources_start=pegleg_start_idx,
                     sources_stop=pegleg_stop_idx,
                     event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     hit_exp=nonscaling_hit_exp,
+                    workspace=workspace,
                     dom_tables=dom_tables,
                     dom_table_norms=dom_table_norms,
                     t_indep_dom_tables=t_indep_dom_tables,
                     t_indep_dom_table_norms=t_indep_dom_table_norms,
                     tdi_tables=tdi_tables,
+                    max_t_indep_exp=np.inf,
                 )
 
                 if num_scaling_sources > 0:
                     # Find optimal scalefactor at this pegleg step
                     scalefactor, llh = get_optimal_scalefactor(
-                        event_dom_info=event_dom_info,
-                        event_hit_info=event_hit_info,
+                        event_hits=event_hits,
                         nonscaling_hit_exp=nonscaling_hit_exp,
                         nonscaling_t_indep_exp=nonscaling_t_indep_exp,
                         nominal_scaling_hit_exp=nominal_scaling_hit_exp,
                         nominal_scaling_t_indep_exp=nominal_scaling_t_indep_exp,
                         initial_scalefactor=scalefactor,
+                        active_hits=_get_active_hits(workspace),
                     )
                 else:
                     scalefactor = 0
                     llh = simple_llh(
-                        event_dom_info=event_dom_info,
-                        event_hit_info=event_hit_info,
+                        event_hits=event_hits,
                         nonscaling_hit_exp=nonscaling_hit_exp,
                         nonscaling_t_indep_exp=nonscaling_t_indep_exp,
+                        active_hits=_get_active_hits(workspace),
                     )
 
                 # Store this pegleg step's llh and best scalefactor
@@ -1501,21 +2488,29 @@ def generate_pexp_and_llh_functions(
                 llhs[pegleg_max_llh_step] - llhs[0],
                 llhs[pegleg_max_llh_step] - llhs[lower_idx],
                 llhs[pegleg_max_llh_step] - llhs[upper_idx],
+                False,
             )
 
         else:
             # let's do CGD
-            num_hits = len(event_hit_info)
+            num_hits = len(event_hits.hit_time)
 
-            n_opt_segments = 100
+            n_opt_segments = NUM_OPT_SEGMENTS
 
-            nominal_scaling_t_indep_exps = np.zeros(n_opt_segments, dtype=np.float64)
-            nominal_scaling_hit_exps = np.zeros(shape=(n_opt_segments, num_hits), dtype=np.float64)
+            # Rows are zeroed as they are filled below
+            if workspace.hit_exps.shape[0] >= n_opt_segments:
+                nominal_scaling_t_indep_exps = workspace.t_indep_exps
+                nominal_scaling_hit_exps = workspace.hit_exps
+            else:
+                nominal_scaling_t_indep_exps = np.zeros(n_opt_segments, dtype=np.float64)
+                nominal_scaling_hit_exps = np.zeros(
+                    shape=(n_opt_segments, num_hits), dtype=np.float64
+                )
 
-            scalefacots = np.zeros(shape=(n_opt_segments,))
+            scalefacots = _get_buffer(workspace.segment_scalefactors, n_opt_segments, 0.)
 
-            llhs = np.full(shape=n_opt_segments, fill_value=-np.inf, dtype=np.float64)
-            mean_scalefactor = np.zeros(shape=n_opt_segments)
+            llhs = _get_buffer(workspace.llhs, n_opt_segments, -np.inf)
+            mean_scalefactor = _get_buffer(workspace.scalefactors, n_opt_segments, 0.)
 
             best_llh = -np.inf
             getting_worse_counter = 0
@@ -1525,23 +2520,25 @@ def generate_pexp_and_llh_functions(
                 # fill up exps
                 start = sources_per_segment*n
                 stop = sources_per_segment*(n+1)
+                nominal_scaling_hit_exps[n, :] = 0.
                 nominal_scaling_t_indep_exps[n] = pexp_(
                     sources=pegleg_sources,
                     sources_start=start,
                     sources_stop=stop,
                     event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     hit_exp=nominal_scaling_hit_exps[n],
+                    workspace=workspace,
                     dom_tables=dom_tables,
                     dom_table_norms=dom_table_norms,
                     t_indep_dom_tables=t_indep_dom_tables,
                     t_indep_dom_table_norms=t_indep_dom_table_norms,
                     tdi_tables=tdi_tables,
+                    max_t_indep_exp=np.inf,
                 )
 
                 llh = get_optimal_scalefactors(
-                    event_dom_info=event_dom_info,
-                    event_hit_info=event_hit_info,
+                    event_hits=event_hits,
                     nominal_scaling_hit_exps=nominal_scaling_hit_exps,
                     nominal_scaling_t_indep_exps=nominal_scaling_t_indep_exps,
                     scalefacots=scalefacots,
@@ -1572,6 +2569,7 @@ def generate_pexp_and_llh_functions(
                 0.,
                 0.,
                 0.,
+                False,
             )
 
 
@@ -1585,19 +2583,27 @@ def generate_pexp_and_llh_functions(
         event_dom_info,
         event_hit_info,
         hit_exp,
+        event_hits=None,
+        workspace=None,
     ):
+        if event_hits is None:
+            event_hits = get_event_hits(event_dom_info, event_hit_info)
+        if workspace is None:
+            workspace = get_llh_workspace(len(event_hits.hit_time), max_llhs=0)
         return pexp_(
             sources=sources,
             sources_start=sources_start,
             sources_stop=sources_stop,
             event_dom_info=event_dom_info,
-            event_hit_info=event_hit_info,
+            event_hits=event_hits,
             hit_exp=hit_exp,
+            workspace=workspace,
             dom_tables=dom_tables,
             dom_table_norms=dom_table_norms,
             t_indep_dom_tables=t_indep_dom_tables,
             t_indep_dom_table_norms=t_indep_dom_table_norms,
             tdi_tables=tdi_tables,
+            max_t_indep_exp=np.inf,
         )
 
     # Note: numba fails w/ TDI tables if this is set to be jit-compiled (why?)
@@ -1608,6 +2614,9 @@ def generate_pexp_and_llh_functions(
         event_hit_info,
         event_dom_info,
         pegleg_stepsize,
+        event_hits=None,
+        workspace=None,
+        llh_threshold=-np.inf,
     ):
         """Compute log likelihood for hypothesis sources given an event.
 
@@ -1632,11 +2641,24 @@ def generate_pexp_and_llh_functions(
         pegleg_stepsize : int > 0
             Number of pegleg sources to add each time around the pegleg loop; ignored if
             pegleg procedure is not performed (i.e., if there are no `pegleg_sources`)
+        event_hits : EventHits, optional
+            Structure-of-arrays representation of the hits as returned by
+            `get_event_hits`; pass this to avoid recreating it on each call
+        workspace : LlhWorkspace, optional
+            Scratch buffers as returned by `get_llh_workspace` for this event;
+            pass this to avoid allocating temporary arrays on each call. Not
+            safe to share between threads.
+        llh_threshold : float, optional
+            Callers that discard hypotheses with LLH below this (e.g.
+            population-based optimizers) can pass it to stop evaluating such
+            hypotheses early (see `get_llh_`). By default, the LLH is always
+            computed.
 
         Returns
         -------
         llh : float
-            Log-likelihood value at best pegleg hypo
+            Log-likelihood value at best pegleg hypo, or an upper bound on it
+            if `below_threshold`
         pegleg_stop_idx : int
             Stop index for `pegleg_sources` to obtain optimal LLH .. ::
                 pegleg_sources[:pegleg_stop_idx]
@@ -1648,21 +2670,34 @@ def generate_pexp_and_llh_functions(
             delta LLH of best fit pegleg LLH to LLH `PEGLEG_BREAK_COUNTER` track steps before best LLH
         upper_dllh : float >= 0
             delta LLH of best fit pegleg LLH to LLH `PEGLEG_BREAK_COUNTER` track steps after best LLH
+        below_threshold : bool
+            True if the evaluation was cut short because the LLH was found to
+            be below `llh_threshold` (all other return values except `llh`
+            are then meaningless); fully evaluated LLHs are never flagged
 
         """
+        if event_hits is None:
+            event_hits = get_event_hits(event_dom_info, event_hit_info)
+        if workspace is None:
+            workspace = get_llh_workspace(len(event_hits.hit_time), max_llhs=0)
         return get_llh_(
             generic_sources=generic_sources,
             pegleg_sources=pegleg_sources,
             scaling_sources=scaling_sources,
-            event_hit_info=event_hit_info,
             event_dom_info=event_dom_info,
+            event_hits=event_hits,
             pegleg_stepsize=pegleg_stepsize,
+            workspace=workspace,
             dom_tables=dom_tables,
             dom_table_norms=dom_table_norms,
             t_indep_dom_tables=t_indep_dom_tables,
             t_indep_dom_table_norms=t_indep_dom_table_norms,
             tdi_tables=tdi_tables,
+            llh_threshold=llh_threshold,
         )
-    get_llh.__doc__ = get_llh_.__doc__
 
     return pexp, get_llh, meta
+
+
+if __name__ == '__main__':
+    test_get_optimal_scalefactor()
@@ -32,7 +32,7 @@ See the License for the specific language governing permissions and
 limitations under the License.'''
 
 from collections import OrderedDict
-from copy import deepcopy
+from copy import copy, deepcopy
 from os.path import abspath, dirname
 import sys
 
@@ -427,6 +427,113 @@ class Retro5DTables(object):
 
         self.loaded_sd_indices = np.where(self.sd_idx_table_indexer >= 0)[0]
 
+    def downsample(
+        self,
+        r_factor=1,
+        costheta_factor=1,
+        t_factor=1,
+        costhetadir_factor=1,
+        deltaphidir_factor=1,
+    ):
+        """Create a coarser version of this set of tables by merging
+        consecutive bins in each dimension.
+
+        Photon counts are summed over the merged bins and norms are recomputed
+        for the coarse binning, such that survival probabilities from the
+        coarse tables are the averages over the corresponding fine bins (see
+        `retro.tables.downsample_tables` for template-compressed tables).
+
+        The returned object shares DOM info and the table indexer with this
+        one (those are not copied); only the tables themselves are new.
+
+        Parameters
+        ----------
+        r_factor, costheta_factor, t_factor, costhetadir_factor, deltaphidir_factor : int >= 1
+            Number of consecutive bins to merge in each dimension; each must
+            evenly divide the number of bins in that dimension
+
+        Returns
+        -------
+        coarse_tables : Retro5DTables
+
+        """
+        from retro.tables.downsample_tables import (
+            DOM_TABLE_DIMS,
+            downsample_array,
+            downsample_bin_edges,
+            downsample_templ_compr_table,
+        )
+
+        if not self.tbl_is_ckv:
+            raise NotImplementedError('Can only downsample ckv tables')
+
+        factors = (
+            r_factor, costheta_factor, t_factor, costhetadir_factor, deltaphidir_factor
+        )
+        t_indep_factors = factors[:2] + factors[3:]
+
+        coarse = copy(self)
+
+        table_meta = copy(self.table_meta)
+        for dim, factor in zip(DOM_TABLE_DIMS, factors):
+            key = '{}_bin_edges'.format(dim)
+            table_meta[key] = downsample_bin_edges(self.table_meta[key], factor)
+        if 'binning' in table_meta:
+            table_meta['binning'] = OrderedDict(
+                (key, table_meta[key]) for key in self.table_meta['binning']
+            )
+        table_meta['downsample_factors'] = OrderedDict(zip(DOM_TABLE_DIMS, factors))
+        coarse.table_meta = table_meta
+
+        tables = []
+        template_library = self.template_library
+        for table in self.tables:
+            if self.tbl_is_templ_compr:
+                table, template_library = downsample_templ_compr_table(
+                    table=table,
+                    template_library=self.template_library,
+                    factors=factors,
+                )
+            else:
+                table = downsample_array(table, factors)
+            tables.append(table)
+        t_indep_tables = [
+            downsample_array(t_indep_table, t_indep_factors)
+            for t_indep_table in self.t_indep_tables
+        ]
+        if self.is_stacked:
+            tables = np.stack(tables, axis=0)
+            t_indep_tables = np.stack(t_indep_tables, axis=0)
+        coarse.tables = tables
+        coarse.t_indep_tables = t_indep_tables
+        coarse.template_library = template_library
+
+        # Stacked tables are scaled to an effective number of photons of one;
+        # individually-loaded tables keep their original number of photons
+        table_norms = []
+        t_indep_table_norms = []
+        for table_idx in range(len(tables)):
+            norm_kw = {k: table_meta[k] for k in TABLE_NORM_KEYS}
+            if not self.is_stacked:
+                norm_kw['n_photons'] = self.n_photons_per_table[table_idx]
+            table_norm, t_indep_table_norm = get_table_norm(
+                avg_angsens=self.avg_angsens,
+                quantum_efficiency=1,
+                norm_version=self.norm_version,
+                **norm_kw
+            )
+            table_norms.append(table_norm)
+            t_indep_table_norms.append(t_indep_table_norm)
+        coarse.table_norms = table_norms
+        coarse.t_indep_table_norms = (
+            t_indep_table_norms if len(self.t_indep_table_norms) else []
+        )
+        if table_norms:
+            coarse.table_norm = table_norms[-1]
+            coarse.t_indep_table_norm = t_indep_table_norms[-1]
+
+        return coarse
+
 
 def get_table_norm(
     n_photons,
@@ -20,6 +20,8 @@ __all__ = [
     'infer_power',
     'test_infer_power',
     'sample_powerlaw_binning',
+    'DIGITIZER_LUT_MAX_SIZE',
+    'generate_lut_digitizer',
     'generate_digitizer',
     'test_generate_digitizer',
     'bin_edges_to_binspec',
@@ -54,8 +56,9 @@ See the License for the specific language governing permissions and
 limitations under the License.'''
 
 from collections import OrderedDict
+from functools import partial
 import math
-from os.path import abspath, dirname
+from os.path import abspath, dirname, isfile
 import sys
 from time import time
 
@@ -74,6 +77,11 @@ from retro.utils.misc import hash_obj
 
 NUMBA_JIT_KWARGS = dict(nopython=True, nogil=True, fastmath=False, error_model="numpy")
 
+DIGITIZER_LUT_MAX_SIZE = 2**20
+"""Largest lookup table `generate_digitizer` builds automatically for a
+non-uniform binning; binnings needing larger tables use analytic or
+binary-search digitizers"""
+
 GEOM_FILE_PROTO = 'geom_{hash:s}.npy'
 """File containing detector geometry as a Numpy 5D array with coordinates
 (string, om, x, y, z)"""
@@ -478,7 +486,180 @@ def sample_powerlaw_binning(edges, samples_per_bin):
     return samples
 
 
-def generate_digitizer(bin_edges, clip=True, handle_under_overflow=True):
+def _get_digitizer_lut_size(bin_edges):
+    """Number of uniform cells spanning `bin_edges` such that no cell is wider
+    than half the narrowest bin (so a value is at most one bin away from the
+    bin found in its cell's lookup-table entry, even with rounding)."""
+    bin_edges = np.asarray(bin_edges, dtype=np.float64)
+    return int(np.ceil(2 * (bin_edges[-1] - bin_edges[0]) / np.min(np.diff(bin_edges))))
+
+
+def generate_lut_digitizer(
+    bin_edges, clip=True, handle_under_overflow=True, lut_size=None
+):
+    """Factory to generate a Numba function for "digitizing" data using a
+    lookup table (LUT) over a fine uniform grid spanning the binning.
+
+    The bin index of a value is read from the LUT entry for the grid cell the
+    value falls in (only integer arithmetic on a scaled value) and is then
+    corrected against the adjacent bin edges, so the result is exact for any
+    binning. This avoids the `val**(1/power)` or `log(val)` per call of
+    analytic digitizers and the branching of a binary search.
+
+    Parameters
+    ----------
+    bin_edges : array-like
+    clip : bool, optional
+    handle_under_overflow : bool, optional
+        See `generate_digitizer`
+    lut_size : int, optional
+        Number of grid cells; defaults to (and must be no less than) twice
+        the range of the binning divided by its narrowest bin width
+
+    Returns
+    -------
+    digitize : callable
+
+    """
+    # pylint: disable=missing-docstring, function-redefined
+    bin_edges = np.asarray(bin_edges, dtype=np.float64)
+    assert np.all(np.diff(bin_edges) > 0)
+    start = bin_edges[0]
+    stop = bin_edges[-1]
+    num_bins = len(bin_edges) - 1
+
+    min_lut_size = _get_digitizer_lut_size(bin_edges)
+    if lut_size is None:
+        lut_size = min_lut_size
+    elif lut_size < min_lut_size:
+        raise ValueError(
+            "`lut_size` must be >= {} for this binning; got {}".format(
+                min_lut_size, lut_size
+            )
+        )
+    last_cell = lut_size - 1
+    recip_cell_width = lut_size / (stop - start)
+
+    grid = start + np.arange(lut_size) / recip_cell_width
+    lut_dtype = np.uint8 if num_bins <= 2**8 else np.int32
+    lut = np.clip(
+        np.digitize(grid, bins=bin_edges, right=False) - 1, 0, num_bins - 1
+    ).astype(lut_dtype)
+
+    if not clip:
+        underflow_idx = -1
+        overflow_idx = num_bins
+    else:
+        underflow_idx = 0
+        overflow_idx = num_bins - 1
+
+    if handle_under_overflow:
+        def digitize(val):
+            if val < start:
+                return underflow_idx
+            if val > stop:
+                return overflow_idx
+            idx = np.int64(lut[min(int((val - start) * recip_cell_width), last_cell)])
+            if val < bin_edges[idx]:
+                return idx - 1
+            if idx < num_bins - 1 and val >= bin_edges[idx + 1]:
+                return idx + 1
+            return idx
+    else:
+        def digitize(val):
+            cell = min(max(0, int((val - start) * recip_cell_width)), last_cell)
+            idx = np.int64(lut[cell])
+            if val < bin_edges[idx]:
+                return idx - 1
+            if val >= bin_edges[idx + 1]:
+                return idx + 1
+            return idx
+
+    digitize.__doc__ = (
+        """Find bin index for a value.
+
+        Binning is set to {} bins from {} to {}, found via a {}-entry lookup
+        table.
+
+        Parameters
+        ----------
+        val : scalar
+            Value for which to find bin index.
+
+        Returns
+        -------
+        idx : int
+            Bin index; `idx < 0` or `idx >= num_bins` indicates `val` is
+            outside binning.
+
+        """.format(num_bins, start, stop, lut_size)
+    )
+    digitize = numba_jit(**NUMBA_JIT_KWARGS)(digitize)
+
+    if DEBUG:
+        print('{} bins from {} to {} with {}-entry lookup table'.format(
+            num_bins, start, stop, lut_size
+        ))
+
+    return digitize
+
+
+def _generate_acos_digitizer(bin_edges, clip, handle_under_overflow, use_lut):
+    """Generate a digitizer that returns the same bin index for `val` as
+    `generate_digitizer(bin_edges, ...)` does for `math.acos(val)` but
+    without computing `acos`.
+
+    As `acos` and the angle digitizer are both monotonic, the (compiled)
+    composite function is non-increasing in `val`; the largest `val` mapping
+    to each bin index (beyond the one at ``val = 1``) is found by bisection
+    over floats, and these thresholds (negated to be ascending) become the
+    bin edges of a lookup-table digitizer for `-val`. Bin assignment is thereby identical
+    to the composite function, including any rounding.
+    """
+    digitize_angle = generate_digitizer(
+        bin_edges,
+        clip=clip,
+        handle_under_overflow=handle_under_overflow,
+        use_lut=use_lut,
+    )
+
+    @numba_jit(**NUMBA_JIT_KWARGS)
+    def digitize_acos(val):
+        return digitize_angle(math.acos(val))
+
+    lowest_idx = digitize_acos(1.)
+    highest_idx = digitize_acos(-1.)
+    neg_thresholds = []
+    for idx in range(lowest_idx + 1, highest_idx + 1):
+        # Invariant: digitize_acos(lo) >= idx > digitize_acos(hi)
+        lo, hi = -1., 1.
+        while True:
+            mid = lo + (hi - lo) / 2
+            if mid <= lo or mid >= hi:
+                break
+            if digitize_acos(mid) >= idx:
+                lo = mid
+            else:
+                hi = mid
+        neg_thresholds.append(-lo)
+
+    neg_cos_bin_edges = np.array([-1.] + neg_thresholds + [1.])
+    if neg_cos_bin_edges[-2] >= 1:
+        neg_cos_bin_edges[-1] = np.nextafter(1., np.inf)
+    # Thresholds can be arbitrarily close to uniform, so always use the
+    # (exact) lookup-table digitizer rather than an analytic one
+    digitize_neg_cos = generate_lut_digitizer(neg_cos_bin_edges, clip=True)
+
+    @numba_jit(**NUMBA_JIT_KWARGS)
+    def digitize(val):
+        return lowest_idx + digitize_neg_cos(-val)
+
+    return digitize
+
+
+def generate_digitizer(
+    bin_edges, clip=True, handle_under_overflow=True, use_lut=None, transform=None
+):
     """Factory to generate a specialized Numba function for "digitizing" data
     (i.e., returning which bin a value falls within).
 
@@ -496,6 +677,19 @@ def generate_digitizer(bin_edges, clip=True, handle_under_overflow=True):
         Whether or not to ensure values below smallest / above largest bin
         return a valid value. If False, `clip` is ignored.
 
+    use_lut : bool or None, optional
+        Whether to use a lookup-table digitizer (see `generate_lut_digitizer`).
+        If None, one is used for binnings that are neither linear nor
+        power-2 spaced (those need `val**(1/power)`, `log(val)`, or a binary
+        search per call) as long as the lookup table needs no more than
+        `DIGITIZER_LUT_MAX_SIZE` entries.
+
+    transform : None or str in {"acos"}, optional
+        If "acos", `bin_edges` are angles but the digitizer is passed their
+        cosines, which are assigned to exactly the same bins that
+        `math.acos(val)` would be assigned to (without computing the `acos`).
+        `val` must be in [-1, 1].
+
     Returns
     -------
     digitize : callable
@@ -511,6 +705,17 @@ def generate_digitizer(bin_edges, clip=True, handle_under_overflow=True):
 
     """
     # pylint: disable=missing-docstring, function-redefined
+    if transform == 'acos':
+        return _generate_acos_digitizer(
+            bin_edges,
+            clip=clip,
+            handle_under_overflow=handle_under_overflow,
+            use_lut=use_lut,
+        )
+
+    if transform is not None:
+        raise ValueError('Unrecognized `transform` "{}"'.format(transform))
+
     bin_edges = np.asarray(bin_edges)
     assert np.all(np.diff(bin_edges) > 0)
     start = bin_edges[0]
@@ -553,6 +758,17 @@ def generate_digitizer(bin_edges, clip=True, handle_under_overflow=True):
             recip_logwidth = 1 / logwidth
             log_start = log_bin_edges[0]
 
+    if use_lut is None:
+        # Linear and square-root digitizers are cheaper than a table lookup
+        use_lut = (
+            not (power is not None and (power == 1 or np.isclose(power, 2)))
+            and _get_digitizer_lut_size(bin_edges) <= DIGITIZER_LUT_MAX_SIZE
+        )
+    if use_lut:
+        return generate_lut_digitizer(
+            bin_edges, clip=clip, handle_under_overflow=handle_under_overflow
+        )
+
     digitize = None
     bindescr = None
 
@@ -685,34 +901,77 @@ def generate_digitizer(bin_edges, clip=True, handle_under_overflow=True):
 
 
 def test_generate_digitizer():
-    """Test the functions that `generate_digitizer` produces."""
+    """Test the functions that `generate_digitizer` and
+    `generate_lut_digitizer` produce."""
+    binning = OrderedDict([
+        ('power2', powerspace(0, 1000, 81, 2)),
+        ('power3', powerspace(0, 1000, 81, 3)),
+        ('log', np.logspace(0, 3, 51)),
+        ('uneven', np.cumsum(np.r_[0, np.random.RandomState(1).uniform(1, 3, 15)])),
+    ])
     # TODO: use local file for this test
-    meta = load_pickle(
+    meta_fpath = (
         '/home/icecube/retro/tables/'
         'large_5d_notilt_combined/stacked/stacked_ckv_template_map_meta.pkl'
     )
-    binning = meta['binning']
+    if isfile(meta_fpath):
+        binning.update(load_pickle(meta_fpath)['binning'])
+
+    factories = [
+        ('auto', generate_digitizer),
+        ('analytic', partial(generate_digitizer, use_lut=False)),
+        ('lut', generate_lut_digitizer),
+    ]
 
     for dim, edges in binning.items():
         assert np.all(np.diff(edges) > 0)
         num_bins = len(edges) - 1
-        digitize = generate_digitizer(edges)
-        digitize_overflow = generate_digitizer(edges, clip=False)
-        rand = np.random.RandomState(0)
-
-        # Check lots of values within the valid range of the binning
-        vals = rand.uniform(low=edges[0], high=edges[-1], size=int(1e5))
-        test = np.array([digitize(v) for v in vals])
-        ref = np.digitize(vals, bins=edges, right=False) - 1
-        assert np.all(test == ref), dim
-
-        # Check edge cases
-        assert digitize(edges[0]) == 0, dim
-        assert digitize(edges[0] - 1e-8) == 0, dim
-        assert digitize_overflow(edges[0] - 1e-8) < 0, dim
-        assert digitize(edges[-1]) == num_bins - 1, dim
-        assert digitize(edges[-1] + 1e-8) == num_bins - 1, dim
-        assert digitize_overflow(edges[-1] + 1e-8) == num_bins, dim
+        for kind, factory in factories:
+            label = '{} ({})'.format(dim, kind)
+            digitize = factory(edges)
+            digitize_overflow = factory(edges, clip=False)
+            rand = np.random.RandomState(0)
+
+            # Check lots of values within the valid range of the binning
+            vals = rand.uniform(low=edges[0], high=edges[-1], size=int(1e5))
+            test = np.array([digitize(v) for v in vals])
+            ref = np.digitize(vals, bins=edges, right=False) - 1
+            assert np.all(test == ref), label
+
+            # Lookup tables are exact, also at and right next to bin edges
+            if kind == 'lut':
+                vals = np.concatenate([
+                    edges[:-1], np.nextafter(edges[1:], -np.inf)
+                ])
+                test = np.array([digitize(v) for v in vals])
+                ref = np.digitize(vals, bins=edges, right=False) - 1
+                assert np.all(test == ref), label
+
+            # Check edge cases
+            assert digitize(edges[0]) == 0, label
+            assert digitize(edges[0] - 1e-8) == 0, label
+            assert digitize_overflow(edges[0] - 1e-8) < 0, label
+            assert digitize(edges[-1]) == num_bins - 1, label
+            assert digitize(edges[-1] + 1e-8) == num_bins - 1, label
+            assert digitize_overflow(edges[-1] + 1e-8) == num_bins, label
+
+    # Digitizing cosines with `transform="acos"` must give the same bins as
+    # digitizing the angles obtained from them via `acos`
+    for edges in [np.linspace(0, np.pi, 41), np.linspace(0.1, 3, 11)]:
+        for clip in [True, False]:
+            digitize = generate_digitizer(edges, clip=clip)
+            digitize_cos = generate_digitizer(edges, clip=clip, transform='acos')
+            rand = np.random.RandomState(0)
+            vals = np.concatenate([
+                np.cos(edges), rand.uniform(-1, 1, size=int(1e4)), [-1, 0, 1]
+            ])
+            vals = np.concatenate([
+                vals, np.nextafter(vals, -np.inf), np.nextafter(vals, np.inf)
+            ])
+            vals = vals[(vals >= -1) & (vals <= 1)]
+            test = np.array([digitize_cos(v) for v in vals])
+            ref = np.array([digitize(math.acos(v)) for v in vals])
+            assert np.all(test == ref), (edges, clip)
 
     print('<< PASS : test_generate_digitizer >>')
 
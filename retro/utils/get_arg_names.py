@@ -26,7 +26,10 @@ limitations under the License.'''
 
 import inspect
 
-import numba
+try:
+    from numba.core.registry import CPUDispatcher
+except ImportError:
+    from numba.targets.registry import CPUDispatcher
 
 
 def get_arg_names(func):
@@ -41,12 +44,15 @@ def get_arg_names(func):
     arg_names : tuple of strings
 
     """
-    if isinstance(func, numba.targets.registry.CPUDispatcher):
+    if isinstance(func, CPUDispatcher):
         py_func = func.py_func
     else:
         py_func = func
 
     # Get all the function's argument names
-    arg_names = inspect.getargspec(py_func).args
+    if hasattr(inspect, 'getfullargspec'):
+        arg_names = inspect.getfullargspec(py_func).args
+    else:
+        arg_names = inspect.getargspec(py_func).args # pylint: disable=deprecated-method
 
     return tuple(arg_names)
@@ -15,6 +15,8 @@ __all__ = [
     'weighted_average',
     'weighted_percentile',
     'test_weighted_percentile',
+    'select_weighted_percentile',
+    'test_select_weighted_percentile',
     'estimate_from_llhp',
     'fit_cdf',
 ]
@@ -35,7 +37,7 @@ See the License for the specific language governing permissions and
 limitations under the License.'''
 
 from collections import OrderedDict
-from copy import copy, deepcopy
+from copy import copy
 from os.path import abspath, dirname
 import sys
 import time
@@ -43,7 +45,7 @@ import traceback
 import warnings
 
 import numpy as np
-from scipy import interpolate, optimize, special, stats
+from scipy import optimize, special, stats
 from six import string_types
 
 if __name__ == '__main__' and __package__ is None:
@@ -51,7 +53,7 @@ if __name__ == '__main__' and __package__ is None:
     if RETRO_DIR not in sys.path:
         sys.path.append(RETRO_DIR)
 import retro
-from retro.priors import PRI_INTERP, PRI_AZ_INTERP
+from retro.priors import PRI_INTERP, PRI_AZ_INTERP, get_interp_prior_pdf
 
 
 DELTA_LLH_CUTOFF = 15.5
@@ -189,6 +191,136 @@ def test_weighted_percentile():
     print("<< PASS : test_weighted_percentile >>")
 
 
+@retro.numba_jit(**retro.DFLT_NUMBA_JIT_KWARGS)
+def _select_weighted_percentiles(vals, weights, targets, out):
+    """Weighted quickselect: find the values at which the cumulative weight
+    of the (sorted) data reaches each of `targets`, interpolating linearly
+    between neighboring values as `weighted_percentile` does. `targets` must
+    be ascending. `vals` and `weights` are reordered in place."""
+    lo = 0
+    hi = vals.size
+    # Sum of weights of and max of values in [0, lo), i.e., all values known
+    # to sort before those in [lo, hi)
+    cum = 0.0
+    pred = np.nan
+    for q_idx in range(targets.size):
+        target = targets[q_idx]
+        while True:
+            # Median-of-three pivot
+            a = vals[lo]
+            b = vals[(lo + hi - 1) // 2]
+            c = vals[hi - 1]
+            if a < b:
+                pivot = b if b < c else (c if a < c else a)
+            else:
+                pivot = a if a < c else (c if b < c else b)
+
+            # Partition [lo, hi) into [lo, lt) < pivot, [lt, gt) == pivot, and
+            # [gt, hi) > pivot
+            lt = lo
+            i = lo
+            gt = hi
+            w_lt = 0.0
+            w_eq = 0.0
+            max_lt = -np.inf
+            while i < gt:
+                val = vals[i]
+                weight = weights[i]
+                if val < pivot:
+                    w_lt += weight
+                    max_lt = max(max_lt, val)
+                    vals[i] = vals[lt]
+                    weights[i] = weights[lt]
+                    vals[lt] = val
+                    weights[lt] = weight
+                    lt += 1
+                    i += 1
+                elif val > pivot:
+                    gt -= 1
+                    vals[i] = vals[gt]
+                    weights[i] = weights[gt]
+                    vals[gt] = val
+                    weights[gt] = weight
+                else:
+                    w_eq += weight
+                    i += 1
+
+            if cum + w_lt > target:
+                hi = lt
+                continue
+
+            if lt > lo and not max_lt <= pred:
+                pred = max_lt
+            cum += w_lt
+            lo = lt
+
+            if cum + w_eq > target:
+                # Target is reached within the block of values equal to pivot
+                while cum + weights[lo] <= target:
+                    cum += weights[lo]
+                    pred = pivot
+                    lo += 1
+                if np.isnan(pred):
+                    out[q_idx] = pivot
+                else:
+                    out[q_idx] = pred + (target - cum) * (pivot - pred) / weights[lo]
+                hi = vals.size
+                break
+
+            cum += w_eq
+            pred = pivot
+            lo = gt
+
+    return out
+
+
+def select_weighted_percentile(a, q, weights):
+    """Compute weighted percentile(s) of data, with the same result as
+    `weighted_percentile` but by selection rather than sorting all of `a`.
+
+    Parameters
+    ----------
+    a : array
+        Data
+    q : scalar or array-like in [0, 100)
+        Percentile(s) to compute for data
+    weights : array, same shape as `data`
+        Frequencies (counts) of data
+
+    Returns
+    -------
+    percentile : scalar or ndarray
+
+    """
+    q = np.asarray(q, dtype=np.float64)
+    flat_q = q.ravel()
+    order = np.argsort(flat_q)
+    weights = np.array(weights, dtype=np.float64)
+    out = np.empty_like(flat_q)
+    _select_weighted_percentiles(
+        np.array(a, dtype=np.float64),
+        weights,
+        flat_q[order] * (np.sum(weights) / 100),
+        out,
+    )
+    percentile = np.empty_like(flat_q)
+    percentile[order] = out
+    return percentile.reshape(q.shape)[()]
+
+
+def test_select_weighted_percentile():
+    """Unit test for `select_weighted_percentile` function."""
+    rand = np.random.RandomState(0)
+    pctiles = [10, 25, 50, 75, 90, 0]
+    for size in [1, 2, 10, 1000]:
+        data = rand.normal(size=size)
+        weights = rand.uniform(size=size)
+        vals = select_weighted_percentile(a=data, q=pctiles, weights=weights)
+        ref_vals = weighted_percentile(a=data, q=pctiles, weights=weights)
+        assert np.allclose(vals, ref_vals, atol=0, rtol=1e-12), (vals, ref_vals)
+    print("<< PASS : test_select_weighted_percentile >>")
+
+
 def estimate_from_llhp(
     llhp,
     treat_dims_independently,
@@ -257,13 +389,13 @@ def estimate_from_llhp(
         # weight points by their likelihood (_not_ log likelihood) relative to
         # max; keep prob_weights around for later use
         prob_weights = np.exp(llh - max_llh)
-        weights = deepcopy(prob_weights)
+        weights = prob_weights.copy()
     else:
         prob_weights = None
         weights = np.ones(shape=len(llh))
 
     if treat_dims_independently:
-        weights = {d: deepcopy(weights) for d in priors_used.keys()}
+        weights = {d: weights.copy() for d in priors_used.keys()}
 
     if remove_priors:
         # calculate the prior weights from the priors used
@@ -288,9 +420,8 @@ def estimate_from_llhp(
             elif prior_kind == 'log_normal' and dim == 'cascade_d_zenith':
                 w = None
             elif prior_kind in (PRI_AZ_INTERP, PRI_INTERP):
-                x, pdf, low, high = prior_params[-4:]
-                pdf_interp = interpolate.UnivariateSpline(x=x, y=pdf, ext='raise', s=0)
-                w = 1 / pdf_interp(llhp[dim])
+                pdf_func = get_interp_prior_pdf((prior_kind, prior_params))
+                w = 1 / pdf_func(llhp[dim])
             else:
                 raise NotImplementedError(
                     'Prior "{}" for dimension/param "{}" is unhandled'
@@ -366,51 +497,90 @@ def estimate_from_llhp(
         50.0 + one_sigma_range / 2,
     ])
 
-    for param_idx, param in enumerate(params):
-        if treat_dims_independently:
+    if treat_dims_independently:
+        for param in params:
             this_postproc_llh = postproc_llh[param]
             max_idx = np.nanargmax(this_postproc_llh)
             max_postproc_llh = this_postproc_llh[max_idx]
             param_vals = llhp[param]
             param_at_max_llh = param_vals[max_idx]
             cut = this_postproc_llh > max_postproc_llh - DELTA_LLH_CUTOFF
-            this_postproc_llh = this_postproc_llh[cut]
             this_weights = weights[param][cut]
             param_vals = param_vals[cut]
-        else:
-            param_at_max_llh = params_at_max_llh[param]
-            this_postproc_llh = cut_postproc_llh
-            this_weights = cut_weights
-            param_vals = cut_llhp[param]
-
-        estimate[param]['max'] = param_at_max_llh
-
-        if 'azimuth' in param:
-            # azimuth is a cyclic function, so need some special treatment to
-            # get correct mean: shift everything such that the best-fit point is
-            # in the middle (pi)
-            shift = param_at_max_llh
-            shifted_vals = (param_vals - shift + np.pi) % (2*np.pi)
-
-            mean = (stats.circmean(shifted_vals) + shift - np.pi) % (2*np.pi)
-            vals_at_q = weighted_percentile(
-                a=shifted_vals,
-                q=qth_percentiles,
-                weights=this_weights,
-            )
-            lower, median, upper = (vals_at_q + shift - np.pi) % (2*np.pi)
-        else:
-            mean = np.average(param_vals, weights=this_weights)
-            lower, median, upper = weighted_percentile(
-                a=param_vals,
-                q=qth_percentiles,
-                weights=this_weights,
+
+            estimate[param]['max'] = param_at_max_llh
+
+            if 'azimuth' in param:
+                # azimuth is a cyclic function, so need some special treatment
+                # to get correct mean: shift everything such that the best-fit
+                # point is in the middle (pi)
+                shift = param_at_max_llh
+                shifted_vals = (param_vals - shift + np.pi) % (2*np.pi)
+
+                mean = (stats.circmean(shifted_vals) + shift - np.pi) % (2*np.pi)
+                vals_at_q = weighted_percentile(
+                    a=shifted_vals,
+                    q=qth_percentiles,
+                    weights=this_weights,
+                )
+                lower, median, upper = (vals_at_q + shift - np.pi) % (2*np.pi)
+            else:
+                mean = np.average(param_vals, weights=this_weights)
+                lower, median, upper = weighted_percentile(
+                    a=param_vals,
+                    q=qth_percentiles,
+                    weights=this_weights,
+                )
+
+            estimate[param]['mean'] = mean
+            estimate[param]['median'] = median
+            estimate[param]['lower_bound'] = lower
+            estimate[param]['upper_bound'] = upper
+
+    else:
+        # All params share the same points and weights, so compute the
+        # estimates for all of them at once, one column per param
+        vals = np.empty(shape=(len(cut_llhp), num_params), order='F')
+        vals_at_max = np.empty(shape=num_params)
+        for param_idx, param in enumerate(params):
+            vals[:, param_idx] = cut_llhp[param]
+            vals_at_max[param_idx] = params_at_max_llh[param]
+
+        # azimuth is a cyclic function, so need some special treatment to get
+        # correct mean: shift everything such that the best-fit point is in
+        # the middle (pi)
+        is_az = np.array(['azimuth' in param for param in params], dtype=bool)
+        shifts = vals_at_max[is_az]
+        vals[:, is_az] = (vals[:, is_az] - shifts + np.pi) % (2*np.pi)
+
+        means = np.dot(cut_weights, vals) / np.sum(cut_weights)
+        # (unweighted) circular mean of the shifted azimuths
+        shifted_az = vals[:, is_az]
+        means[is_az] = np.arctan2(
+            np.mean(np.sin(shifted_az), axis=0),
+            np.mean(np.cos(shifted_az), axis=0),
+        )
+
+        # Weighted percentiles by selection (each column and its copy of the
+        # weights get reordered)
+        targets = qth_percentiles * (np.sum(cut_weights) / 100)
+        vals_at_q = np.empty(shape=(len(qth_percentiles), num_params))
+        col_weights = np.empty_like(cut_weights)
+        for param_idx in range(num_params):
+            col_weights[:] = cut_weights
+            _select_weighted_percentiles(
+                vals[:, param_idx], col_weights, targets, vals_at_q[:, param_idx]
             )
 
-        estimate[param]['mean'] = mean
-        estimate[param]['median'] = median
-        estimate[param]['lower_bound'] = lower
-        estimate[param]['upper_bound'] = upper
+        means[is_az] = (means[is_az] + shifts - np.pi) % (2*np.pi)
+        vals_at_q[:, is_az] = (vals_at_q[:, is_az] + shifts - np.pi) % (2*np.pi)
+
+        for param_idx, param in enumerate(params):
+            estimate[param]['max'] = vals_at_max[param_idx]
+            estimate[param]['mean'] = means[param_idx]
+            estimate[param]['lower_bound'] = vals_at_q[0, param_idx]
+            estimate[param]['median'] = vals_at_q[1, param_idx]
+            estimate[param]['upper_bound'] = vals_at_q[2, param_idx]
 
     # -- Construct estimates array & metadata dict -- #
 
@@ -631,3 +801,4 @@ def fit_cdf(x, cdf, distribution, x_is_data, verbosity=0):
 
 if __name__ == '__main__':
     test_weighted_percentile()
+    test_select_weighted_percentile()